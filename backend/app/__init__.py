@@ -2,18 +2,77 @@ from flask import Flask, send_from_directory, request, jsonify
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from . import database
-import setup_db
+from . import queries
+from . import instrumentation
+from . import search
+from . import cache
+from . import revocation
+from . import passwords
+from . import ratelimit
+from . import identity
+from . import static_assets
+from . import compression
+from . import changefeed
+from .json_provider import FastJSONProvider
 import os
 from .config import DB_USERNAME, DB_PASSWORD, DB_NAME, DB_HOST, DB_PORT, SECRET_KEY
+from . import config
 
 JWT_SECRET_KEY = "YourSuperSecretJWTKey"
-BLOCKLIST = set()
 
 def create_app():
     app = Flask(__name__, static_folder=None)
+    app.json = FastJSONProvider(app)
 
     app.config["SECRET_KEY"]=SECRET_KEY
     app.config["DATABASE_URL"]=f"postgresql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+    app.config["DB_POOL_MIN"] = config.DB_POOL_MIN
+    app.config["DB_POOL_MAX"] = config.DB_POOL_MAX
+    app.config["DB_POOL_TIMEOUT"] = config.DB_POOL_TIMEOUT
+    app.config["DB_POOL_MAX_IDLE"] = config.DB_POOL_MAX_IDLE
+    app.config["DB_POOL_CHECK_AFTER"] = config.DB_POOL_CHECK_AFTER
+    app.config["COLLEGE_COUNTS_TABLE"] = config.COLLEGE_COUNTS_TABLE
+    app.config["SCHEMA_STARTUP"] = config.SCHEMA_STARTUP
+    app.config["EXPORT_ITERSIZE"] = config.EXPORT_ITERSIZE
+    app.config["QUERY_PREPARE"] = config.QUERY_PREPARE
+    app.config["SQL_INSTRUMENTATION"] = config.SQL_INSTRUMENTATION
+    app.config["SLOW_QUERY_MS"] = config.SLOW_QUERY_MS
+    app.config["N_PLUS_ONE_THRESHOLD"] = config.N_PLUS_ONE_THRESHOLD
+    app.config["SEARCH_BACKEND"] = config.SEARCH_BACKEND
+    app.config["SEARCH_SIMILARITY"] = config.SEARCH_SIMILARITY
+    app.config["STATS_RECONCILE_INTERVAL"] = config.STATS_RECONCILE_INTERVAL
+    app.config["CHANGE_FEED_BUFFER"] = config.CHANGE_FEED_BUFFER
+    app.config["CHANGE_FEED_RETENTION"] = config.CHANGE_FEED_RETENTION
+    app.config["CHANGE_FEED_MAX_STREAMS"] = config.CHANGE_FEED_MAX_STREAMS
+    app.config["CHANGE_FEED_HEARTBEAT"] = config.CHANGE_FEED_HEARTBEAT
+    app.config["CHANGE_FEED_MAX_AGE"] = config.CHANGE_FEED_MAX_AGE
+
+    app.config["CACHE_ENABLED"] = config.CACHE_ENABLED
+    app.config["CACHE_BACKEND"] = config.CACHE_BACKEND
+    app.config["CACHE_TTL"] = config.CACHE_TTL
+    app.config["CACHE_MAX_ENTRIES"] = config.CACHE_MAX_ENTRIES
+    app.config["REDIS_URL"] = config.REDIS_URL
+
+    app.config["REVOCATION_BACKEND"] = config.REVOCATION_BACKEND
+    app.config["REVOCATION_SYNC_INTERVAL"] = config.REVOCATION_SYNC_INTERVAL
+
+    app.config["BCRYPT_ROUNDS"] = config.BCRYPT_ROUNDS
+    app.config["PASSWORD_HASH_WORKERS"] = config.PASSWORD_HASH_WORKERS
+    app.config["PASSWORD_HASH_QUEUE"] = config.PASSWORD_HASH_QUEUE
+    app.config["PASSWORD_HASH_TIMEOUT"] = config.PASSWORD_HASH_TIMEOUT
+    app.config["LOGIN_RATE_LIMIT_BACKEND"] = config.LOGIN_RATE_LIMIT_BACKEND
+    app.config["LOGIN_RATE_LIMIT_USER"] = config.LOGIN_RATE_LIMIT_USER
+    app.config["LOGIN_RATE_LIMIT_IP"] = config.LOGIN_RATE_LIMIT_IP
+    app.config["LOGIN_RATE_LIMIT_WINDOW"] = config.LOGIN_RATE_LIMIT_WINDOW
+
+    app.config["IDENTITY_CACHE_TTL"] = config.IDENTITY_CACHE_TTL
+    app.config["IDENTITY_CACHE_MAX_ENTRIES"] = config.IDENTITY_CACHE_MAX_ENTRIES
+
+    app.config["COMPRESSION_ENABLED"] = config.COMPRESSION_ENABLED
+    app.config["COMPRESSION_MIN_SIZE"] = config.COMPRESSION_MIN_SIZE
+    app.config["COMPRESSION_LEVEL"] = config.COMPRESSION_LEVEL
+    app.config["BROTLI_QUALITY"] = config.BROTLI_QUALITY
     
     app.config["JWT_SECRET_KEY"] = JWT_SECRET_KEY
     app.config["JWT_TOKEN_LOCATION"] = ["headers"]
@@ -28,9 +87,19 @@ def create_app():
         "http://localhost:3000",
         "http://127.0.0.1:3000",
         "http://127.0.0.1:5000",
-    ], allow_headers=["Authorization", "Content-Type"])
+    ], allow_headers=["Authorization", "Content-Type", "Last-Event-ID"])
 
     database.init_app(app)
+    queries.init_app(app)
+    instrumentation.init_app(app)
+    search.init_app(app)
+    cache.init_app(app)
+    revocation.init_app(app)
+    passwords.init_app(app)
+    ratelimit.init_app(app)
+    identity.init_app(app)
+    compression.init_app(app)
+    changefeed.init_app(app)
     jwt = JWTManager(app)
 
     @jwt.unauthorized_loader
@@ -51,40 +120,28 @@ def create_app():
     @jwt.token_in_blocklist_loader
     def check_if_token_is_revoked(jwt_header, jwt_payload):
         jti = jwt_payload["jti"]
-        return jti in BLOCKLIST
+        return revocation.is_revoked(jti)
     
     from .user import user_bp
     from .student import student_bp
     from .college import college_bp
     from .program import program_bp
+    from .system import system_bp
+    from .stats import stats_bp
+    from .changes import changes_bp
 
     app.register_blueprint(user_bp)
     app.register_blueprint(student_bp)
     app.register_blueprint(college_bp)
     app.register_blueprint(program_bp)
+    app.register_blueprint(system_bp)
+    app.register_blueprint(stats_bp)
+    app.register_blueprint(changes_bp)
 
-    setup_db.create_tables()
-
-    @app.route("/", defaults={"path": ""})
-    @app.route("/<path:path>")
-    def serve_frontend(path):
-        if path.startswith("api/"):
-            return {"error": "API route not found"}, 404
-
-        static_folder_path = os.path.join(os.path.dirname(__file__), "static")
-
-        print(f"[serve_frontend] Requested path: '{path}'")
-        requested_file = os.path.join(static_folder_path, path)
-        exists = os.path.exists(requested_file)
-        print(f"[serve_frontend] Checking file: {requested_file} - exists={exists}")
-
-        if exists and os.path.isfile(requested_file):
-            return send_from_directory(static_folder_path, path)
-
-
-        index_file = os.path.join(static_folder_path, "index.html")
-        print(f"[serve_frontend] Falling back to index: {index_file} - exists={os.path.exists(index_file)}")
-        return send_from_directory(static_folder_path, "index.html")
+    # Schema changes are an explicit one-shot step ('flask db-upgrade');
+    # by default boot only checks the schema version.
+    database.prepare_schema(app)
 
+    static_assets.init_app(app, os.path.join(os.path.dirname(__file__), "static"))
 
     return app
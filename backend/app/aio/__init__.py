@@ -0,0 +1,67 @@
+"""Optional ASGI serving mode (Quart + asyncpg).
+
+Serves the same /api/auth and /api/dashboard routes as the Flask app
+without holding a thread per in-flight database call::
+
+    uvicorn asgi:app --workers 2
+
+Search, statistics, bulk import/export, batch writes, the change stream
+and the /api/system endpoints are only available in the WSGI app; the
+dashboard only needs the routes served here (its change-stream hook
+treats a 404 as "no live updates").
+"""
+from quart import Quart
+from quart_cors import cors
+
+from app import config, passwords, ratelimit, cache
+from app.aio import db
+
+
+def create_asgi_app():
+    app = Quart(__name__)
+
+    app.config["SECRET_KEY"] = config.SECRET_KEY
+    app.config["DATABASE_URL"] = f"postgresql://{config.DB_USERNAME}:{config.DB_PASSWORD}@{config.DB_HOST}:{config.DB_PORT}/{config.DB_NAME}"
+    from app import JWT_SECRET_KEY
+    app.config["JWT_SECRET_KEY"] = JWT_SECRET_KEY
+    app.config["COLLEGE_COUNTS_TABLE"] = config.COLLEGE_COUNTS_TABLE
+
+    app.config["BCRYPT_ROUNDS"] = config.BCRYPT_ROUNDS
+    app.config["PASSWORD_HASH_WORKERS"] = config.PASSWORD_HASH_WORKERS
+    app.config["PASSWORD_HASH_QUEUE"] = config.PASSWORD_HASH_QUEUE
+    app.config["PASSWORD_HASH_TIMEOUT"] = config.PASSWORD_HASH_TIMEOUT
+    app.config["REDIS_URL"] = config.REDIS_URL
+    app.config["LOGIN_RATE_LIMIT_BACKEND"] = config.LOGIN_RATE_LIMIT_BACKEND
+    app.config["LOGIN_RATE_LIMIT_USER"] = config.LOGIN_RATE_LIMIT_USER
+    app.config["LOGIN_RATE_LIMIT_IP"] = config.LOGIN_RATE_LIMIT_IP
+    app.config["LOGIN_RATE_LIMIT_WINDOW"] = config.LOGIN_RATE_LIMIT_WINDOW
+
+    app = cors(app, allow_credentials=True, allow_origin=[
+        "http://localhost:3000",
+        "http://127.0.0.1:3000",
+        "http://127.0.0.1:5000",
+    ], allow_headers=["Authorization", "Content-Type"])
+
+    passwords.init_app(app)
+    ratelimit.init_app(app)
+    cache.cache.configure(enabled=False)
+
+    @app.before_serving
+    async def open_pool():
+        await db.init_pool(
+            app.config["DATABASE_URL"],
+            min_size=config.DB_POOL_MIN,
+            max_size=config.DB_POOL_MAX,
+            timeout=config.DB_POOL_TIMEOUT,
+            max_idle=config.DB_POOL_MAX_IDLE,
+        )
+
+    @app.after_serving
+    async def close_pool():
+        await db.close_pool()
+
+    from .routes import auth_bp, dashboard_bp
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(dashboard_bp)
+
+    return app
@@ -0,0 +1,112 @@
+"""JWT handling for the ASGI app, compatible with tokens from flask_jwt_extended.
+
+Tokens are HS256 with the identity in ``sub`` and ``type == "access"``, so
+a token issued by either serving mode is accepted by the other.
+Revocations go to the same ``revoked_tokens`` table as
+:class:`app.revocation.PostgresBackend`, whose ids become visible in commit
+order (migration 0012), so the ``id`` watermark never skips a revocation.
+"""
+import datetime
+import functools
+import time
+import uuid
+
+import jwt
+from quart import current_app, g, jsonify, request
+
+from app.aio import db
+
+
+def create_access_token(identity, expires_delta):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    payload = {
+        "fresh": False,
+        "iat": now,
+        "jti": str(uuid.uuid4()),
+        "type": "access",
+        "sub": identity,
+        "nbf": now,
+        "exp": now + expires_delta,
+    }
+    return jwt.encode(payload, current_app.config["JWT_SECRET_KEY"], algorithm="HS256")
+
+
+class AsyncRevocationStore:
+    """Async counterpart of :class:`app.revocation.RevocationStore` (same table, same mirroring)."""
+
+    def __init__(self, sync_interval=2.0):
+        self.sync_interval = sync_interval
+        self._local = {}
+        self._last_seq = 0
+        self._next_sync = 0.0
+
+    async def revoke(self, jti, expires_at):
+        await db.execute(
+            """INSERT INTO revoked_tokens (jti, expires_at)
+               VALUES ($1, to_timestamp($2))
+               ON CONFLICT (jti) DO NOTHING""",
+            jti, float(expires_at)
+        )
+        self._local[jti] = expires_at
+
+    async def is_revoked(self, jti):
+        now = time.time()
+        if now >= self._next_sync:
+            self._next_sync = now + self.sync_interval
+            try:
+                rows = await db.fetch(
+                    """SELECT id, jti, EXTRACT(EPOCH FROM expires_at)
+                       FROM revoked_tokens
+                       WHERE id > $1 AND expires_at > NOW()
+                       ORDER BY id""",
+                    self._last_seq
+                )
+                for seq, revoked_jti, exp in rows:
+                    self._local[revoked_jti] = float(exp)
+                    self._last_seq = seq
+                for expired in [j for j, exp in list(self._local.items()) if exp <= now]:
+                    self._local.pop(expired, None)
+            except Exception as e:
+                print(f"[revocation] Sync failed: {e}")
+        return jti in self._local
+
+
+revocations = AsyncRevocationStore()
+
+
+def _token_from_header():
+    header = request.headers.get("Authorization", "")
+    parts = header.split()
+    if len(parts) != 2 or parts[0] != "Bearer":
+        return None
+    return parts[1]
+
+
+def jwt_required(view):
+    """Mirror of ``flask_jwt_extended.jwt_required()`` and the loaders in ``create_app``."""
+    @functools.wraps(view)
+    async def wrapper(*args, **kwargs):
+        token = _token_from_header()
+        if token is None:
+            return jsonify({"error": "Missing Authorization Header", "detail": "Missing Authorization Header"}), 401
+        try:
+            payload = jwt.decode(token, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"])
+        except jwt.ExpiredSignatureError:
+            return jsonify({"error": "Token has expired"}), 401
+        except jwt.InvalidTokenError as e:
+            return jsonify({"error": "Invalid token", "detail": str(e)}), 422
+        if payload.get("type") != "access":
+            return jsonify({"error": "Invalid token", "detail": "Only access tokens are allowed"}), 422
+        if await revocations.is_revoked(payload["jti"]):
+            return jsonify({"msg": "Token has been revoked"}), 401
+        g.jwt = payload
+        return await view(*args, **kwargs)
+    return wrapper
+
+
+def get_jwt():
+    return g.jwt
+
+
+def get_jwt_identity():
+    return g.jwt["sub"]
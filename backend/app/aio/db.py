@@ -0,0 +1,50 @@
+import asyncpg
+
+from app.queries import to_positional
+
+_pool = None
+
+# Same translation the sync query registry uses for PREPARE; lets the async
+# layer reuse the SQL fragments built for the sync models.
+pg = to_positional
+
+
+async def init_pool(dsn, min_size=1, max_size=10, timeout=30.0, max_idle=300.0):
+    global _pool
+    _pool = await asyncpg.create_pool(
+        dsn,
+        min_size=min_size,
+        max_size=max_size,
+        timeout=timeout,
+        max_inactive_connection_lifetime=max_idle,
+    )
+    return _pool
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def get_pool():
+    if _pool is None:
+        raise RuntimeError("asyncpg pool is not initialised")
+    return _pool
+
+
+async def fetch(sql, *args):
+    return await get_pool().fetch(sql, *args)
+
+
+async def fetchrow(sql, *args):
+    return await get_pool().fetchrow(sql, *args)
+
+
+async def fetchval(sql, *args):
+    return await get_pool().fetchval(sql, *args)
+
+
+async def execute(sql, *args):
+    return await get_pool().execute(sql, *args)
@@ -0,0 +1,321 @@
+"""Async mirror of :mod:`app.models` on asyncpg.
+
+Method names and return values follow the sync models; SQL fragments
+are shared with them and translated with :func:`app.aio.db.pg`.
+"""
+import asyncio
+
+import asyncpg
+
+from app import passwords, queries
+from app import models as sync_models
+from app.aio import db
+from app.aio.db import pg
+
+Conflict = sync_models.Conflict
+
+
+async def in_executor(fn, *args):
+    """Run a blocking call (bcrypt, a Redis round trip) on the default executor."""
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+async def _move_stats(conn, old=None, new=None):
+    """Async counterpart of ``EnrolmentStats.move``."""
+    if old is not None and new is not None and tuple(old) == tuple(new):
+        return
+    sql = pg(queries.sql("stats.cell"))
+    if old is not None:
+        await conn.execute(sql, *old, -1)
+    if new is not None:
+        await conn.execute(sql, *new, 1)
+
+
+class Users:
+    def __init__(self, id=None, username=None, password=None, email=None):
+        self.id = id
+        self.username = username
+        self.password = password
+        self.email = email
+
+    @classmethod
+    async def get_by_id(cls, user_id):
+        row = await db.fetchrow(
+            "SELECT id, username, email, user_password FROM users WHERE id = $1", user_id
+        )
+        if row:
+            return cls(id=row[0], username=row[1], email=row[2], password=row[3])
+        return None
+
+    @classmethod
+    async def get_by_username(cls, username):
+        row = await db.fetchrow(
+            "SELECT id, username, email, user_password FROM users WHERE username = $1", username
+        )
+        if row:
+            return cls(id=row[0], username=row[1], email=row[2], password=row[3])
+        return None
+
+    async def check_password(self, password):
+        if not self.password:
+            return False
+        return await in_executor(passwords.verify_password, password, self.password)
+
+    def needs_rehash(self):
+        return bool(self.password) and passwords.needs_rehash(self.password)
+
+    async def rehash_password(self, password):
+        password_to_store = await in_executor(passwords.hash_password, password)
+        await db.execute(
+            "UPDATE users SET user_password = $1 WHERE id = $2", password_to_store, self.id
+        )
+        self.password = password_to_store
+
+
+class College:
+    @staticmethod
+    async def all_with_counts(use_counts_table=False):
+        sql = sync_models.COLLEGE_COUNTS_TABLE_SQL if use_counts_table else sync_models.COLLEGE_COUNTS_SQL
+        rows = await db.fetch(sql)
+        return [sync_models.CollegeRow._make(r).to_dict() for r in rows]
+
+    @staticmethod
+    async def add(college_code, college_name):
+        try:
+            college_id = await db.fetchval(pg(queries.sql("college.add")), college_code, college_name)
+        except asyncpg.UniqueViolationError as e:
+            raise Conflict(sync_models.COLLEGE_CONFLICTS.get(e.constraint_name, "College already exists"))
+        if college_id is None:
+            raise Conflict("College already exists")
+        return college_id
+
+    @staticmethod
+    async def delete_college(college_id):
+        async with db.get_pool().acquire() as conn:
+            async with conn.transaction():
+                code = await conn.fetchval(pg(queries.sql("college.delete")), college_id)
+                if code is None:
+                    return False, "College not found"
+                await conn.execute(pg(sync_models.ENROLMENT_DETACH_SQL["college_id"]), [college_id])
+        return True, f"College '{code}' deleted successfully"
+
+    @staticmethod
+    async def update_college(college_id, college_code, college_name):
+        try:
+            updated = await db.fetchval(
+                pg(queries.sql("college.update")), college_code, college_name, college_id
+            )
+        except asyncpg.UniqueViolationError as e:
+            raise Conflict({
+                **sync_models.COLLEGE_CONFLICTS,
+                "colleges_lower_name_key": "College name already taken by another college",
+            }.get(e.constraint_name, "College name already taken by another college"))
+        except Exception as e:
+            print(f"Error updating college: {e}")
+            return False
+        if updated is None:
+            return False
+        return True
+
+    @staticmethod
+    async def exists(college_name):
+        return await db.fetchval(
+            "SELECT 1 FROM colleges WHERE LOWER(college_name) = LOWER($1)", college_name
+        ) is not None
+
+    @staticmethod
+    async def is_name_taken(college_name, exclude_id):
+        return await db.fetchval(
+            "SELECT 1 FROM colleges WHERE LOWER(college_name) = LOWER($1) AND id != $2",
+            college_name, exclude_id
+        ) is not None
+
+
+class Program:
+    @staticmethod
+    async def all():
+        rows = await db.fetch(sync_models.PROGRAM_ALL_SQL)
+        return [sync_models.ProgramRow._make(r).to_dict() for r in rows]
+
+    @staticmethod
+    async def add(program_code, program_name, college_id):
+        try:
+            program_id = await db.fetchval(
+                pg(queries.sql("program.add")), program_code, program_name, college_id
+            )
+        except asyncpg.UniqueViolationError as e:
+            raise Conflict(sync_models.PROGRAM_CONFLICTS.get(e.constraint_name, "Program name already exists"))
+        if program_id is None:
+            raise Conflict("Program name already exists")
+        return program_id
+
+    @staticmethod
+    async def delete_program(program_id):
+        async with db.get_pool().acquire() as conn:
+            async with conn.transaction():
+                code = await conn.fetchval(pg(queries.sql("program.delete")), program_id)
+                if code is None:
+                    return False, "Program not found"
+                await conn.execute(pg(sync_models.ENROLMENT_DETACH_SQL["program_id"]), [program_id])
+        return True, f"Program '{code}' deleted successfully"
+
+    @staticmethod
+    async def update_program(program_id, program_code, program_name, college_id):
+        try:
+            updated = await db.fetchval(
+                pg(queries.sql("program.update")), program_code, program_name, college_id, program_id
+            )
+        except asyncpg.UniqueViolationError as e:
+            raise Conflict(sync_models.PROGRAM_CONFLICTS.get(e.constraint_name, "Program name already exists"))
+        except Exception as e:
+            print(f"Error updating program: {e}")
+            return False
+        if updated is None:
+            return False
+        return True
+
+    @staticmethod
+    async def exists(program_name):
+        return await db.fetchval(
+            "SELECT 1 FROM programs WHERE LOWER(program_name) = LOWER($1)", program_name
+        ) is not None
+
+    @staticmethod
+    async def is_name_taken(program_name, exclude_id):
+        return await db.fetchval(
+            "SELECT 1 FROM programs WHERE LOWER(program_name) = LOWER($1) AND id != $2",
+            program_name, exclude_id
+        ) is not None
+
+
+def _student_dict(row):
+    return dict(row)
+
+
+class Student:
+    @staticmethod
+    async def all():
+        rows = await db.fetch(sync_models.STUDENT_SELECT)
+        return [_student_dict(r) for r in rows]
+
+    @staticmethod
+    async def page(limit=50, cursor_key=None, sort="student_id", order="asc",
+                   include_total=False, **filters):
+        """Async counterpart of ``Student.page``; same keyset semantics."""
+        sort_expr = sync_models.STUDENT_SORT_COLUMNS[sort]
+        direction = "DESC" if order == "desc" else "ASC"
+        comparator = "<" if order == "desc" else ">"
+
+        clauses, params = sync_models.Student.build_filters(**filters)
+        filter_clauses, filter_params = list(clauses), list(params)
+
+        if cursor_key is not None:
+            last_value, last_id = cursor_key
+            if sort == "student_id":
+                clauses.append(f"s.student_id {comparator} %s")
+                params.append(last_id)
+            else:
+                clauses.append(f"({sort_expr}, s.student_id) {comparator} (%s, %s)")
+                params.extend([last_value, last_id])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        if sort == "student_id":
+            order_by = f"ORDER BY s.student_id {direction}"
+        else:
+            order_by = f"ORDER BY {sort_expr} {direction}, s.student_id {direction}"
+
+        rows = await db.fetch(
+            pg(f"{sync_models.STUDENT_SELECT} {where} {order_by} LIMIT %s"), *params, limit + 1
+        )
+
+        total = None
+        if include_total:
+            count_where = f"WHERE {' AND '.join(filter_clauses)}" if filter_clauses else ""
+            total = await db.fetchval(pg(f"""
+                SELECT COUNT(*)
+                FROM students s
+                LEFT JOIN programs p ON s.program_id = p.id
+                {count_where}
+            """), *filter_params)
+
+        has_more = len(rows) > limit
+        students = [_student_dict(r) for r in rows[:limit]]
+        next_key = None
+        if has_more and students:
+            last = students[-1]
+            next_key = (last[sort], last["student_id"])
+        return students, next_key, has_more, total
+
+    @staticmethod
+    async def add(id_number, last_name, first_name, gender, year_level, college_id, program_id, photo_url):
+        async with db.get_pool().acquire() as conn:
+            async with conn.transaction():
+                student_id = await conn.fetchval(
+                    pg(queries.sql("student.add")),
+                    id_number, last_name, first_name, gender, year_level, college_id, program_id, photo_url
+                )
+                if student_id is None:
+                    raise Conflict("ID number already exists")
+                await _move_stats(conn, new=(college_id, program_id, year_level, gender))
+
+    @staticmethod
+    async def delete_by_id_number(id_number):
+        try:
+            async with db.get_pool().acquire() as conn:
+                async with conn.transaction():
+                    old = await conn.fetchrow(pg(queries.sql("student.delete")), id_number)
+                    if old is not None:
+                        await _move_stats(conn, old=old)
+        except Exception as e:
+            print(f"Error deleting student: {e}")
+            return False
+        if old is None:
+            return False
+        return True
+
+    @staticmethod
+    async def update_by_id_number(id_number, last_name, first_name, gender, year_level, college_id, program_id, photo_url):
+        try:
+            async with db.get_pool().acquire() as conn:
+                async with conn.transaction():
+                    old = await conn.fetchrow(
+                        pg(queries.sql("student.update")),
+                        last_name, first_name, gender, year_level, college_id, program_id, photo_url, id_number
+                    )
+                    if old is not None:
+                        await _move_stats(conn, old=old, new=(college_id, program_id, year_level, gender))
+        except Exception as e:
+            print(f"Error updating student: {e}")
+            return False
+        return old is not None
+
+    @staticmethod
+    async def exists(id_number):
+        return await db.fetchval(
+            "SELECT 1 FROM students WHERE id_number = $1", id_number
+        ) is not None
+
+    @staticmethod
+    async def facets(**filters):
+        """Async counterpart of ``Student.facets``; same response shape."""
+        clauses, params = sync_models.Student.build_filters(**filters)
+        if clauses:
+            rows = await db.fetch(pg(sync_models.STUDENT_FACETS_SCOPED_SQL.format(
+                where=f"WHERE {' AND '.join(clauses)}"
+            )), *params)
+        else:
+            rows = await db.fetch(queries.sql("student.facets"))
+        counts = sync_models.Student.facet_counts(rows, scoped=bool(clauses))
+        colleges = await db.fetch(queries.sql("student.facets.colleges"))
+        programs = await db.fetch(queries.sql("student.facets.programs"))
+        return sync_models.Student.shape_facets(counts, colleges, programs)
+
+    @staticmethod
+    async def get_year_levels():
+        rows = await db.fetch(queries.sql("student.year_levels"))
+        return sync_models.Student.normalise_year_levels(r[0] for r in rows)
+
+    @staticmethod
+    async def get_genders():
+        rows = await db.fetch(queries.sql("student.genders"))
+        return sync_models.Student.normalise_genders(r[0] for r in rows)
@@ -0,0 +1,417 @@
+"""Async versions of the /api/auth and /api/dashboard routes.
+
+Request validation, status codes and response bodies follow the sync
+controllers in ``app/user``, ``app/student``, ``app/college`` and
+``app/program``.
+"""
+import datetime
+import re
+
+import asyncpg
+from quart import Blueprint, current_app, jsonify, request
+
+from app import passwords, ratelimit
+from app.aio import models
+from app.aio.auth import create_access_token, get_jwt, get_jwt_identity, jwt_required, revocations
+from app.student import importer
+from app.student.controller import decode_cursor, encode_cursor, parse_ids, parse_limit
+from app.models import STUDENT_SORT_COLUMNS
+
+auth_bp = Blueprint("aio_user", __name__, url_prefix="/api/auth")
+dashboard_bp = Blueprint("aio_dashboard", __name__, url_prefix="/api/dashboard")
+
+CATALOG_NAME_REGEX = r"^[A-Za-z\s,\-]+$"
+
+
+def _int_or_none(value):
+    if value in (None, ""):
+        return None
+    return int(value)
+
+
+def _int_arg(name):
+    try:
+        return _int_or_none(request.args.get(name))
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+
+
+def _str_or_none(value):
+    # psycopg2 adapts numbers for varchar columns; asyncpg does not.
+    return None if value is None else str(value)
+
+
+# --- auth -----------------------------------------------------------------
+
+@auth_bp.route("/login", methods=["POST"])
+async def login():
+    data = await request.get_json()
+    username = data.get("username")
+    password = data.get("password")
+
+    user_key = f"user:{(username or '').strip().lower()}"
+    # The limiters may be Redis-backed, which blocks; keep them off the loop.
+    for limiter, key in ((ratelimit.login_by_ip, f"ip:{request.remote_addr}"), (ratelimit.login_by_user, user_key)):
+        allowed, retry_after = await models.in_executor(limiter.hit, key)
+        if not allowed:
+            response = jsonify({"message": "Too many login attempts, try again later"})
+            response.headers["Retry-After"] = str(retry_after)
+            return response, 429
+
+    try:
+        user = await models.Users.get_by_username(username)
+        valid = bool(user and await user.check_password(password))
+        if valid and user.needs_rehash():
+            await user.rehash_password(password)
+    except passwords.HasherBusy:
+        response = jsonify({"message": "Server busy, try again shortly"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+
+    if valid:
+        await models.in_executor(ratelimit.login_by_user.reset, user_key)
+        access_token = create_access_token(
+            identity=str(user.id),
+            expires_delta=datetime.timedelta(minutes=5)
+        )
+        return jsonify(message="Login successful", access_token=access_token), 200
+    return jsonify({"message": "Invalid credentials"}), 401
+
+
+@auth_bp.route("/logout", methods=["POST"])
+@jwt_required
+async def logout():
+    payload = get_jwt()
+    await revocations.revoke(payload["jti"], payload["exp"])
+    return jsonify({"success": True, "message": "Token has been successfully blocklisted"}), 200
+
+
+@auth_bp.route("/me", methods=["GET"])
+@jwt_required
+async def get_current_user():
+    try:
+        user_id = int(get_jwt_identity())
+    except Exception:
+        user_id = get_jwt_identity()
+    user = await models.Users.get_by_id(user_id)
+    if user:
+        return jsonify({"id": user.id, "username": user.username, "email": user.email}), 200
+    return jsonify({"message": "User not found"}), 404
+
+
+# --- students -------------------------------------------------------------
+
+@dashboard_bp.route("/students", methods=["GET"])
+@jwt_required
+async def list_students():
+    if not request.args:
+        return jsonify(await models.Student.all())
+
+    sort = request.args.get("sort", "student_id")
+    order = request.args.get("order", "asc").lower()
+    if sort not in STUDENT_SORT_COLUMNS:
+        return jsonify({"error": f"Cannot sort by '{sort}'"}), 400
+    if order not in ("asc", "desc"):
+        return jsonify({"error": "'order' must be 'asc' or 'desc'"}), 400
+
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        college_id = _int_arg("college_id")
+        program_id = _int_arg("program_id")
+        ids = parse_ids(request.args.get("ids"))
+        cursor_key = decode_cursor(request.args["cursor"], sort) if request.args.get("cursor") else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    include_total = request.args.get("include_total", "").lower() in ("1", "true", "yes")
+    students, next_key, has_more, total = await models.Student.page(
+        limit=limit,
+        cursor_key=cursor_key,
+        sort=sort,
+        order=order,
+        include_total=include_total,
+        college_id=college_id,
+        program_id=program_id,
+        gender=request.args.get("gender", "").strip().capitalize() or None,
+        year_level=request.args.get("year_level", "").strip() or None,
+        q=request.args.get("q", "").strip() or None,
+        ids=ids,
+    )
+    response = {
+        "students": students,
+        "has_more": has_more,
+        "next_cursor": encode_cursor(next_key) if next_key else None,
+    }
+    if include_total:
+        response["total"] = total
+    return jsonify(response)
+
+
+@dashboard_bp.route("/students/facets", methods=["GET"])
+@jwt_required
+async def student_facets():
+    try:
+        college_id = _int_arg("college_id")
+        program_id = _int_arg("program_id")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(await models.Student.facets(
+        college_id=college_id,
+        program_id=program_id,
+        gender=request.args.get("gender", "").strip().capitalize() or None,
+        year_level=request.args.get("year_level", "").strip() or None,
+        q=request.args.get("q", "").strip() or None,
+    ))
+
+
+@dashboard_bp.route("/students/year-levels", methods=["GET"])
+@jwt_required
+async def get_year_levels():
+    try:
+        return jsonify(await models.Student.get_year_levels()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@dashboard_bp.route("/students/genders", methods=["GET"])
+@jwt_required
+async def get_genders():
+    try:
+        return jsonify(await models.Student.get_genders()), 200
+    except Exception as e:
+        print(f"Error fetching genders: {e}")
+        return jsonify({"error": "Failed to fetch genders"}), 500
+
+
+@dashboard_bp.route("/students", methods=["POST"])
+@jwt_required
+async def add_student():
+    data = await request.get_json()
+
+    required_fields = ["id_number", "last_name", "first_name", "gender", "year_level", "college_id", "program_id"]
+    for field in required_fields:
+        if not data.get(field):
+            return jsonify({"error": f"'{field}' is required"}), 400
+
+    if not re.match(importer.NAME_REGEX, data["first_name"]) or not re.match(importer.NAME_REGEX, data["last_name"]):
+        return jsonify({"error": "Names should contain only letters and spaces"}), 400
+
+    if not re.match(importer.ID_REGEX, data["id_number"]):
+        return jsonify({"error": "ID number must follow the format XXXX-XXXX (digits only)"}), 400
+
+    try:
+        college_id = _int_or_none(data.get("college_id"))
+        program_id = _int_or_none(data.get("program_id"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "college_id and program_id must be integers"}), 400
+
+    student = {
+        "id_number": data.get("id_number"),
+        "last_name": data["last_name"].strip().title(),
+        "first_name": data["first_name"].strip().title(),
+        "gender": _str_or_none(data.get("gender")),
+        "year_level": _str_or_none(data.get("year_level")),
+        "college_id": college_id,
+        "program_id": program_id,
+        "photo_url": data.get("photo_url"),
+    }
+    try:
+        await models.Student.add(**student)
+    except models.Conflict as e:
+        return jsonify({"error": str(e)}), 400
+    except (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError) as e:
+        return jsonify({"error": "Invalid student data", "detail": str(e)}), 400
+    return jsonify({"message": "Student added successfully", "student": student}), 201
+
+
+@dashboard_bp.route("/students/<string:id_number>", methods=["DELETE"])
+@jwt_required
+async def delete_student(id_number):
+    if await models.Student.delete_by_id_number(id_number):
+        return jsonify({"message": f"Student {id_number} deleted successfully"}), 200
+    return jsonify({"error": f"Failed to delete student {id_number}"}), 400
+
+
+@dashboard_bp.route("/students/<string:id_number>", methods=["PUT"])
+@jwt_required
+async def update_student(id_number):
+    data = await request.get_json()
+    try:
+        college_id = _int_or_none(data.get("college_id"))
+        program_id = _int_or_none(data.get("program_id"))
+    except (TypeError, ValueError):
+        return jsonify({"error": f"Failed to update student {id_number}"}), 400
+    success = await models.Student.update_by_id_number(
+        id_number=id_number,
+        last_name=_str_or_none(data.get("last_name")),
+        first_name=_str_or_none(data.get("first_name")),
+        gender=_str_or_none(data.get("gender")),
+        year_level=_str_or_none(data.get("year_level")),
+        college_id=college_id,
+        program_id=program_id,
+        photo_url=data.get("photo_url")
+    )
+    if success:
+        return jsonify({"message": f"Student {id_number} updated successfully"}), 200
+    return jsonify({"error": f"Failed to update student {id_number}"}), 400
+
+
+# --- colleges -------------------------------------------------------------
+
+@dashboard_bp.route("/colleges", methods=["GET"], strict_slashes=False)
+@jwt_required
+async def get_colleges():
+    colleges = await models.College.all_with_counts(
+        use_counts_table=current_app.config.get("COLLEGE_COUNTS_TABLE", False)
+    )
+    return jsonify({"colleges": colleges})
+
+
+@dashboard_bp.route("/colleges", methods=["POST"])
+@jwt_required
+async def add_college():
+    data = await request.get_json()
+    college_code = (data.get("college_code") or "").strip()
+    college_name = data.get("college_name", "").strip().lower()
+
+    if not college_name or not college_code:
+        return jsonify({"error": "College name and code are required"}), 400
+
+    if not re.match(CATALOG_NAME_REGEX, data["college_name"]) or not re.match(CATALOG_NAME_REGEX, data["college_code"]):
+        return jsonify({"error": "Names should contain only letters and spaces"}), 400
+
+    formatted_name = data["college_name"].strip().title()
+    try:
+        college_id = await models.College.add(data.get("college_code"), formatted_name)
+    except models.Conflict as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "message": "College added successfully",
+        "college": {
+            "id": college_id,
+            "college_code": data.get("college_code"),
+            "college_name": formatted_name
+        }
+    }), 201
+
+
+@dashboard_bp.route("/colleges/<int:college_id>", methods=["DELETE"])
+@jwt_required
+async def delete_college(college_id):
+    success, msg = await models.College.delete_college(college_id)
+    if success:
+        return jsonify({"message": msg})
+    return jsonify({"error": msg}), 404
+
+
+@dashboard_bp.route("/colleges/<int:college_id>", methods=["PUT"])
+@jwt_required
+async def update_college(college_id):
+    data = await request.get_json()
+    college_name = data.get("college_name", "").strip().lower()
+
+    if not college_name or not data.get("college_code"):
+        return jsonify({"error": "College name and code are required"}), 400
+
+    if not re.match(CATALOG_NAME_REGEX, data["college_name"]) or not re.match(CATALOG_NAME_REGEX, data["college_code"]):
+        return jsonify({"error": "Names should contain only letters and spaces"}), 400
+
+    formatted_name = data["college_name"].strip().title()
+    try:
+        updated = await models.College.update_college(college_id, data["college_code"], formatted_name)
+    except models.Conflict as e:
+        return jsonify({"error": str(e)}), 400
+    if updated:
+        return jsonify({
+            "message": "College updated successfully",
+            "college": {
+                "id": college_id,
+                "college_code": data["college_code"],
+                "college_name": formatted_name
+            }}), 200
+    return jsonify({"error": "Failed to update college"}), 400
+
+
+# --- programs -------------------------------------------------------------
+
+@dashboard_bp.route("/programs", methods=["GET"], strict_slashes=False)
+@jwt_required
+async def get_programs():
+    return jsonify({"programs": await models.Program.all()}), 200
+
+
+@dashboard_bp.route("/programs", methods=["POST"])
+@jwt_required
+async def add_program():
+    try:
+        data = await request.get_json(force=True)
+        program_code = data.get("program_code").strip()
+        program_name = data.get("program_name").strip().lower()
+        college_id = data.get("college_id")
+
+        if not (program_code and program_name and college_id):
+            return jsonify({"error": "program_code, program_name and college_id are required"}), 400
+
+        if not re.match(CATALOG_NAME_REGEX, data["program_name"]) or not re.match(CATALOG_NAME_REGEX, data["program_code"]):
+            return jsonify({"error": "Names should contain only letters and spaces"}), 400
+
+        formatted_name = data["program_name"].strip().title()
+        college_id = int(college_id)
+        try:
+            program_id = await models.Program.add(program_code, formatted_name, college_id)
+        except models.Conflict as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({
+            "message": "Program added successfully",
+            "program": {
+                "id": program_id,
+                "program_code": program_code,
+                "program_name": formatted_name,
+                "college_id": college_id
+            }
+        }), 201
+    except Exception as e:
+        return jsonify({"error": "Failed to add program", "detail": str(e)}), 400
+
+
+@dashboard_bp.route("/programs/<int:program_id>", methods=["DELETE"], strict_slashes=False)
+@jwt_required
+async def delete_program(program_id):
+    try:
+        success, message = await models.Program.delete_program(program_id)
+        if success:
+            return jsonify({"message": message}), 200
+        return jsonify({"error": message}), 404
+    except Exception as e:
+        print(f"Error in delete_program route: {e}")
+        return jsonify({"error": "Failed to delete program"}), 500
+
+
+@dashboard_bp.route("/programs/<int:program_id>", methods=["PUT"])
+@jwt_required
+async def update_program(program_id):
+    try:
+        data = await request.get_json(force=True)
+        program_code = data.get("program_code")
+        program_name = data.get("program_name").strip().lower()
+        college_id = data.get("college_id")
+
+        if not (program_code and program_name and college_id):
+            return jsonify({"error": "All fields required"}), 400
+
+        name_regex = r"^[A-Za-z\s]+$"
+        if not re.match(name_regex, data["program_name"]) or not re.match(name_regex, data["program_code"]):
+            return jsonify({"error": "Names should contain only letters and spaces"}), 400
+
+        formatted_name = data["program_name"].strip().title()
+        try:
+            updated = await models.Program.update_program(program_id, program_code, formatted_name, int(college_id))
+        except models.Conflict as e:
+            return jsonify({"error": str(e)}), 400
+        if updated:
+            return jsonify({"message": "Program updated successfully"}), 200
+        return jsonify({"error": "Failed to update program"}), 400
+    except Exception as e:
+        print(f"Error updating program: {e}")
+        return jsonify({"error": "Server error"}), 500
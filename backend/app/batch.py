@@ -0,0 +1,460 @@
+import re
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from app.database import get_db
+from app.models import EnrolmentStats
+from app.student.importer import NAME_REGEX, ID_REGEX, GENDERS, YEAR_LEVELS, INT_MIN, INT_MAX
+
+ATOMIC = "atomic"
+BEST_EFFORT = "best_effort"
+MODES = (ATOMIC, BEST_EFFORT)
+OPERATIONS = ("create", "update", "delete")
+
+MAX_OPERATIONS = 5000
+
+CATALOG_NAME_REGEX = r"^[A-Za-z\s,\-]+$"
+
+
+def _text(pattern, message, transform=None):
+    compiled = re.compile(pattern)
+
+    def rule(value):
+        if not isinstance(value, str) or not value.strip():
+            return None, message
+        value = value.strip()
+        if not compiled.match(value):
+            return None, message
+        return (transform(value) if transform else value), None
+    return rule
+
+
+def _choice(choices, transform=None):
+    def rule(value):
+        value = str(value).strip() if value is not None else ""
+        if transform:
+            value = transform(value)
+        if value not in choices:
+            return None, f"must be one of {', '.join(choices)}"
+        return value, None
+    return rule
+
+
+def _integer(value):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None, "must be an integer"
+    if not INT_MIN <= value <= INT_MAX:
+        return None, "is out of range"
+    return value, None
+
+
+def _optional_text(value):
+    if value is None:
+        return None, None
+    return str(value).strip() or None, None
+
+
+class EntitySpec:
+    """Describes how batch operations map onto one table.
+
+    ``columns`` maps each writable column to ``(sql_type, rule, required)``;
+    ``rule(value)`` returns ``(normalised_value, error)``.  ``after_apply``
+    receives the applied changes as ``(key, old, new)`` tuples, where
+    ``old``/``new`` hold the ``tracked`` columns, or ``None`` for a row that
+    did not exist before or no longer exists.
+    """
+
+    def __init__(self, table, key, key_type, columns, create_key=False, tracked=(),
+                 check_conflicts=None, after_apply=None):
+        self.table = table
+        self.key = key
+        self.key_type = key_type
+        self.columns = columns
+        self.create_key = create_key
+        self.tracked = tuple(tracked)
+        self.check_conflicts = check_conflicts
+        self.after_apply = after_apply
+
+    def validate(self, op, data):
+        if not isinstance(data, dict):
+            return None, "'data' must be an object"
+        values = {}
+        for column, (_, rule, required) in self.columns.items():
+            if column not in data:
+                if op == "create" and required:
+                    return None, f"'{column}' is required"
+                continue
+            value, error = rule(data[column])
+            if error:
+                return None, f"'{column}' {error}" if not error[0].isupper() else error
+            values[column] = value
+        if op == "update" and not values:
+            return None, "Nothing to update"
+        return values, None
+
+    def parse_key(self, value):
+        if self.key_type == "integer":
+            value, error = _integer(value)
+            return value, (f"'{self.key}' {error}" if error else None)
+        if not isinstance(value, str) or not value.strip():
+            return None, f"'{self.key}' is required"
+        return value.strip(), None
+
+
+def _student_conflicts(cursor, items):
+    creates = [it for it in items if it["op"] == "create"]
+    if not creates:
+        return {}
+    cursor.execute(
+        "SELECT id_number FROM students WHERE id_number = ANY(%s)",
+        ([it["values"]["id_number"] for it in creates],)
+    )
+    taken = {row[0] for row in cursor.fetchall()}
+
+    # Later creates of an id_number already used in this batch conflict too,
+    # as they would with a committed row.
+    conflicts = {}
+    for it in creates:
+        id_number = it["values"]["id_number"]
+        if id_number in taken:
+            conflicts[it["index"]] = "ID number already exists"
+        taken.add(id_number)
+    return conflicts
+
+
+def _name_conflicts(table, column, key, message):
+    def check(cursor, items):
+        named = [it for it in items if it["op"] in ("create", "update") and column in it["values"]]
+        if not named:
+            return {}
+        cursor.execute(
+            f"SELECT {key}, LOWER({column}) FROM {table} WHERE LOWER({column}) = ANY(%s)",
+            ([it["values"][column].lower() for it in named],)
+        )
+        owners = {}
+        for row_key, name in cursor.fetchall():
+            owners.setdefault(name, set()).add(row_key)
+
+        conflicts = {}
+        seen = {}
+        for it in named:
+            name = it["values"][column].lower()
+            other_owners = owners.get(name, set()) - {it.get("key")}
+            if other_owners or name in seen:
+                conflicts[it["index"]] = message
+            seen[name] = it["index"]
+        return conflicts
+    return check
+
+
+STATS_CELL = ("college_id", "program_id", "year_level", "gender")
+
+
+def _student_stats(cursor, changes):
+    deltas = {}
+    for _, old, new in changes:
+        if old is not None:
+            deltas[old] = deltas.get(old, 0) - 1
+        if new is not None:
+            deltas[new] = deltas.get(new, 0) + 1
+    EnrolmentStats.apply(cursor, deltas)
+
+
+def _detach_stats(column):
+    def hook(cursor, changes):
+        deleted = [key for key, _, new in changes if new is None]
+        if deleted:
+            EnrolmentStats.detach(cursor, column, deleted)
+    return hook
+
+
+STUDENTS = EntitySpec(
+    table="students",
+    key="id_number",
+    key_type="varchar",
+    create_key=True,
+    columns={
+        "id_number": ("varchar", _text(ID_REGEX, "ID number must follow the format XXXX-XXXX (digits only)"), True),
+        "last_name": ("varchar", _text(NAME_REGEX, "Names should contain only letters and spaces", str.title), True),
+        "first_name": ("varchar", _text(NAME_REGEX, "Names should contain only letters and spaces", str.title), True),
+        "gender": ("varchar", _choice(GENDERS, str.capitalize), True),
+        "year_level": ("varchar", _choice(YEAR_LEVELS), True),
+        "college_id": ("integer", _integer, True),
+        "program_id": ("integer", _integer, True),
+        "photo_url": ("text", _optional_text, False),
+    },
+    tracked=STATS_CELL,
+    check_conflicts=_student_conflicts,
+    after_apply=_student_stats,
+)
+
+COLLEGES = EntitySpec(
+    table="colleges",
+    key="id",
+    key_type="integer",
+    columns={
+        "college_code": ("varchar", _text(CATALOG_NAME_REGEX, "Names should contain only letters and spaces"), True),
+        "college_name": ("varchar", _text(CATALOG_NAME_REGEX, "Names should contain only letters and spaces", str.title), True),
+    },
+    check_conflicts=_name_conflicts("colleges", "college_name", "id", "College already exists"),
+    after_apply=_detach_stats("college_id"),
+)
+
+PROGRAMS = EntitySpec(
+    table="programs",
+    key="id",
+    key_type="integer",
+    columns={
+        "program_code": ("varchar", _text(CATALOG_NAME_REGEX, "Names should contain only letters and spaces"), True),
+        "program_name": ("varchar", _text(CATALOG_NAME_REGEX, "Names should contain only letters and spaces", str.title), True),
+        "college_id": ("integer", _integer, True),
+    },
+    check_conflicts=_name_conflicts("programs", "program_name", "id", "Program name already exists"),
+    after_apply=_detach_stats("program_id"),
+)
+
+
+def _ok(results, item, **extra):
+    results[item["index"]] = {"index": item["index"], "op": item["op"], "status": "ok", **extra}
+
+
+def _fail(results, item, error):
+    results[item["index"]] = {"index": item["index"], "op": item["op"], "status": "error", "error": error}
+
+
+def _apply(cursor, spec, items, results, changes):
+    """Apply ``items`` set-wise: one statement per op type (per column set for updates).
+
+    Appends ``(key, old, new)`` for every applied item to ``changes``.
+    Returns True if any item failed.  Database errors propagate.
+    """
+    failed = False
+    returning = ", ".join((spec.key,) + spec.tracked)
+
+    if spec.check_conflicts:
+        conflicts = spec.check_conflicts(cursor, items)
+        if conflicts:
+            failed = True
+            for it in items:
+                if it["index"] in conflicts:
+                    _fail(results, it, conflicts[it["index"]])
+            items = [it for it in items if it["index"] not in conflicts]
+
+    creates = [it for it in items if it["op"] == "create"]
+    if creates:
+        columns = list(spec.columns)
+        rows = execute_values(
+            cursor,
+            f"INSERT INTO {spec.table} ({', '.join(columns)}) VALUES %s RETURNING {returning}",
+            [tuple(it["values"].get(c) for c in columns) for it in creates],
+            page_size=len(creates),
+            fetch=True,
+        )
+        for it, row in zip(creates, rows):
+            _ok(results, it, key=row[0])
+            changes.append((row[0], None, tuple(row[1:])))
+
+    groups = {}
+    for it in items:
+        if it["op"] == "update":
+            groups.setdefault(tuple(c for c in spec.columns if c in it["values"]), []).append(it)
+    before = {}
+    if groups and spec.tracked:
+        # Lock the rows first so the old values cannot change under us.
+        cursor.execute(
+            f"SELECT {returning} FROM {spec.table} WHERE {spec.key} = ANY(%s) FOR UPDATE",
+            ([it["key"] for group in groups.values() for it in group],)
+        )
+        before = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+    for columns, group in groups.items():
+        assignments = ", ".join(f"{c} = v.{c}" for c in columns)
+        template = "(" + ", ".join(
+            [f"%s::{spec.key_type}"] + [f"%s::{spec.columns[c][0]}" for c in columns]
+        ) + ")"
+        rows = execute_values(
+            cursor,
+            f"""UPDATE {spec.table} AS t SET {assignments}
+                FROM (VALUES %s) AS v({spec.key}, {', '.join(columns)})
+                WHERE t.{spec.key} = v.{spec.key}
+                RETURNING {", ".join(f"t.{c}" for c in (spec.key,) + spec.tracked)}""",
+            [(it["key"],) + tuple(it["values"][c] for c in columns) for it in group],
+            template=template,
+            page_size=len(group),
+            fetch=True,
+        )
+        found = {row[0]: tuple(row[1:]) for row in rows}
+        for it in group:
+            if it["key"] in found:
+                _ok(results, it, key=it["key"])
+                changes.append((it["key"], before.get(it["key"], ()), found[it["key"]]))
+            else:
+                failed = True
+                _fail(results, it, "Not found")
+
+    deletes = [it for it in items if it["op"] == "delete"]
+    if deletes:
+        # Referencing rows are detached by the ON DELETE SET NULL foreign keys.
+        cursor.execute(
+            f"DELETE FROM {spec.table} WHERE {spec.key} = ANY(%s) RETURNING {returning}",
+            ([it["key"] for it in deletes],)
+        )
+        found = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+        for it in deletes:
+            if it["key"] in found:
+                _ok(results, it, key=it["key"])
+                changes.append((it["key"], found[it["key"]], None))
+            else:
+                failed = True
+                _fail(results, it, "Not found")
+
+    return failed
+
+
+def parse_operations(spec, operations):
+    results = [None] * len(operations)
+    items = []
+    seen = set()
+    for index, raw in enumerate(operations):
+        op = raw.get("op") if isinstance(raw, dict) else None
+        item = {"index": index, "op": op}
+        if op not in OPERATIONS:
+            _fail(results, item, f"'op' must be one of {', '.join(OPERATIONS)}")
+            continue
+
+        if op != "create" or spec.create_key:
+            source = raw.get("data", {}) if (op == "create") else raw
+            key, error = spec.parse_key(source.get(spec.key) if isinstance(source, dict) else None)
+            if error:
+                _fail(results, item, error)
+                continue
+            item["key"] = key
+            if op != "create":
+                if (op, key) in seen:
+                    _fail(results, item, "Duplicate operation on the same record")
+                    continue
+                seen.add((op, key))
+
+        if op == "delete":
+            item["values"] = {}
+        else:
+            values, error = spec.validate(op, raw.get("data"))
+            if error:
+                _fail(results, item, error)
+                continue
+            if op == "update":
+                values.pop(spec.key, None)
+                if not values:
+                    _fail(results, item, "Nothing to update")
+                    continue
+            item["values"] = values
+        items.append(item)
+    return items, results
+
+
+def run_batch(spec, operations, mode=ATOMIC):
+    """Run a list of create/update/delete operations against one table.
+
+    Operations are applied grouped by type (creates, then updates, then
+    deletes) inside a single transaction.  In ``atomic`` mode any failure
+    rolls back the whole batch; in ``best_effort`` mode the set-wise attempt
+    is retried item by item under savepoints so good items still commit.
+    """
+    items, results = parse_operations(spec, operations)
+    invalid = any(r is not None for r in results)
+
+    if mode == ATOMIC and invalid:
+        for it in items:
+            results[it["index"]] = {"index": it["index"], "op": it["op"], "status": "skipped"}
+        return False, results
+    if not items:
+        return False, results
+
+    db = get_db()
+    cursor = db.cursor()
+    changes = []
+    try:
+        if mode == ATOMIC:
+            try:
+                failed = _apply(cursor, spec, items, results, changes)
+            except psycopg2.Error as e:
+                db.rollback()
+                message = (e.pgerror or str(e)).strip()
+                for it in items:
+                    _fail(results, it, message)
+                return False, results
+            if failed:
+                db.rollback()
+                for it in items:
+                    if results[it["index"]]["status"] == "ok":
+                        results[it["index"]]["status"] = "rolled_back"
+                return False, results
+            if spec.after_apply:
+                spec.after_apply(cursor, changes)
+            db.commit()
+            return True, results
+
+        cursor.execute("SAVEPOINT batch_all")
+        try:
+            failed = _apply(cursor, spec, items, results, changes)
+        except psycopg2.Error:
+            failed = True
+        if not failed:
+            if spec.after_apply:
+                spec.after_apply(cursor, changes)
+            db.commit()
+            return True, results
+
+        cursor.execute("ROLLBACK TO SAVEPOINT batch_all")
+        changes = []
+        for it in items:
+            results[it["index"]] = None
+            item_changes = []
+            cursor.execute("SAVEPOINT batch_item")
+            try:
+                if _apply(cursor, spec, [it], results, item_changes):
+                    cursor.execute("ROLLBACK TO SAVEPOINT batch_item")
+                else:
+                    cursor.execute("RELEASE SAVEPOINT batch_item")
+                    changes.extend(item_changes)
+            except psycopg2.Error as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT batch_item")
+                _fail(results, it, (e.pgerror or str(e)).strip())
+        if spec.after_apply:
+            spec.after_apply(cursor, changes)
+        db.commit()
+        return True, results
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def handle_batch_request(spec, payload):
+    """Validate a batch request body and run it; returns ``(body, status)``."""
+    if not isinstance(payload, dict):
+        return {"error": "Request body must be a JSON object"}, 400
+    mode = payload.get("mode", ATOMIC)
+    operations = payload.get("operations")
+    if mode not in MODES:
+        return {"error": f"'mode' must be one of {', '.join(MODES)}"}, 400
+    if not isinstance(operations, list) or not operations:
+        return {"error": "'operations' must be a non-empty list"}, 400
+    if len(operations) > MAX_OPERATIONS:
+        return {"error": f"At most {MAX_OPERATIONS} operations per batch"}, 400
+
+    committed, results = run_batch(spec, operations, mode)
+    succeeded = sum(1 for r in results if r["status"] == "ok") if committed else 0
+    body = {
+        "mode": mode,
+        "committed": committed,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }
+    if mode == ATOMIC and not committed:
+        return body, 400
+    return body, 200
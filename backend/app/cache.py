@@ -0,0 +1,254 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+import psycopg2
+from flask import Response, make_response, request
+
+from app.database import get_db, table_versions
+
+try:
+    import redis
+except ImportError:  # optional dependency
+    redis = None
+
+
+class LRUCache:
+    """In-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries=1024, default_ttl=60.0):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            _, value = self._data.get(key, (None, 0))
+            value += 1
+            self._data[key] = (None, value)
+            self._data.move_to_end(key)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class LocalSharedBackend:
+    """Stand-in for the shared backend when Redis is not available.
+
+    Same interface as :class:`RedisBackend` but only shared within the
+    current process, which is enough for development and single-worker
+    deployments.
+    """
+
+    def __init__(self):
+        self._store = LRUCache(max_entries=100000, default_ttl=0)
+
+    def get(self, key):
+        return self._store.get(key)
+
+    def set(self, key, value, ttl):
+        self._store.set(key, value, ttl)
+
+    def incr(self, key):
+        return self._store.incr(key)
+
+
+class RedisBackend:
+    def __init__(self, url, prefix="ssis:"):
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self._client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self._client.set(self.prefix + key, value, ex=int(ttl) if ttl else None)
+
+    def incr(self, key):
+        return self._client.incr(self.prefix + key)
+
+
+class Cache:
+    """Versioned response cache.
+
+    Every cache key embeds the current version of the tables it depends on,
+    read from the trigger-maintained ``table_versions`` counters, so a write
+    from any worker, the importer or a CLI command makes all dependent
+    entries unreachable as soon as it commits.  Values live in a local LRU
+    and, when configured, in a shared backend.
+
+    ``version``/``bump`` are counters for cached data that has no table
+    behind it (see :mod:`app.identity`).  They live in the shared backend
+    when Redis is configured; with the local backend a bump only reaches the
+    current process, and other workers see the change once their entries
+    expire.
+    """
+
+    def __init__(self):
+        self.local = LRUCache()
+        self.shared = None
+        self.enabled = True
+        self._versions = LRUCache(max_entries=1024, default_ttl=0)
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+
+    def configure(self, backend="local", ttl=60.0, max_entries=1024, redis_url=None, enabled=True):
+        self.enabled = enabled
+        self.local = LRUCache(max_entries=max_entries, default_ttl=ttl)
+        self._versions = LRUCache(max_entries=1024, default_ttl=0)
+        self.shared = None
+        if backend == "redis":
+            if redis is not None and redis_url:
+                self.shared = RedisBackend(redis_url)
+            else:
+                print("[cache] redis not available, using the local shared stand-in")
+                self.shared = LocalSharedBackend()
+        with self._stats_lock:
+            self._stats = {}
+
+    def _count(self, name, field):
+        with self._stats_lock:
+            counters = self._stats.setdefault(name, {"hits": 0, "misses": 0})
+            counters[field] += 1
+
+    def version(self, entity):
+        key = f"version:{entity}"
+        if self.shared is not None:
+            value = self.shared.get(key)
+            return int(value) if value is not None else 0
+        return self._versions.get(key) or 0
+
+    def bump(self, *entities):
+        for entity in entities:
+            key = f"version:{entity}"
+            if self.shared is not None:
+                self.shared.incr(key)
+            else:
+                self._versions.incr(key)
+
+    def key_for(self, name, versions, extra=""):
+        """``versions`` is an iterable of ``(table, version)`` pairs."""
+        versions = ",".join(f"{t}={v}" for t, v in versions)
+        return f"{name}|{versions}|{extra}"
+
+    def get(self, name, key):
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            raw = self.shared.get(key)
+            if raw is not None:
+                value = _decode(raw)
+                self.local.set(key, value)
+        self._count(name, "hits" if value is not None else "misses")
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.local.set(key, value, ttl)
+        if self.shared is not None:
+            self.shared.set(key, _encode(value), ttl if ttl is not None else self.local.default_ttl)
+
+    def stats(self):
+        with self._stats_lock:
+            per_endpoint = {k: dict(v) for k, v in self._stats.items()}
+        hits = sum(v["hits"] for v in per_endpoint.values())
+        misses = sum(v["misses"] for v in per_endpoint.values())
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.shared).__name__ if self.shared else "LRUCache",
+            "local_entries": len(self.local),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "endpoints": per_endpoint,
+        }
+
+
+def _encode(value):
+    status, mimetype, body = value
+    return f"{status}\n{mimetype}\n".encode("utf-8") + body
+
+
+def _decode(raw):
+    status, mimetype, body = raw.split(b"\n", 2)
+    return int(status), mimetype.decode("utf-8"), body
+
+
+cache = Cache()
+
+
+def bump(*entities):
+    cache.bump(*entities)
+
+
+def stats():
+    return cache.stats()
+
+
+def cached_response(name, depends_on, ttl=None):
+    """Cache a view's successful response under the ``table_versions`` of ``depends_on``."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not cache.enabled:
+                return view(*args, **kwargs)
+
+            try:
+                versions = table_versions(depends_on)
+            except psycopg2.Error as e:
+                get_db().rollback()
+                print(f"[cache] Could not read table versions: {e}")
+                return view(*args, **kwargs)
+
+            key = cache.key_for(name, zip(depends_on, versions), request.query_string.decode("utf-8"))
+            hit = cache.get(name, key)
+            if hit is not None:
+                status, mimetype, body = hit
+                return Response(body, status=status, mimetype=mimetype)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                cache.set(key, (response.status_code, response.mimetype, response.get_data()), ttl)
+            return response
+        return wrapper
+    return decorator
+
+
+def init_app(app):
+    cache.configure(
+        backend=app.config.get("CACHE_BACKEND", "local"),
+        ttl=app.config.get("CACHE_TTL", 60.0),
+        max_entries=app.config.get("CACHE_MAX_ENTRIES", 1024),
+        redis_url=app.config.get("REDIS_URL"),
+        enabled=app.config.get("CACHE_ENABLED", True),
+    )
@@ -0,0 +1,274 @@
+import select
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from flask import current_app
+
+from app import queries
+from app.database import get_pool
+from app.models import row_type
+
+CHANNEL = "change_events"
+
+ChangeEvent = row_type("ChangeEvent", ("xid", "id", "entity", "entity_id", "op"))
+
+# Events are read in (xid, id) order, and only from transactions older than
+# every transaction still running, so nothing can later appear behind the
+# cursor (migration 0014).
+_HORIZON = "pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+
+queries.register("changes.head", f"""
+    SELECT xid, id FROM change_events
+    WHERE xid < {_HORIZON}
+    ORDER BY xid DESC, id DESC
+    LIMIT 1
+""")
+queries.register("changes.pruned", "SELECT xid, event_id FROM change_events_pruned")
+queries.register("changes.range", f"""
+    SELECT xid, id, entity, entity_id, op
+    FROM change_events
+    WHERE (xid, id) > (%s, %s) AND (xid, id) <= (%s, %s) AND xid < {_HORIZON}
+    ORDER BY xid, id
+    LIMIT %s
+""")
+queries.register("changes.prune", f"""
+    WITH pruned AS (
+        DELETE FROM change_events
+        WHERE created_at < NOW() - make_interval(secs => %s) AND xid < {_HORIZON}
+        RETURNING xid, id
+    )
+    UPDATE change_events_pruned p SET xid = last.xid, event_id = last.id
+    FROM (SELECT xid, id FROM pruned ORDER BY xid DESC, id DESC LIMIT 1) last
+    WHERE (last.xid, last.id) > (p.xid, p.event_id)
+""")
+
+# Cursor before any event, and the upper bound when the listener catches up.
+START = (0, 0)
+_NO_LIMIT = (2 ** 62, 0)
+# Sorts before every cursor, including the pruning watermark, so reading
+# from it always resets.  Bare integer ids from before 0014 map to it.
+STALE = (-1, -1)
+
+
+def cursor_of(event):
+    return (event.xid, event.id)
+
+
+def format_cursor(cursor):
+    """``(xid, id)`` -> the SSE event id, ``"<xid>-<id>"``."""
+    return f"{cursor[0]}-{cursor[1]}"
+
+
+def parse_cursor(value):
+    """Inverse of ``format_cursor``; a bare integer id from before 0014 is ``STALE``."""
+    xid, sep, event_id = value.partition("-")
+    if not sep and xid.isdigit():
+        return STALE
+    if not (xid.isdigit() and event_id.isdigit()):
+        raise ValueError("'Last-Event-ID' must look like '<xid>-<id>'")
+    return int(xid), int(event_id)
+
+
+class ChangeFeed:
+    """Per-worker tail of ``change_events``, fanned out to event streams.
+
+    One listener thread holds a dedicated connection that LISTENs on the
+    channel.  Each notification (or every ``poll_interval`` seconds, in case
+    one was missed while reconnecting) it reads the new rows once and
+    appends them to a bounded buffer, so an open stream costs a buffer scan
+    per commit instead of a query.  Streams resuming from before the buffer
+    read the gap from the table; resuming from before the retention window
+    gets a reset.
+    """
+
+    def __init__(self, dsn=None, buffer_size=1000, poll_interval=5.0, retention=86400.0,
+                 prune_interval=600.0, max_streams=2):
+        self.dsn = dsn
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.prune_interval = prune_interval
+        self.max_streams = max_streams
+        self._buffer = deque(maxlen=buffer_size)
+        self._head = None  # cursor of the newest event read; None until the listener has connected
+        self._floor = None  # every event after this cursor is in the buffer
+        self._cond = threading.Condition()
+        self._thread = None
+        self._streams = 0
+        self._next_prune = 0.0
+        self._stats = {
+            "notifications": 0, "fetches": 0, "events": 0, "backfills": 0,
+            "resets": 0, "rejected_streams": 0, "listener_errors": 0,
+        }
+
+    # --- listener ---------------------------------------------------------
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._listen, name="change-feed", daemon=True)
+            self._thread.start()
+
+    def _listen(self):
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.autocommit = True
+                cursor = conn.cursor()
+                cursor.execute(f"LISTEN {CHANNEL}")
+                if self._head is None:
+                    queries.execute(cursor, "changes.head")
+                    row = cursor.fetchone()
+                    head = tuple(row) if row else START
+                    with self._cond:
+                        self._head = self._floor = head
+                        self._cond.notify_all()
+                backoff = 1.0
+                while True:
+                    self._catch_up(cursor)
+                    self._prune_if_due(cursor)
+                    if select.select([conn], [], [], self.poll_interval) != ([], [], []):
+                        conn.poll()
+                        self._stats["notifications"] += len(conn.notifies)
+                        conn.notifies.clear()
+            except Exception as e:
+                self._stats["listener_errors"] += 1
+                print(f"[changes] Listener failed: {e}; reconnecting in {backoff:.0f}s")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def _catch_up(self, cursor, batch=500):
+        while True:
+            queries.execute(cursor, "changes.range", (*self._head, *_NO_LIMIT, batch))
+            events = [ChangeEvent._make(row) for row in cursor.fetchall()]
+            self._stats["fetches"] += 1
+            if not events:
+                return
+            with self._cond:
+                for event in events:
+                    if len(self._buffer) == self._buffer.maxlen:
+                        self._floor = cursor_of(self._buffer[0])
+                    self._buffer.append(event)
+                self._head = cursor_of(events[-1])
+                self._stats["events"] += len(events)
+                self._cond.notify_all()
+            if len(events) < batch:
+                return
+
+    def _prune_if_due(self, cursor):
+        now = time.monotonic()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.prune_interval
+        queries.execute(cursor, "changes.prune", (self.retention,))
+
+    # --- readers ----------------------------------------------------------
+
+    def head(self, timeout=5.0):
+        """Cursor of the newest event, or ``None`` if the listener is not connected within ``timeout``."""
+        self.start()
+        with self._cond:
+            self._cond.wait_for(lambda: self._head is not None, timeout)
+            return self._head
+
+    def read(self, after, limit=500):
+        """Events after ``after`` as ``(events, reset)``.
+
+        ``reset`` means the events the client missed are gone (pruned, or the
+        cursor is from a different database) and it has to reload.
+        """
+        with self._cond:
+            if after > self._head:
+                # Another worker may have already sent the client events this
+                # listener has not read yet.
+                self._cond.wait_for(lambda: self._head >= after, self.poll_interval)
+            head, floor = self._head, self._floor
+            if after > head:
+                self._stats["resets"] += 1
+                return [], True
+            if after >= floor:
+                events = [event for event in self._buffer if cursor_of(event) > after]
+                return events[:limit], False
+        return self._backfill(after, floor, limit)
+
+    def _backfill(self, after, upto, limit):
+        self._stats["backfills"] += 1
+        pool = get_pool(current_app._get_current_object())
+        conn = pool.getconn()
+        cursor = conn.cursor()
+        try:
+            queries.execute(cursor, "changes.pruned")
+            if after < tuple(cursor.fetchone()):
+                self._stats["resets"] += 1
+                return [], True
+            queries.execute(cursor, "changes.range", (*after, *upto, limit))
+            return [ChangeEvent._make(row) for row in cursor.fetchall()], False
+        finally:
+            cursor.close()
+            conn.rollback()
+            pool.putconn(conn)
+
+    def wait(self, after, timeout):
+        """Block until an event after cursor ``after`` is buffered; ``False`` on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._head is not None and self._head > after, timeout)
+
+    # --- stream slots -----------------------------------------------------
+
+    def open_stream(self):
+        """Claim a stream slot; every open stream pins a server thread."""
+        with self._cond:
+            if self._streams >= self.max_streams:
+                self._stats["rejected_streams"] += 1
+                return False
+            self._streams += 1
+            return True
+
+    def close_stream(self):
+        with self._cond:
+            self._streams -= 1
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "listening": self._thread is not None and self._thread.is_alive(),
+                "head": format_cursor(self._head) if self._head else None,
+                "floor": format_cursor(self._floor) if self._floor else None,
+                "buffered": len(self._buffer),
+                "streams": self._streams,
+                "max_streams": self.max_streams,
+            })
+        return stats
+
+
+feed = ChangeFeed()
+
+
+def stats():
+    return feed.stats()
+
+
+def init_app(app):
+    global feed
+    app.config.setdefault("CHANGE_FEED_BUFFER", 1000)
+    app.config.setdefault("CHANGE_FEED_RETENTION", 86400.0)
+    app.config.setdefault("CHANGE_FEED_MAX_STREAMS", 2)
+    app.config.setdefault("CHANGE_FEED_HEARTBEAT", 15.0)
+    app.config.setdefault("CHANGE_FEED_MAX_AGE", 300.0)
+    feed = ChangeFeed(
+        dsn=app.config["DATABASE_URL"],
+        buffer_size=app.config["CHANGE_FEED_BUFFER"],
+        retention=app.config["CHANGE_FEED_RETENTION"],
+        max_streams=app.config["CHANGE_FEED_MAX_STREAMS"],
+    )
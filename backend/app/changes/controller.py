@@ -0,0 +1,83 @@
+import json
+import time
+
+from flask import Response, current_app, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required
+
+from . import changes_bp
+from app import changefeed, database
+
+
+def _frame(cursor, name, data):
+    return f"id: {changefeed.format_cursor(cursor)}\nevent: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+def _change(event):
+    return {"id": event.id, "entity": event.entity, "entity_id": event.entity_id, "op": event.op}
+
+
+def _last_event_id():
+    # EventSource resends the header on reconnect; fetch-based clients may
+    # pass it either way.
+    value = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    if value in (None, ""):
+        return None
+    return changefeed.parse_cursor(value.strip())
+
+
+@changes_bp.route("/changes", methods=["GET"])
+@jwt_required()
+def stream_changes():
+    """Server-sent events for student, program and college writes.
+
+    Each ``change`` event carries ``entity``, ``entity_id`` and ``op``
+    (insert/update/delete, or reset after a truncate).  A ``reset`` event
+    means events since ``Last-Event-ID`` are no longer available and the
+    client should reload.  Event ids are opaque ``<xid>-<id>`` cursors.  Streams end after ``CHANGE_FEED_MAX_AGE`` seconds
+    so the token is re-checked on reconnect.
+    """
+    try:
+        after = _last_event_id()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    feed = changefeed.feed
+    head = feed.head()
+    if head is None:
+        return jsonify({"error": "Change feed unavailable"}), 503, {"Retry-After": "5"}
+    if not feed.open_stream():
+        return jsonify({"error": "Too many open change streams"}), 503, {"Retry-After": "5"}
+
+    # The token check may have checked out g.db; the stream never needs it,
+    # so end its transaction and hand it back instead of pinning it for up
+    # to CHANGE_FEED_MAX_AGE.
+    database.release_db()
+
+    heartbeat = current_app.config["CHANGE_FEED_HEARTBEAT"]
+    deadline = time.monotonic() + current_app.config["CHANGE_FEED_MAX_AGE"]
+
+    def generate():
+        cursor = after
+        yield "retry: 3000\n\n"
+        if cursor is None:
+            cursor = head
+            yield _frame(cursor, "ready", {"id": changefeed.format_cursor(cursor)})
+        while time.monotonic() < deadline:
+            events, reset = feed.read(cursor)
+            if reset:
+                cursor = feed.head()
+                yield _frame(cursor, "reset", {"id": changefeed.format_cursor(cursor)})
+            elif events:
+                cursor = changefeed.cursor_of(events[-1])
+                yield "".join(_frame(changefeed.cursor_of(e), "change", _change(e)) for e in events)
+            elif not feed.wait(cursor, min(heartbeat, deadline - time.monotonic())):
+                yield ": keepalive\n\n"
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Runs even if the client goes away before the body starts.
+    response.call_on_close(feed.close_stream)
+    return response
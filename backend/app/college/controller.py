@@ -1,31 +1,21 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from . import college_bp
-from app.models import College, Program, Student
+from app.models import College, Conflict
 from flask_jwt_extended import jwt_required
+from app import batch
+from app.cache import cached_response
+from app.etag import conditional
 
 
 @college_bp.route("/colleges", methods=["GET"], strict_slashes=False)
 @jwt_required()
+@conditional("colleges.list", ("colleges", "programs", "students"))
+@cached_response("colleges.list", depends_on=("colleges", "programs", "students"))
 def get_colleges():
-    colleges = College.all()
-    programs = Program.all()
-    students = Student.all()
-
-    college_list = []
-    for c in colleges:
-        num_programs = sum(1 for p in programs if p.college_id == c.id)
-        program_ids = [p.id for p in programs if p.college_id == c.id]
-        num_students = sum(1 for s in students if s.program_id in program_ids)
-
-        college_list.append({
-            "id": c.id,
-            "college_code": c.college_code,
-            "college_name": c.college_name,
-            "num_programs": num_programs,
-            "num_students": num_students
-        })
-
-    return jsonify({"colleges": college_list})
+    colleges = College.all_with_counts(
+        use_counts_table=current_app.config.get("COLLEGE_COUNTS_TABLE", False)
+    )
+    return jsonify({"colleges": [c.to_dict() for c in colleges]})
 
 @college_bp.route("/colleges", methods=["POST"])
 @jwt_required()
@@ -43,16 +33,16 @@ def add_college():
     if not re.match(name_regex, data["college_name"]) or not re.match(name_regex, data["college_code"]):
         return jsonify({"error": "Names should contain only letters and spaces"}), 400
 
-    if College.exists(college_name):
-        return jsonify({"error": "College already exists"}), 400
-    
     formatted_name =  data["college_name"].strip().title()
     
     new_college = College(
         college_code=data.get("college_code"),
         college_name=formatted_name
     )
-    new_college.add()
+    try:
+        new_college.add()
+    except Conflict as e:
+        return jsonify({"error": str(e)}), 400
 
     return jsonify({
         "message": "College added successfully",
@@ -88,12 +78,12 @@ def update_college(college_id):
     if not re.match(name_regex, data["college_name"]) or not re.match(name_regex, data["college_code"]):
         return jsonify({"error": "Names should contain only letters and spaces"}), 400
 
-    if College.is_name_taken(college_name, college_id):
-        return jsonify({"error": "College name already taken by another college"}), 400
-
     formatted_name =  data["college_name"].strip().title()
 
-    success = College.update_college(college_id, data["college_code"], formatted_name)
+    try:
+        success = College.update_college(college_id, data["college_code"], formatted_name)
+    except Conflict as e:
+        return jsonify({"error": str(e)}), 400
     if success:
         return jsonify({
             "message": "College updated successfully",
@@ -102,4 +92,11 @@ def update_college(college_id):
                 "college_code": data["college_code"],
                 "college_name": formatted_name
             }}), 200
-    return jsonify({"error": "Failed to update college"}), 400
\ No newline at end of file
+    return jsonify({"error": "Failed to update college"}), 400
+
+
+@college_bp.route("/colleges/batch", methods=["POST"])
+@jwt_required()
+def batch_colleges():
+    body, status = batch.handle_batch_request(batch.COLLEGES, request.get_json(silent=True))
+    return jsonify(body), status
@@ -0,0 +1,96 @@
+import gzip
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+    "text/plain",
+    "text/html",
+}
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def _stream(chunks, encoding, level, quality):
+    """Compress a streamed body, flushing after every chunk so clients see rows as they come."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=quality)
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+def compress_response(response, min_size=1024, level=6, quality=4):
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    encoding = _choose_encoding()
+    response.vary.add("Accept-Encoding")
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _stream(response.response, encoding, level, quality)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        if encoding == "br":
+            response.set_data(brotli.compress(data, quality=quality))
+        else:
+            response.set_data(gzip.compress(data, compresslevel=level))
+
+    response.headers["Content-Encoding"] = encoding
+    # Each encoding is a different representation, so a strong ETag must differ.
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+
+def init_app(app):
+    if not app.config.get("COMPRESSION_ENABLED", True):
+        return
+
+    min_size = app.config.get("COMPRESSION_MIN_SIZE", 1024)
+    level = app.config.get("COMPRESSION_LEVEL", 6)
+    quality = app.config.get("BROTLI_QUALITY", 4)
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response, min_size=min_size, level=level, quality=quality)
@@ -11,3 +11,80 @@ DB_NAME = os.getenv("DB_NAME")
 DB_USERNAME = os.getenv("DB_USERNAME")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 SECRET_KEY = os.getenv("SECRET_KEY")
+
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+DB_POOL_CHECK_AFTER = float(os.getenv("DB_POOL_CHECK_AFTER", "30"))
+
+COLLEGE_COUNTS_TABLE = os.getenv("COLLEGE_COUNTS_TABLE", "false").lower() in ("1", "true", "yes")
+EXPORT_ITERSIZE = int(os.getenv("EXPORT_ITERSIZE", "2000"))
+# Run registered model queries through PREPARE/EXECUTE on each pooled connection
+QUERY_PREPARE = os.getenv("QUERY_PREPARE", "true").lower() in ("1", "true", "yes")
+# Per-request SQL stats: Server-Timing header, slow-query and N+1 logs
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+# auto: pg_trgm when the database has it, otherwise the in-process n-gram index
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+SEARCH_SIMILARITY = float(os.getenv("SEARCH_SIMILARITY", "0.4"))
+# Seconds between full rebuilds of the enrolment statistics by 'flask stats reconcile --loop'
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", "3600"))
+# Dashboard change stream (/api/dashboard/changes).  Each open stream holds a
+# worker thread, so keep CHANGE_FEED_MAX_STREAMS below WEB_THREADS.
+CHANGE_FEED_BUFFER = int(os.getenv("CHANGE_FEED_BUFFER", "1000"))
+CHANGE_FEED_RETENTION = float(os.getenv("CHANGE_FEED_RETENTION", "86400"))
+CHANGE_FEED_MAX_STREAMS = int(os.getenv("CHANGE_FEED_MAX_STREAMS", "2"))
+CHANGE_FEED_HEARTBEAT = float(os.getenv("CHANGE_FEED_HEARTBEAT", "15"))
+CHANGE_FEED_MAX_AGE = float(os.getenv("CHANGE_FEED_MAX_AGE", "300"))
+
+# Response cache keys follow the table_versions counters, so every process
+# sees writes as soon as they commit.  The local backend keeps entries per
+# worker; redis shares them, and also shares the per-user identity cache
+# invalidations, which otherwise reach other workers only after
+# IDENTITY_CACHE_TTL.
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+REDIS_URL = os.getenv("REDIS_URL")
+
+# verify: check schema_migrations on boot (default), migrate: apply pending
+# migrations on boot, off: skip both
+SCHEMA_STARTUP = os.getenv("SCHEMA_STARTUP", "verify")
+
+# postgres: shared revoked_tokens table, local: in-process only
+REVOCATION_BACKEND = os.getenv("REVOCATION_BACKEND", "postgres")
+REVOCATION_SYNC_INTERVAL = float(os.getenv("REVOCATION_SYNC_INTERVAL", "2"))
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "32"))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+# local: counters per worker process, so the effective limit is the
+# configured one times the number of workers; redis: shared through
+# REDIS_URL, so the limits hold for the whole deployment.
+LOGIN_RATE_LIMIT_BACKEND = os.getenv("LOGIN_RATE_LIMIT_BACKEND", "local")
+LOGIN_RATE_LIMIT_USER = int(os.getenv("LOGIN_RATE_LIMIT_USER", "5"))
+LOGIN_RATE_LIMIT_IP = int(os.getenv("LOGIN_RATE_LIMIT_IP", "20"))
+LOGIN_RATE_LIMIT_WINDOW = float(os.getenv("LOGIN_RATE_LIMIT_WINDOW", "60"))
+
+IDENTITY_CACHE_TTL = float(os.getenv("IDENTITY_CACHE_TTL", "30"))
+IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", "10000"))
+
+# Production server (gunicorn.conf.py)
+WEB_BIND = os.getenv("WEB_BIND", "0.0.0.0:5000")
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", str((os.cpu_count() or 1) * 2 + 1)))
+WEB_THREADS = int(os.getenv("WEB_THREADS", "4"))
+WEB_TIMEOUT = int(os.getenv("WEB_TIMEOUT", "30"))
+WEB_GRACEFUL_TIMEOUT = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+WEB_KEEPALIVE = int(os.getenv("WEB_KEEPALIVE", "5"))
+WEB_MAX_REQUESTS = int(os.getenv("WEB_MAX_REQUESTS", "2000"))
+WEB_MAX_REQUESTS_JITTER = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "200"))
+WEB_BACKLOG = int(os.getenv("WEB_BACKLOG", "2048"))
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
@@ -1,17 +1,143 @@
+import sys
+import threading
+import click
 import psycopg2
 from flask import current_app, g
-import os
+from .pool import ConnectionPool
+from . import instrumentation
+
+_pool_lock = threading.Lock()
+
+
+def get_pool(app=None):
+    app = app or current_app._get_current_object()
+    pool = app.extensions.get("db_pool")
+    if pool is None:
+        with _pool_lock:
+            pool = app.extensions.get("db_pool")
+            if pool is None:
+                pool = ConnectionPool(
+                    app.config['DATABASE_URL'],
+                    minconn=app.config["DB_POOL_MIN"],
+                    maxconn=app.config["DB_POOL_MAX"],
+                    timeout=app.config["DB_POOL_TIMEOUT"],
+                    max_idle=app.config["DB_POOL_MAX_IDLE"],
+                    check_after=app.config["DB_POOL_CHECK_AFTER"],
+                )
+                app.extensions["db_pool"] = pool
+    return pool
+
 
 def get_db():
     if 'db' not in g:
-        g.db = psycopg2.connect(current_app.config['DATABASE_URL'])
+        g.db = get_pool().getconn()
+        g.db.cursor_factory = instrumentation.cursor_factory(current_app)
     return g.db
 
+def table_versions(tables):
+    """Read the trigger-maintained change counters for ``tables``.
+
+    Each table is read once per request, so the ETag, the response cache key
+    and the search index all work from the same snapshot.
+    """
+    seen = g.setdefault("table_versions", {})
+    missing = [t for t in tables if t not in seen]
+    if missing:
+        db = get_db()
+        cursor = db.cursor()
+        try:
+            cursor.execute(
+                "SELECT table_name, version FROM table_versions WHERE table_name = ANY(%s)",
+                (missing,)
+            )
+            versions = dict(cursor.fetchall())
+        finally:
+            cursor.close()
+        for t in missing:
+            seen[t] = versions.get(t, 0)
+    return [seen[t] for t in tables]
+
+def release_db():
+    """Commit and return the request's connection before the request ends,
+    e.g. ahead of a long streamed response that no longer needs it."""
+    db = g.pop('db', None)
+    if db is not None:
+        try:
+            db.commit()
+        finally:
+            get_pool().putconn(db)
+
 def close_db(e=None):
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        get_pool().putconn(db)
+
+def close_pool(app):
+    pool = app.extensions.pop("db_pool", None)
+    if pool is not None:
+        pool.closeall()
+
+def pool_stats():
+    pool = current_app.extensions.get("db_pool")
+    if pool is None:
+        return None
+    return pool.stats()
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+def schema_version(app):
+    pool = get_pool(app)
+    conn = pool.getconn()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(version) FROM schema_migrations")
+        version = cursor.fetchone()[0] or 0
+        cursor.close()
+        return version
+    except psycopg2.errors.UndefinedTable:
+        return 0
+    finally:
+        pool.putconn(conn)
+
+def verify_schema(app):
+    """Fail fast if the database is behind the migrations shipped with the code."""
+    import setup_db
+
+    expected = setup_db.latest_version()
+    current = schema_version(app)
+    if current < expected:
+        raise SchemaVersionError(
+            f"Database schema is at version {current} but the code expects {expected}. "
+            "Run 'flask db-upgrade' (or 'python setup_db.py') before starting the app."
+        )
+    return current
+
+def prepare_schema(app):
+    mode = app.config["SCHEMA_STARTUP"]
+    # 'flask db-upgrade' has to load the app to run, so it cannot require
+    # an up-to-date schema first.
+    if "db-upgrade" in sys.argv:
+        return
+    if mode == "migrate":
+        import setup_db
+        setup_db.migrate()
+    elif mode == "verify":
+        verify_schema(app)
+
+@click.command("db-upgrade")
+def db_upgrade_command():
+    """Apply pending schema migrations."""
+    import setup_db
+    applied = setup_db.migrate()
+    click.echo(f"Applied {len(applied)} migration(s); schema at version {setup_db.latest_version()}.")
 
 def init_app(app):
+    app.config.setdefault("DB_POOL_MIN", 1)
+    app.config.setdefault("DB_POOL_MAX", 10)
+    app.config.setdefault("DB_POOL_TIMEOUT", 30.0)
+    app.config.setdefault("DB_POOL_MAX_IDLE", 300.0)
+    app.config.setdefault("DB_POOL_CHECK_AFTER", 30.0)
+    app.config.setdefault("SCHEMA_STARTUP", "verify")
     app.teardown_appcontext(close_db)
-    
\ No newline at end of file
+    app.cli.add_command(db_upgrade_command)
@@ -0,0 +1,46 @@
+import functools
+import hashlib
+
+import psycopg2
+from flask import make_response, request
+
+from app.database import get_db, table_versions
+
+
+def compute_etag(name, tables):
+    versions = table_versions(tables)
+    fingerprint = "|".join([name, request.query_string.decode("utf-8")] + [
+        f"{t}={v}" for t, v in zip(tables, versions)
+    ])
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+
+def conditional(name, tables):
+    """Answer ``If-None-Match`` with 304 using only the table change counters.
+
+    The ETag is derived from the versions of ``tables`` and the query
+    string, so it can be checked before the view runs any row scans.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                etag = compute_etag(name, tables)
+            except psycopg2.Error as e:
+                get_db().rollback()
+                print(f"[etag] Could not read table versions: {e}")
+                return view(*args, **kwargs)
+
+            # Compressed responses advertise "<etag>-<encoding>" (see app.compression).
+            for candidate in (etag, f"{etag}-br", f"{etag}-gzip"):
+                if candidate in request.if_none_match:
+                    response = make_response("", 304)
+                    response.set_etag(candidate)
+                    return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,75 @@
+import threading
+
+from app import cache
+from app.cache import LRUCache
+
+
+class IdentityCache:
+    """Short-lived cache of ``{id, username, email}`` per user id.
+
+    The password hash is never stored.  Keys carry the per-user version from
+    :mod:`app.cache`, so ``invalidate`` takes effect on every worker when a
+    shared cache backend is configured.
+    """
+
+    def __init__(self, ttl=30.0, max_entries=10000):
+        self._entries = LRUCache(max_entries=max_entries, default_ttl=ttl)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def _key(self, user_id):
+        return f"{user_id}:{cache.cache.version(f'user:{user_id}')}"
+
+    def _count(self, field):
+        with self._lock:
+            self._stats[field] += 1
+
+    def get(self, user_id, loader):
+        key = self._key(user_id)
+        identity = self._entries.get(key)
+        if identity is not None:
+            self._count("hits")
+            return identity
+
+        self._count("misses")
+        user = loader(user_id)
+        if user is None:
+            return None
+        identity = {"id": user.id, "username": user.username, "email": user.email}
+        self._entries.set(key, identity)
+        return identity
+
+    def invalidate(self, user_id):
+        cache.bump(f"user:{user_id}")
+        self._count("invalidations")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["entries"] = len(self._entries)
+        return stats
+
+
+identities = IdentityCache()
+
+
+def get_identity(user_id, loader):
+    return identities.get(user_id, loader)
+
+
+def invalidate(user_id):
+    identities.invalidate(user_id)
+
+
+def stats():
+    return identities.stats()
+
+
+def init_app(app):
+    global identities
+    identities = IdentityCache(
+        ttl=app.config.get("IDENTITY_CACHE_TTL", 30.0),
+        max_entries=app.config.get("IDENTITY_CACHE_MAX_ENTRIES", 10000),
+    )
@@ -0,0 +1,182 @@
+import json
+import re
+import time
+
+from flask import g, has_request_context, request
+from psycopg2 import extensions
+
+_whitespace = re.compile(r"\s+")
+# Savepoint bookkeeping repeats per item by design (see app.batch); it is
+# not an N+1.
+_transaction_control = re.compile(r"(SAVEPOINT|RELEASE|ROLLBACK|BEGIN|COMMIT)\b", re.IGNORECASE)
+
+
+def _statement(query):
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", "replace")
+    elif not isinstance(query, str):
+        query = str(query)  # psycopg2.sql.Composed
+    return _whitespace.sub(" ", query).strip()
+
+
+class RequestStats:
+    """SQL activity of one request, filled in by :class:`InstrumentedCursor`."""
+
+    __slots__ = ("started", "queries", "db_time", "rows", "slowest", "slow", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.slowest = None  # (duration, statement)
+        self.slow = []  # (duration, statement, rowcount) over the threshold
+        self.statements = {}  # statement -> executions
+
+    def record(self, query, duration, rowcount, slow_threshold):
+        statement = _statement(query)
+        self.queries += 1
+        self.db_time += duration
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+        if self.slowest is None or duration > self.slowest[0]:
+            self.slowest = (duration, statement)
+        if duration >= slow_threshold:
+            self.slow.append((duration, statement, rowcount))
+
+
+def current_stats():
+    if has_request_context():
+        return g.get("sql_stats")
+    return None
+
+
+class InstrumentedCursor(extensions.cursor):
+    """Cursor that reports every statement and fetched row to the request's :class:`RequestStats`."""
+
+    slow_threshold = 0.2
+
+    def _timed(self, method, query, *args):
+        stats = current_stats()
+        if stats is None:
+            return method(query, *args)
+        start = time.perf_counter()
+        try:
+            return method(query, *args)
+        finally:
+            stats.record(query, time.perf_counter() - start, self.rowcount, self.slow_threshold)
+
+    def execute(self, query, vars=None):
+        return self._timed(super().execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._timed(super().executemany, query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._timed(super().copy_expert, sql, file, size)
+
+    def _count(self, rows):
+        stats = current_stats()
+        if stats is not None:
+            stats.rows += rows
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self._count(1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._count(len(rows))
+        return rows
+
+    def __iter__(self):
+        # Iteration goes straight to the C fetch (for named cursors, FETCH
+        # FORWARD itersize rows at a time) and bypasses the methods above.
+        stats = current_stats()
+        fetch = super().__next__
+        while True:
+            try:
+                row = fetch()
+            except StopIteration:
+                return
+            if stats is not None:
+                stats.rows += 1
+            yield row
+
+
+def cursor_factory(app):
+    return InstrumentedCursor if app.config.get("SQL_INSTRUMENTATION", True) else None
+
+
+def _log(kind, **fields):
+    print(f"[{kind}] {json.dumps(fields, default=str)}")
+
+
+def init_app(app):
+    app.config.setdefault("SQL_INSTRUMENTATION", True)
+    app.config.setdefault("SLOW_QUERY_MS", 200.0)
+    app.config.setdefault("N_PLUS_ONE_THRESHOLD", 5)
+    if not app.config["SQL_INSTRUMENTATION"]:
+        return
+
+    InstrumentedCursor.slow_threshold = app.config["SLOW_QUERY_MS"] / 1000.0
+    repeat_threshold = app.config["N_PLUS_ONE_THRESHOLD"]
+
+    @app.before_request
+    def start_sql_stats():
+        g.sql_stats = RequestStats()
+
+    def log_sql_stats(stats, method, path):
+        for duration, statement, rowcount in stats.slow:
+            _log(
+                "slow-query",
+                method=method,
+                path=path,
+                duration_ms=round(duration * 1000, 1),
+                rowcount=rowcount,
+                statement=statement,
+            )
+
+        if repeat_threshold:
+            for statement, count in stats.statements.items():
+                if count >= repeat_threshold and not _transaction_control.match(statement):
+                    _log(
+                        "n+1",
+                        method=method,
+                        path=path,
+                        executions=count,
+                        statement=statement,
+                    )
+
+    @app.after_request
+    def report_sql_stats(response):
+        stats = g.get("sql_stats")
+        if stats is None:
+            return response
+
+        if response.is_streamed:
+            # The body runs after the headers are sent, so any Server-Timing
+            # figures would leave out its queries.  Keep collecting while it
+            # streams and log once it is done.
+            method, path = request.method, request.path
+            response.call_on_close(lambda: log_sql_stats(stats, method, path))
+            return response
+
+        g.pop("sql_stats")
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        db_ms = stats.db_time * 1000
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={db_ms:.1f};desc="{stats.queries} queries, {stats.rows} rows"',
+        )
+        if stats.slowest is not None:
+            response.headers.add("Server-Timing", f'db-slowest;dur={stats.slowest[0] * 1000:.1f}')
+        response.headers.add("Server-Timing", f"app;dur={total_ms:.1f}")
+        log_sql_stats(stats, request.method, request.path)
+        return response
@@ -0,0 +1,44 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, falling back to the stdlib encoder.
+
+    Decodes to the same values as ``DefaultJSONProvider`` (compact, keys
+    sorted when ``sort_keys`` is set): dates and datetimes are passed through
+    to ``default`` so they keep the HTTP date format rather than orjson's ISO
+    8601.  The bytes differ in two ways: non-ASCII text is written as UTF-8
+    rather than ``\\u`` escapes, and NaN/Infinity become ``null`` (the stdlib
+    writes tokens that are not valid JSON).  Calls asking for options orjson
+    cannot honour, such as ``indent`` or ``ensure_ascii``, go to the stdlib
+    path.
+    """
+
+    def _options(self):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        if orjson is None or pretty:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self._options())
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
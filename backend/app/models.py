@@ -1,6 +1,35 @@
 from app.database import get_db
+from app import passwords
+from app import identity
+from app import queries
+from app import search
 from flask_login import UserMixin
-import bcrypt
+import uuid
+from collections import namedtuple
+from psycopg2 import errors
+from psycopg2.extras import execute_values
+
+
+def row_type(name, fields):
+    """A namedtuple built straight from cursor tuples, with a ``to_dict`` fast path for JSON."""
+    fields = tuple(fields)
+
+    def to_dict(self):
+        return dict(zip(fields, self))
+
+    return type(name, (namedtuple(name, fields),), {"__slots__": (), "to_dict": to_dict})
+
+
+queries.register("users.get_by_id", "SELECT id, username, email, user_password FROM users WHERE id = %s")
+queries.register("users.get_by_username", "SELECT id, username, email, user_password FROM users WHERE username = %s")
+
+
+class Conflict(Exception):
+    """A write was refused by a unique constraint; the message is the API error."""
+
+
+def conflict_message(error, messages, default):
+    return messages.get(getattr(error.diag, "constraint_name", None), default)
 
 
 class Users(UserMixin):
@@ -15,7 +44,7 @@ class Users(UserMixin):
         db = get_db()
         cursor = db.cursor()
 
-        password_to_store = bcrypt.hashpw(self.password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        password_to_store = passwords.hash_password(self.password)
 
         sql = "INSERT INTO users(username, user_password, email) VALUES (%s, %s, %s)"
         cursor.execute(sql, (self.username, password_to_store, self.email))
@@ -41,6 +70,7 @@ class Users(UserMixin):
             sql = "DELETE FROM users WHERE id = %s"
             cursor.execute(sql, (id,))
             db.commit()
+            identity.invalidate(id)
             cursor.close()
             return True
         except Exception as e:
@@ -53,7 +83,7 @@ class Users(UserMixin):
             cursor = db.cursor()
 
             if password:
-                password_to_store = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+                password_to_store = passwords.hash_password(password)
                 sql = "UPDATE users SET username = %s, email = %s, user_password = %s WHERE id = %s"
                 cursor.execute(sql, (username, email, password_to_store, user_id))
             else:
@@ -62,6 +92,7 @@ class Users(UserMixin):
 
 
             db.commit()
+            identity.invalidate(user_id)
             cursor.close()
             return True
         except Exception as e:
@@ -72,8 +103,7 @@ class Users(UserMixin):
     def get_by_id(cls, user_id):
         db = get_db()
         cursor = db.cursor()
-        sql = "SELECT id, username, email, user_password FROM users WHERE id = %s"
-        cursor.execute(sql, (user_id,))
+        queries.execute(cursor, "users.get_by_id", (user_id,))
         result = cursor.fetchone()
         cursor.close()
 
@@ -85,8 +115,7 @@ class Users(UserMixin):
     def get_by_username(cls, username):
         db = get_db()
         cursor = db.cursor()
-        sql = "SELECT id, username, email, user_password FROM users WHERE username = %s"
-        cursor.execute(sql, (username,))
+        queries.execute(cursor, "users.get_by_username", (username,))
         result = cursor.fetchone()
         cursor.close()
 
@@ -98,17 +127,106 @@ class Users(UserMixin):
         if not self.password:
             return False
 
-        try:
-            return bcrypt.checkpw(password.encode('utf-8'), self.password.encode('utf-8'))
-        except ValueError:
-            print("Error: Stored password is not a valid bcrypt hash.")
-            return False
+        return passwords.verify_password(password, self.password)
+
+    def needs_rehash(self):
+        return bool(self.password) and passwords.needs_rehash(self.password)
+
+    def rehash_password(self, password):
+        """Re-hash with the configured bcrypt cost; called after a successful login."""
+        password_to_store = passwords.hash_password(password)
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute("UPDATE users SET user_password = %s WHERE id = %s", (password_to_store, self.id))
+        db.commit()
+        cursor.close()
+        self.password = password_to_store
 
 
     def get_id(self):
         return str(self.id)
 
 
+COLLEGE_COUNTS_SQL = """
+    SELECT c.id, c.college_code, c.college_name,
+        COALESCE(pc.num_programs, 0)::int, COALESCE(pc.num_students, 0)::int
+    FROM colleges c
+    LEFT JOIN (
+        SELECT p.college_id,
+            COUNT(*) AS num_programs,
+            SUM(COALESCE(ps.num_students, 0)) AS num_students
+        FROM programs p
+        LEFT JOIN (
+            SELECT program_id, COUNT(*) AS num_students
+            FROM students
+            WHERE program_id IS NOT NULL
+            GROUP BY program_id
+        ) ps ON ps.program_id = p.id
+        WHERE p.college_id IS NOT NULL
+        GROUP BY p.college_id
+    ) pc ON pc.college_id = c.id
+    ORDER BY c.id
+"""
+
+COLLEGE_COUNTS_TABLE_SQL = """
+    SELECT c.id, c.college_code, c.college_name,
+        COALESCE(cc.num_programs, 0), COALESCE(cc.num_students, 0)
+    FROM colleges c
+    LEFT JOIN college_counts cc ON cc.college_id = c.id
+    ORDER BY c.id
+"""
+
+PROGRAM_ALL_SQL = """
+    SELECT p.id, p.program_code, p.program_name, p.college_id,
+        COALESCE(c.college_name, 'N/A') AS college_name,
+        COUNT(s.student_id)::int AS num_students
+    FROM programs p
+    LEFT JOIN colleges c ON p.college_id = c.id
+    LEFT JOIN students s ON s.program_id = p.id
+    GROUP BY p.id, c.college_name
+    ORDER BY p.program_name
+"""
+
+queries.register("college.all_with_counts", COLLEGE_COUNTS_SQL)
+queries.register("college.all_with_counts_table", COLLEGE_COUNTS_TABLE_SQL)
+queries.register("college.exists", "SELECT college_name FROM colleges WHERE LOWER(college_name) = LOWER(%s)")
+queries.register("college.is_name_taken", "SELECT id FROM colleges WHERE LOWER(college_name) = LOWER(%s) AND id != %s")
+queries.register("program.all_with_counts", PROGRAM_ALL_SQL)
+queries.register("program.exists", "SELECT program_name FROM programs WHERE LOWER(program_name) = LOWER(%s)")
+queries.register("program.is_name_taken", "SELECT id FROM programs WHERE LOWER(program_name) = LOWER(%s) AND id != %s")
+
+# Writes rely on the unique constraints (migration 0009) instead of a prior
+# existence check.
+queries.register("college.add", """
+    INSERT INTO colleges (college_code, college_name) VALUES (%s, %s)
+    ON CONFLICT ((LOWER(college_name))) DO NOTHING
+    RETURNING id
+""")
+queries.register("college.update", "UPDATE colleges SET college_code = %s, college_name = %s WHERE id = %s RETURNING id")
+queries.register("college.delete", "DELETE FROM colleges WHERE id = %s RETURNING college_code")
+queries.register("program.add", """
+    INSERT INTO programs (program_code, program_name, college_id) VALUES (%s, %s, %s)
+    ON CONFLICT ((LOWER(program_name))) DO NOTHING
+    RETURNING id
+""")
+queries.register("program.update", """
+    UPDATE programs SET program_code = %s, program_name = %s, college_id = %s WHERE id = %s RETURNING id
+""")
+queries.register("program.delete", "DELETE FROM programs WHERE id = %s RETURNING program_code")
+
+COLLEGE_CONFLICTS = {
+    "colleges_lower_name_key": "College already exists",
+    "colleges_college_code_key": "College code already exists",
+}
+PROGRAM_CONFLICTS = {
+    "programs_lower_name_key": "Program name already exists",
+    "programs_program_code_key": "Program code already exists",
+}
+
+CollegeRow = row_type("CollegeRow", ("id", "college_code", "college_name", "num_programs", "num_students"))
+ProgramRow = row_type("ProgramRow", ("id", "program_code", "program_name", "college_id", "college_name", "num_students"))
+
+
 class College:
     def __init__(self, id=None, college_code=None, college_name=None):
         self.id = id
@@ -116,13 +234,22 @@ class College:
         self.college_name = college_name
 
     def add(self):
+        """Insert the college; raises ``Conflict`` if the name or code is taken."""
         db = get_db()
         cursor = db.cursor()
-        sql = "INSERT INTO colleges (college_code, college_name) VALUES (%s, %s) RETURNING id"
-        cursor.execute(sql, (self.college_code, self.college_name))
-        self.id = cursor.fetchone()[0]
+        try:
+            queries.execute(cursor, "college.add", (self.college_code, self.college_name))
+            row = cursor.fetchone()
+        except errors.UniqueViolation as e:
+            db.rollback()
+            raise Conflict(conflict_message(e, COLLEGE_CONFLICTS, "College already exists"))
+        finally:
+            cursor.close()
+        if row is None:
+            db.rollback()
+            raise Conflict("College already exists")
+        self.id = row[0]
         db.commit()
-        cursor.close()
 
     @classmethod
     def all(cls):
@@ -133,26 +260,50 @@ class College:
         cursor.close()
         return [cls(id=row[0], college_code=row[1], college_name=row[2]) for row in result]
 
+    @classmethod
+    def all_with_counts(cls, use_counts_table=False):
+        """Colleges with ``num_programs``/``num_students`` in one query.
+
+        ``num_students`` counts students enrolled in the college's programs.
+        With ``use_counts_table`` the figures come from the trigger-maintained
+        ``college_counts`` table instead of being aggregated on the fly.
+        """
+        db = get_db()
+        cursor = db.cursor()
+        if use_counts_table:
+            queries.execute(cursor, "college.all_with_counts_table")
+        else:
+            queries.execute(cursor, "college.all_with_counts")
+        result = cursor.fetchall()
+        cursor.close()
+        return [CollegeRow._make(row) for row in result]
+
+    @staticmethod
+    def refresh_counts():
+        """Rebuild ``college_counts`` from the base tables."""
+        db = get_db()
+        cursor = db.cursor()
+        try:
+            cursor.execute("SELECT refresh_college_counts()")
+            db.commit()
+        finally:
+            cursor.close()
+
     @staticmethod
     def delete_college(college_id: int):
         db = get_db()
         cursor = db.cursor()
         try:
-            # Check if college exists
-            cursor.execute("SELECT college_code FROM colleges WHERE id = %s", (college_id,))
+            # programs.college_id and students.college_id are nulled by
+            # their ON DELETE SET NULL foreign keys.
+            queries.execute(cursor, "college.delete", (college_id,))
             college = cursor.fetchone()
             if not college:
+                db.rollback()
                 cursor.close()
                 return False, "College not found"
 
-            # Nullify foreign key reference in programs
-            cursor.execute(
-                "UPDATE programs SET college_id = NULL WHERE college_id = %s",
-                (college_id,)
-            )
-
-            # Delete the college
-            cursor.execute("DELETE FROM colleges WHERE id = %s", (college_id,))
+            EnrolmentStats.detach(cursor, "college_id", [college_id])
 
             db.commit()
             cursor.close()
@@ -165,18 +316,22 @@ class College:
             return False, str(e)
     @classmethod
     def update_college(cls, college_id, college_code, college_name):
+        """Returns whether the college existed; raises ``Conflict`` if the name or code is taken."""
         try:
             db = get_db()
             cursor = db.cursor()
-            sql = """
-                UPDATE colleges
-                SET college_code = %s, college_name = %s
-                WHERE id = %s
-            """
-            cursor.execute(sql, (college_code, college_name, college_id))
+            queries.execute(cursor, "college.update", (college_code, college_name, college_id))
+            updated = cursor.fetchone() is not None
             db.commit()
             cursor.close()
-            return True
+            return updated
+        except errors.UniqueViolation as e:
+            db.rollback()
+            cursor.close()
+            raise Conflict(conflict_message(e, {
+                **COLLEGE_CONFLICTS,
+                "colleges_lower_name_key": "College name already taken by another college",
+            }, "College name already taken by another college"))
         except Exception as e:
             db.rollback()
             cursor.close()
@@ -187,7 +342,7 @@ class College:
     def exists(college_name):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT college_name FROM colleges WHERE LOWER(college_name) = LOWER(%s)", (college_name,))
+        queries.execute(cursor, "college.exists", (college_name,))
         result = cursor.fetchone()
         cursor.close()
         return result is not None
@@ -196,10 +351,7 @@ class College:
     def is_name_taken(college_name, exclude_id):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute(
-            "SELECT id FROM colleges WHERE LOWER(college_name) = LOWER(%s) AND id != %s", 
-            (college_name, exclude_id)
-        )
+        queries.execute(cursor, "college.is_name_taken", (college_name, exclude_id))
         res = cursor.fetchone()
         cursor.close()
         return res is not None
@@ -214,64 +366,45 @@ class Program:
         self.college_id = college_id
 
     def add(self):
+        """Insert the program; raises ``Conflict`` if the name or code is taken."""
         db = get_db()
         cursor = db.cursor()
-        sql = "INSERT INTO programs (program_code, program_name, college_id) VALUES (%s, %s, %s) RETURNING id"
-        cursor.execute(sql, (self.program_code, self.program_name, self.college_id))
-        self.id = cursor.fetchone()[0]
+        try:
+            queries.execute(cursor, "program.add", (self.program_code, self.program_name, self.college_id))
+            row = cursor.fetchone()
+        except errors.UniqueViolation as e:
+            db.rollback()
+            raise Conflict(conflict_message(e, PROGRAM_CONFLICTS, "Program name already exists"))
+        finally:
+            cursor.close()
+        if row is None:
+            db.rollback()
+            raise Conflict("Program name already exists")
+        self.id = row[0]
         db.commit()
-        cursor.close()
 
     @classmethod
     def all(cls):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("""
-            SELECT p.id, p.program_code, p.program_name, p.college_id,
-                c.college_name,
-                COUNT(s.student_id) AS num_students
-            FROM programs p
-            LEFT JOIN colleges c ON p.college_id = c.id
-            LEFT JOIN students s ON s.program_id = p.id
-            GROUP BY p.id, c.college_name
-            ORDER BY p.program_name
-        """)
+        queries.execute(cursor, "program.all_with_counts")
         result = cursor.fetchall()
         cursor.close()
-
-        programs = []
-        for row in result:
-            program = cls(
-                id=row[0],
-                program_code=row[1],
-                program_name=row[2],
-                college_id=row[3]
-            )
-            # Add extra attributes for JSON
-            program.college_name = row[4] or "N/A"
-            program.num_students = row[5] or 0
-            programs.append(program)
-        return programs
+        return [ProgramRow._make(row) for row in result]
 
     def delete_program(program_id: int):
         db = get_db()
         cursor = db.cursor()
         try:
-            # Check if program exists
-            cursor.execute("SELECT program_code FROM programs WHERE id = %s", (program_id,))
+            # students.program_id is nulled by its ON DELETE SET NULL foreign key.
+            queries.execute(cursor, "program.delete", (program_id,))
             program = cursor.fetchone()
             if not program:
+                db.rollback()
                 cursor.close()
                 return False, "Program not found"
 
-            # Nullify foreign key reference in students but keep program_code
-            cursor.execute(
-                "UPDATE students SET program_id = NULL WHERE program_id = %s",
-                (program_id,)
-            )
-
-            # Delete the program
-            cursor.execute("DELETE FROM programs WHERE id = %s", (program_id,))
+            EnrolmentStats.detach(cursor, "program_id", [program_id])
 
             db.commit()
             cursor.close()
@@ -285,18 +418,19 @@ class Program:
         
     @classmethod
     def update_program(cls, program_id, program_code, program_name, college_id):
+        """Returns whether the program existed; raises ``Conflict`` if the name or code is taken."""
         try:
             db = get_db()
             cursor = db.cursor()
-            sql = """
-                UPDATE programs
-                SET program_code = %s, program_name = %s, college_id = %s
-                WHERE id = %s
-            """
-            cursor.execute(sql, (program_code, program_name, college_id, program_id))
+            queries.execute(cursor, "program.update", (program_code, program_name, college_id, program_id))
+            updated = cursor.fetchone() is not None
             db.commit()
             cursor.close()
-            return True
+            return updated
+        except errors.UniqueViolation as e:
+            db.rollback()
+            cursor.close()
+            raise Conflict(conflict_message(e, PROGRAM_CONFLICTS, "Program name already exists"))
         except Exception as e:
             db.rollback()
             cursor.close()
@@ -306,7 +440,7 @@ class Program:
     def exists(program_name):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT program_name FROM programs WHERE LOWER(program_name) = LOWER(%s)", (program_name,))
+        queries.execute(cursor, "program.exists", (program_name,))
         result = cursor.fetchone()
         cursor.close()
         return result is not None
@@ -315,16 +449,152 @@ class Program:
     def is_name_taken(program_name, exclude_id):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute(
-            "SELECT id FROM programs WHERE LOWER(program_name) = LOWER(%s) AND id != %s",
-            (program_name, exclude_id)
-        )
+        queries.execute(cursor, "program.is_name_taken", (program_name, exclude_id))
         result = cursor.fetchone()
         cursor.close()
         return result is not None
 
 
 
+STUDENT_SELECT = """
+    SELECT s.student_id, s.id_number, s.last_name, s.first_name, s.gender, s.year_level,
+        s.college_id, s.program_id,
+        COALESCE(p.program_code, 'N/A') AS program_code,
+        COALESCE(p.program_name, 'N/A') AS program_name,
+        s.photo_url
+    FROM students s
+    LEFT JOIN programs p ON s.program_id = p.id
+    LEFT JOIN colleges c ON s.college_id = c.id
+"""
+
+STUDENT_COLUMNS = (
+    "student_id", "id_number", "last_name", "first_name", "gender", "year_level",
+    "college_id", "program_id", "program_code", "program_name", "photo_url",
+)
+
+# Compact rows for long-lived copies of the roster (the in-process search
+# index).  Responses build ``Student`` objects instead: serialising their
+# ``__dict__`` beats building a dict per tuple (benchmarks/bench_rows.py).
+StudentRow = row_type("StudentRow", STUDENT_COLUMNS)
+
+queries.register("student.all", STUDENT_SELECT)
+queries.register("student.exists", "SELECT id_number FROM students WHERE id_number = %s")
+queries.register("student.add", """
+    INSERT INTO students (id_number, last_name, first_name, gender, year_level, college_id, program_id, photo_url)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (id_number) DO NOTHING
+    RETURNING student_id
+""")
+# Returns the pre-update statistics cell of the student.
+queries.register("student.update", """
+    UPDATE students s
+    SET last_name = %s, first_name = %s, gender = %s, year_level = %s,
+        college_id = %s, program_id = %s, photo_url = %s
+    FROM (
+        SELECT student_id, college_id, program_id, year_level, gender
+        FROM students
+        WHERE id_number = %s
+        FOR UPDATE
+    ) old
+    WHERE s.student_id = old.student_id
+    RETURNING old.college_id, old.program_id, old.year_level, old.gender
+""")
+queries.register("student.delete", """
+    DELETE FROM students WHERE id_number = %s
+    RETURNING college_id, program_id, year_level, gender
+""")
+# Facet counts are kept current by the triggers in migration 0007, spread
+# over shards since 0015.
+queries.register("student.year_levels", """
+    SELECT value FROM student_facets
+    WHERE dimension = 'year_level'
+    GROUP BY value HAVING SUM(count) > 0
+    ORDER BY value
+""")
+queries.register("student.genders", """
+    SELECT value FROM student_facets
+    WHERE dimension = 'gender'
+    GROUP BY value HAVING SUM(count) > 0
+    ORDER BY value
+""")
+queries.register("student.facets", """
+    SELECT dimension, value, SUM(count)::int FROM student_facets
+    GROUP BY dimension, value HAVING SUM(count) > 0
+""")
+queries.register("student.facets.colleges", "SELECT id, college_code, college_name FROM colleges ORDER BY college_name")
+queries.register("student.facets.programs", "SELECT id, program_code, program_name, college_id FROM programs ORDER BY program_name")
+
+# Scoped facets are counted live over the filtered students; GROUPING()
+# tells the grouping sets apart.
+STUDENT_FACETS_SCOPED_SQL = """
+    SELECT GROUPING(s.year_level, s.gender, s.college_id, s.program_id),
+        s.year_level, s.gender, s.college_id, s.program_id, COUNT(*)
+    FROM students s
+    LEFT JOIN programs p ON s.program_id = p.id
+    {where}
+    GROUP BY GROUPING SETS ((), (s.year_level), (s.gender), (s.college_id), (s.program_id))
+"""
+FACET_GROUPING_SETS = {15: "all", 7: "year_level", 11: "gender", 13: "college_id", 14: "program_id"}
+
+# Ranked, typo-tolerant match on the student's search_key (id number and
+# names) or on their program's code and name; see migration 0006.  A word
+# starting with the term gets a bonus so prefix-as-you-type ranks first.
+STUDENT_SEARCH_SQL = """
+    SELECT s.student_id, s.id_number, s.last_name, s.first_name, s.gender, s.year_level,
+        s.college_id, s.program_id,
+        COALESCE(p.program_code, 'N/A') AS program_code,
+        COALESCE(p.program_name, 'N/A') AS program_name,
+        s.photo_url,
+        m.score::float8
+    FROM (
+        SELECT student_id, MAX(score) AS score
+        FROM (
+            SELECT s.student_id,
+                word_similarity(%s, s.search_key)
+                + CASE WHEN s.search_key LIKE %s OR s.search_key LIKE %s THEN 0.5 ELSE 0 END AS score
+            FROM students s
+            WHERE %s <%% s.search_key
+            UNION ALL
+            -- Every student of a program gets the program's score, so only
+            -- its first LIMIT students by student_id can make the cut.
+            SELECT s.student_id, 0.8 * p.similarity
+            FROM (
+                SELECT id, word_similarity(%s, LOWER(program_code || ' ' || program_name)) AS similarity
+                FROM programs
+                WHERE %s <%% LOWER(program_code || ' ' || program_name)
+            ) p
+            CROSS JOIN LATERAL (
+                SELECT student_id FROM students
+                WHERE program_id = p.id
+                ORDER BY student_id
+                LIMIT %s
+            ) s
+        ) candidates
+        GROUP BY student_id
+        ORDER BY score DESC, student_id
+        LIMIT %s
+    ) m
+    JOIN students s ON s.student_id = m.student_id
+    LEFT JOIN programs p ON s.program_id = p.id
+    ORDER BY m.score DESC, s.student_id
+"""
+queries.register("student.search", STUDENT_SEARCH_SQL)
+
+StudentMatch = row_type("StudentMatch", STUDENT_COLUMNS + ("score",))
+
+# Whitelist of sortable fields -> SQL expression used for ORDER BY and keyset.
+STUDENT_SORT_COLUMNS = {
+    "student_id": "s.student_id",
+    "id_number": "s.id_number",
+    "last_name": "s.last_name",
+    "first_name": "s.first_name",
+    "gender": "s.gender",
+    "year_level": "s.year_level",
+    "program_code": "COALESCE(p.program_code, 'N/A')",
+    "program_name": "COALESCE(p.program_name, 'N/A')",
+}
+
+
 class Student:
     def __init__(self, student_id=None, id_number=None, last_name=None, first_name=None, gender=None, year_level=None, college_id=None, program_id=None, program_code=None, program_name=None, photo_url=None):
         self.student_id = student_id
@@ -340,11 +610,17 @@ class Student:
         self.photo_url = photo_url
 
     def add(self):
+        """Insert the student; raises ``Conflict`` if the id number is taken."""
         db = get_db()
         cursor = db.cursor()
-        sql = """INSERT INTO students (id_number, last_name, first_name, gender, year_level, college_id, program_id, photo_url)
-                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"""
-        cursor.execute(sql, (self.id_number, self.last_name, self.first_name, self.gender, self.year_level, self.college_id, self.program_id, self.photo_url))
+        queries.execute(cursor, "student.add", (self.id_number, self.last_name, self.first_name, self.gender, self.year_level, self.college_id, self.program_id, self.photo_url))
+        row = cursor.fetchone()
+        if row is None:
+            db.rollback()
+            cursor.close()
+            raise Conflict("ID number already exists")
+        self.student_id = row[0]
+        EnrolmentStats.move(cursor, new=(self.college_id, self.program_id, self.year_level, self.gender))
         db.commit()
         cursor.close()
 
@@ -353,13 +629,12 @@ class Student:
         try:
             db = get_db()
             cursor = db.cursor()
-            cursor.execute("SELECT student_id FROM students WHERE id_number = %s", (id_number,))
-            result = cursor.fetchone()
-            if not result:
+            queries.execute(cursor, "student.delete", (id_number,))
+            old = cursor.fetchone()
+            if not old:
                 return False  # no student found
 
-            student_id = result[0]
-            cursor.execute("DELETE FROM students WHERE student_id = %s", (student_id,))
+            EnrolmentStats.move(cursor, old=old)
             db.commit()
             cursor.close()
             return True
@@ -372,59 +647,172 @@ class Student:
         try:
             db = get_db()
             cursor = db.cursor()
-            sql = """
-                UPDATE students
-                SET last_name = %s, first_name = %s, gender = %s, year_level = %s,
-                    college_id = %s, program_id = %s, photo_url = %s
-                WHERE id_number = %s
-            """
-            cursor.execute(sql, (last_name, first_name, gender, year_level, college_id, program_id, photo_url, id_number))
+            queries.execute(cursor, "student.update", (last_name, first_name, gender, year_level, college_id, program_id, photo_url, id_number))
+            old = cursor.fetchone()
+            if old:
+                EnrolmentStats.move(cursor, old=old, new=(college_id, program_id, year_level, gender))
             db.commit()
             cursor.close()
-            return cursor.rowcount > 0
+            return old is not None
         except Exception as e:
             print(f"Error updating student: {e}")
             return False
 
     @classmethod
-    def all(cls):
+    def _from_row(cls, row):
+        return cls(*row)
+
+    @staticmethod
+    def _fetch_all():
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("""
-        SELECT s.student_id, s.id_number, s.last_name, s.first_name, s.gender, s.year_level,
-            s.college_id, s.program_id,
-            COALESCE(p.program_code, 'N/A') AS program_code,
-            COALESCE(p.program_name, 'N/A') AS program_name,
-            s.photo_url
-        FROM students s
-        LEFT JOIN programs p ON s.program_id = p.id
-        LEFT JOIN colleges c ON s.college_id = c.id
-        """)
+        queries.execute(cursor, "student.all")
         result = cursor.fetchall()
         cursor.close()
+        return result
 
-        return [
-            cls(
-                student_id=row[0],
-                id_number=row[1],
-                last_name=row[2],
-                first_name=row[3],
-                gender=row[4],
-                year_level=row[5],
-                college_id=row[6],
-                program_id=row[7],
-                program_code=row[8],
-                program_name=row[9],
-                photo_url=row[10]
-            )
-            for row in result
-        ]
+    @classmethod
+    def all(cls):
+        return [cls._from_row(row) for row in Student._fetch_all()]
+
+    @staticmethod
+    def all_rows():
+        """The roster as ``StudentRow`` tuples, for the search index."""
+        return [StudentRow._make(row) for row in Student._fetch_all()]
+
+    @staticmethod
+    def iter_rows(itersize=2000):
+        """Yield raw student rows from a server-side cursor, ``itersize`` rows per fetch."""
+        db = get_db()
+        cursor = db.cursor(name=f"student_export_{uuid.uuid4().hex}")
+        cursor.itersize = itersize
+        try:
+            cursor.execute(f"{STUDENT_SELECT} ORDER BY s.student_id")
+            for row in cursor:
+                yield row
+        finally:
+            cursor.close()
+            db.rollback()
+
+    @staticmethod
+    def build_filters(college_id=None, program_id=None, gender=None, year_level=None, q=None, ids=None):
+        clauses = []
+        params = []
+        if ids:
+            clauses.append("s.student_id = ANY(%s)")
+            params.append(list(ids))
+        if college_id is not None:
+            clauses.append("s.college_id = %s")
+            params.append(college_id)
+        if program_id is not None:
+            clauses.append("s.program_id = %s")
+            params.append(program_id)
+        if gender:
+            clauses.append("s.gender = %s")
+            params.append(gender)
+        if year_level:
+            clauses.append("s.year_level = %s")
+            params.append(year_level)
+        if q:
+            pattern = f"%{q}%"
+            clauses.append("""(
+                s.id_number ILIKE %s OR s.first_name ILIKE %s OR s.last_name ILIKE %s
+                OR (s.first_name || ' ' || s.last_name) ILIKE %s
+                OR p.program_code ILIKE %s OR p.program_name ILIKE %s
+            )""")
+            params.extend([pattern] * 6)
+        return clauses, params
+
+    @classmethod
+    def page(cls, limit=50, cursor_key=None, sort="student_id", order="asc",
+             include_total=False, **filters):
+        """Return one keyset page of students as ``(students, next_key, has_more, total)``.
+
+        ``cursor_key`` is the ``(sort_value, student_id)`` pair of the last row
+        of the previous page; ``student_id`` breaks ties so the ordering is
+        total.  ``total`` is only computed when ``include_total`` is set.
+        """
+        sort_expr = STUDENT_SORT_COLUMNS[sort]
+        direction = "DESC" if order == "desc" else "ASC"
+        comparator = "<" if order == "desc" else ">"
+
+        clauses, params = cls.build_filters(**filters)
+        filter_clauses, filter_params = list(clauses), list(params)
+
+        if cursor_key is not None:
+            last_value, last_id = cursor_key
+            if sort == "student_id":
+                clauses.append(f"s.student_id {comparator} %s")
+                params.append(last_id)
+            else:
+                clauses.append(f"({sort_expr}, s.student_id) {comparator} (%s, %s)")
+                params.extend([last_value, last_id])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        if sort == "student_id":
+            order_by = f"ORDER BY s.student_id {direction}"
+        else:
+            order_by = f"ORDER BY {sort_expr} {direction}, s.student_id {direction}"
+
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute(
+            f"{STUDENT_SELECT} {where} {order_by} LIMIT %s",
+            (*params, limit + 1)
+        )
+        rows = cursor.fetchall()
+
+        total = None
+        if include_total:
+            count_where = f"WHERE {' AND '.join(filter_clauses)}" if filter_clauses else ""
+            cursor.execute(f"""
+                SELECT COUNT(*)
+                FROM students s
+                LEFT JOIN programs p ON s.program_id = p.id
+                {count_where}
+            """, filter_params)
+            total = cursor.fetchone()[0]
+        cursor.close()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        students = [cls._from_row(row) for row in rows]
+
+        next_key = None
+        if has_more and students:
+            last = students[-1]
+            next_key = (getattr(last, sort), last.student_id)
+        return students, next_key, has_more, total
+
+    @staticmethod
+    def search(term, limit=20, similarity=0.4):
+        """Best matches for ``term`` as ``StudentMatch`` rows, highest score first."""
+        term = search.normalise(term)
+        if not term:
+            return []
+
+        if search.backend() == "ngram":
+            matches = search.ngram_index.search(term, Student.all_rows, limit=limit, similarity=similarity)
+            return [StudentMatch(*row, score) for row, score in matches]
+
+        escaped = search.like_escape(term)
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)", (str(similarity),)
+        )
+        queries.execute(cursor, "student.search", (
+            term, escaped + "%", "% " + escaped + "%", term, term, term, limit, limit
+        ))
+        result = cursor.fetchall()
+        cursor.close()
+        return [StudentMatch._make(row) for row in result]
 
     @staticmethod
     def exists(id_number):
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("SELECT id_number FROM students WHERE id_number = %s", (id_number,))
+        queries.execute(cursor, "student.exists", (id_number,))
         result = cursor.fetchone()
         cursor.close()
         return result is not None
@@ -437,23 +825,9 @@ class Student:
             
         cursor = db.cursor()
         try:
-            cursor.execute("""
-                SELECT DISTINCT year_level 
-                FROM students 
-                WHERE year_level IS NOT NULL 
-                ORDER BY year_level
-            """)
+            queries.execute(cursor, "student.year_levels")
             result = cursor.fetchall()
-            
-            year_levels = []
-            for row in result:
-                val = row[0]
-                try:
-                    year_levels.append(int(val))
-                except (ValueError, TypeError):
-                    if val: year_levels.append(str(val))
-            
-            return sorted(list(set(year_levels)))
+            return Student.normalise_year_levels(row[0] for row in result)
         except Exception as e:
             print(f"Database Query Error: {e}") 
             raise e
@@ -467,14 +841,313 @@ class Student:
         db = get_db()
         cursor = db.cursor()
 
-        cursor.execute("""
-            SELECT DISTINCT gender
-            FROM students
-            WHERE gender IS NOT NULL
-            ORDER BY gender
-        """)
+        queries.execute(cursor, "student.genders")
 
         result = cursor.fetchall()
         cursor.close()
 
-        return sorted({row[0].strip().lower() for row in result if row[0]})
+        return Student.normalise_genders(row[0] for row in result)
+
+    @staticmethod
+    def facets(**filters):
+        """Per-value student counts for every filter dimension.
+
+        Without filters the counts come from ``student_facets``; with filters
+        (the ``build_filters`` arguments) they are counted over the matching
+        students in one grouping-sets query.
+        """
+        clauses, params = Student.build_filters(**filters)
+        db = get_db()
+        cursor = db.cursor()
+        if clauses:
+            cursor.execute(
+                STUDENT_FACETS_SCOPED_SQL.format(where=f"WHERE {' AND '.join(clauses)}"), params
+            )
+        else:
+            queries.execute(cursor, "student.facets")
+        counts = Student.facet_counts(cursor.fetchall(), scoped=bool(clauses))
+        queries.execute(cursor, "student.facets.colleges")
+        colleges = cursor.fetchall()
+        queries.execute(cursor, "student.facets.programs")
+        programs = cursor.fetchall()
+        cursor.close()
+        return Student.shape_facets(counts, colleges, programs)
+
+    @staticmethod
+    def facet_counts(rows, scoped):
+        """``{dimension: {value: count}}`` from ``student.facets`` rows, or scoped grouping-sets rows."""
+        counts = {dimension: {} for dimension in FACET_GROUPING_SETS.values()}
+        if scoped:
+            for grouping, year_level, gender, college_id, program_id, count in rows:
+                dimension = FACET_GROUPING_SETS[grouping]
+                value = {"all": "", "year_level": year_level, "gender": gender,
+                         "college_id": college_id, "program_id": program_id}[dimension]
+                if value is not None:
+                    counts[dimension][str(value)] = count
+        else:
+            for dimension, value, count in rows:
+                counts.setdefault(dimension, {})[value] = count
+        return counts
+
+    @staticmethod
+    def shape_facets(counts, college_rows, program_rows):
+        colleges = [
+            {"id": cid, "college_code": code, "college_name": name,
+             "count": counts["college_id"].get(str(cid), 0)}
+            for cid, code, name in college_rows
+        ]
+        programs = [
+            {"id": pid, "program_code": code, "program_name": name, "college_id": college_id,
+             "count": counts["program_id"].get(str(pid), 0)}
+            for pid, code, name, college_id in program_rows
+        ]
+
+        year_levels = {}
+        for value, count in counts["year_level"].items():
+            key = int(value) if value.isdigit() else value
+            year_levels[key] = year_levels.get(key, 0) + count
+        genders = {}
+        for value, count in counts["gender"].items():
+            key = value.strip().lower()
+            genders[key] = genders.get(key, 0) + count
+
+        return {
+            "total": counts["all"].get("", 0),
+            "year_levels": [
+                {"value": value, "count": year_levels[value]}
+                for value in sorted(year_levels, key=lambda v: (isinstance(v, str), str(v).zfill(3)))
+            ],
+            "genders": [{"value": value, "count": genders[value]} for value in sorted(genders)],
+            "colleges": colleges,
+            "programs": programs,
+        }
+
+    @staticmethod
+    def normalise_year_levels(values):
+        year_levels = []
+        for val in values:
+            try:
+                year_levels.append(int(val))
+            except (ValueError, TypeError):
+                if val: year_levels.append(str(val))
+        
+        return sorted(list(set(year_levels)))
+
+    @staticmethod
+    def normalise_genders(values):
+        return sorted({val.strip().lower() for val in values if val})
+
+
+
+# Statistics cells, see migration 0008.  Ids are stored as 0 when missing.
+queries.register("stats.cell", """
+    INSERT INTO enrolment_stats AS e (college_id, program_id, year_level, gender, count)
+    VALUES (COALESCE(%s::int, 0), COALESCE(%s::int, 0), %s, %s, %s)
+    ON CONFLICT (college_id, program_id, year_level, gender)
+    DO UPDATE SET count = e.count + EXCLUDED.count
+""")
+ENROLMENT_DETACH_SQL = {
+    column: f"""
+        WITH moved AS (
+            DELETE FROM enrolment_stats WHERE {column} = ANY(%s)
+            RETURNING college_id, program_id, year_level, gender, count
+        )
+        INSERT INTO enrolment_stats AS e (college_id, program_id, year_level, gender, count)
+        SELECT {"0" if column == "college_id" else "college_id"},
+            {"0" if column == "program_id" else "program_id"},
+            year_level, gender, SUM(count)
+        FROM moved
+        GROUP BY 1, 2, 3, 4
+        ON CONFLICT (college_id, program_id, year_level, gender)
+        DO UPDATE SET count = e.count + EXCLUDED.count
+    """
+    for column in ("college_id", "program_id")
+}
+ENROLMENT_APPLY_SQL = """
+    INSERT INTO enrolment_stats AS e (college_id, program_id, year_level, gender, count)
+    VALUES %s
+    ON CONFLICT (college_id, program_id, year_level, gender)
+    DO UPDATE SET count = e.count + EXCLUDED.count
+"""
+ENROLMENT_ACTUAL_SQL = """
+    SELECT COALESCE(college_id, 0) AS college_id, COALESCE(program_id, 0) AS program_id,
+        year_level, gender, COUNT(*)::int AS count
+    FROM students
+    GROUP BY 1, 2, 3, 4
+"""
+queries.register("stats.cells", """
+    SELECT college_id, program_id, year_level, gender, count
+    FROM enrolment_stats
+    WHERE count > 0
+""")
+queries.register("stats.summary", """
+    SELECT COALESCE(SUM(count), 0)::int,
+        (SELECT COUNT(*) FROM colleges)::int,
+        (SELECT COUNT(*) FROM programs)::int,
+        (SELECT reconciled_at FROM enrolment_stats_reconciled)
+    FROM enrolment_stats
+""")
+
+# Arbitrary key for pg_try_advisory_xact_lock so one worker reconciles at a time.
+RECONCILE_LOCK_ID = 72707370
+
+
+class EnrolmentStats:
+    """Enrolment counts kept current by the student, program and college write paths."""
+
+    @staticmethod
+    def move(cursor, old=None, new=None):
+        """Move one student between cells; ``old``/``new`` are ``(college_id, program_id, year_level, gender)``."""
+        if old is not None and new is not None and tuple(old) == tuple(new):
+            return
+        if old is not None:
+            queries.execute(cursor, "stats.cell", (*old, -1))
+        if new is not None:
+            queries.execute(cursor, "stats.cell", (*new, 1))
+
+    @staticmethod
+    def apply(cursor, deltas):
+        """Add ``{(college_id, program_id, year_level, gender): delta}`` to the cells in one statement.
+
+        Cells are written in sorted order so concurrent bulk writers lock
+        them in the same order.
+        """
+        totals = {}
+        for (college_id, program_id, year_level, gender), delta in deltas.items():
+            cell = (college_id or 0, program_id or 0, year_level, gender)
+            totals[cell] = totals.get(cell, 0) + delta
+        rows = sorted((*cell, delta) for cell, delta in totals.items() if delta)
+        if rows:
+            execute_values(cursor, ENROLMENT_APPLY_SQL, rows, page_size=len(rows))
+
+    @staticmethod
+    def detach(cursor, column, values):
+        """Fold the cells of deleted colleges or programs into the 'none' cells."""
+        cursor.execute(ENROLMENT_DETACH_SQL[column], (list(values),))
+
+    @staticmethod
+    def reconcile_in(cursor):
+        """Rebuild the cells from ``students`` inside the caller's transaction.
+
+        Returns the number of cells that had drifted.  The table lock makes
+        concurrent writers queue their deltas behind the rebuild, so this is
+        for the periodic job only; write paths apply deltas.
+        """
+        cursor.execute("LOCK TABLE enrolment_stats IN EXCLUSIVE MODE")
+        cursor.execute(f"""
+            SELECT COUNT(*)
+            FROM ({ENROLMENT_ACTUAL_SQL}) a
+            FULL JOIN enrolment_stats e USING (college_id, program_id, year_level, gender)
+            WHERE COALESCE(a.count, 0) <> COALESCE(e.count, 0)
+        """)
+        drifted = cursor.fetchone()[0]
+        if drifted:
+            cursor.execute("DELETE FROM enrolment_stats")
+            cursor.execute(f"""
+                INSERT INTO enrolment_stats (college_id, program_id, year_level, gender, count)
+                {ENROLMENT_ACTUAL_SQL}
+            """)
+        cursor.execute("""
+            UPDATE enrolment_stats_reconciled SET reconciled_at = NOW(), corrected_cells = %s
+        """, (drifted,))
+        return drifted
+
+    @staticmethod
+    def reconcile(wait=True):
+        """Full reconciliation in its own transaction; ``None`` if another worker holds the lock."""
+        db = get_db()
+        cursor = db.cursor()
+        try:
+            if wait:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", (RECONCILE_LOCK_ID,))
+            else:
+                cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", (RECONCILE_LOCK_ID,))
+                if not cursor.fetchone()[0]:
+                    db.rollback()
+                    return None
+            drifted = EnrolmentStats.reconcile_in(cursor)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+        return drifted
+
+    @staticmethod
+    def summary():
+        db = get_db()
+        cursor = db.cursor()
+        queries.execute(cursor, "stats.summary")
+        students, colleges, programs, reconciled_at = cursor.fetchone()
+        cursor.close()
+        return {
+            "students": students,
+            "colleges": colleges,
+            "programs": programs,
+            "reconciled_at": reconciled_at.isoformat() if reconciled_at else None,
+        }
+
+    @staticmethod
+    def report():
+        """Counts by college, program, year level and gender, plus the pairwise cross-tabs.
+
+        Everything is aggregated from the cell table, whose size depends on
+        the catalogue rather than the roster.
+        """
+        db = get_db()
+        cursor = db.cursor()
+        queries.execute(cursor, "stats.cells")
+        cells = cursor.fetchall()
+        queries.execute(cursor, "student.facets.colleges")
+        colleges = cursor.fetchall()
+        queries.execute(cursor, "student.facets.programs")
+        programs = cursor.fetchall()
+        cursor.close()
+
+        dimensions = ("college_id", "program_id", "year_level", "gender")
+        totals = {d: {} for d in dimensions}
+        crosstabs = {}
+        pairs = [(a, b) for i, a in enumerate(dimensions) for b in dimensions[i + 1:]]
+        for cell in cells:
+            values = dict(zip(dimensions, cell[:4]))
+            count = cell[4]
+            for d in dimensions:
+                totals[d][values[d]] = totals[d].get(values[d], 0) + count
+            for a, b in pairs:
+                table = crosstabs.setdefault(f"{a}_by_{b}", {})
+                key = (values[a], values[b])
+                table[key] = table.get(key, 0) + count
+
+        by_college = [
+            {"college_id": cid, "college_code": code, "college_name": name,
+             "count": totals["college_id"].get(cid, 0)}
+            for cid, code, name in colleges
+        ]
+        by_program = [
+            {"program_id": pid, "program_code": code, "program_name": name, "college_id": college_id,
+             "count": totals["program_id"].get(pid, 0)}
+            for pid, code, name, college_id in programs
+        ]
+        return {
+            "total": sum(cell[4] for cell in cells),
+            "by_college": by_college,
+            "by_program": by_program,
+            "unassigned": {
+                "college": totals["college_id"].get(0, 0),
+                "program": totals["program_id"].get(0, 0),
+            },
+            "by_year_level": [
+                {"year_level": k, "count": v} for k, v in sorted(totals["year_level"].items())
+            ],
+            "by_gender": [
+                {"gender": k, "count": v} for k, v in sorted(totals["gender"].items())
+            ],
+            "crosstabs": {
+                name: [
+                    {name.split("_by_")[0]: a, name.split("_by_")[1]: b, "count": count}
+                    for (a, b), count in sorted(table.items(), key=lambda item: (str(item[0][0]), str(item[0][1])))
+                ]
+                for name, table in crosstabs.items()
+            },
+        }
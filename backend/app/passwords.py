@@ -0,0 +1,125 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded worker pool.
+
+    bcrypt releases the GIL, so a thread pool gives real parallelism while
+    capping how many request threads can be tied up in hashing.  At most
+    ``workers + max_queue`` jobs may be in flight; beyond that callers get
+    :class:`HasherBusy` immediately instead of piling up.
+    """
+
+    def __init__(self, rounds=12, workers=4, max_queue=32, timeout=10.0):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        # Counters are bumped from request threads and bcrypt workers alike.
+        self._stats_lock = threading.Lock()
+        self._stats = {"hashed": 0, "verified": 0, "rejected": 0, "timeouts": 0, "in_flight": 0}
+
+    def _get_executor(self):
+        # Worker threads do not survive fork(), so build the pool per process.
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="bcrypt"
+                    )
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _count(self, name, delta=1):
+        with self._stats_lock:
+            self._stats[name] += delta
+
+    def _release(self, _future):
+        self._count("in_flight", -1)
+        self._slots.release()
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise HasherBusy("Password hashing capacity exhausted")
+        self._count("in_flight")
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._count("in_flight", -1)
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self._count("timeouts")
+            raise HasherBusy("Timed out waiting for password hashing")
+
+    def hash(self, password):
+        hashed = self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds))
+        self._count("hashed")
+        return hashed.decode('utf-8')
+
+    def verify(self, password, hashed):
+        try:
+            result = self._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError:
+            print("Error: Stored password is not a valid bcrypt hash.")
+            return False
+        self._count("verified")
+        return result
+
+    def needs_rehash(self, hashed):
+        # $2b$<cost>$<salt+hash>
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({"rounds": self.rounds, "workers": self.workers, "max_queue": self.max_queue})
+        return stats
+
+
+hasher = PasswordHasher()
+
+
+def hash_password(password):
+    return hasher.hash(password)
+
+
+def verify_password(password, hashed):
+    return hasher.verify(password, hashed)
+
+
+def needs_rehash(hashed):
+    return hasher.needs_rehash(hashed)
+
+
+def stats():
+    return hasher.stats()
+
+
+def init_app(app):
+    global hasher
+    hasher = PasswordHasher(
+        rounds=app.config.get("BCRYPT_ROUNDS", 12),
+        workers=app.config.get("PASSWORD_HASH_WORKERS", 4),
+        max_queue=app.config.get("PASSWORD_HASH_QUEUE", 32),
+        timeout=app.config.get("PASSWORD_HASH_TIMEOUT", 10.0),
+    )
@@ -0,0 +1,212 @@
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool.
+
+    Connections are handed out LIFO so the warmest ones get reused and the
+    rest age out through idle eviction.  A connection that has been idle for
+    longer than ``check_after`` seconds is pinged before it is handed out.
+    The lock only guards the bookkeeping: new connections are opened and
+    idle ones pinged outside it, so one slow handshake does not hold up
+    other checkouts and returns.
+    """
+
+    def __init__(self, dsn, minconn=1, maxconn=10, timeout=30.0,
+                 max_idle=300.0, check_after=30.0, connection_factory=None):
+        if minconn > maxconn:
+            raise ValueError("minconn must not exceed maxconn")
+
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.connection_factory = connection_factory
+
+        self._cond = threading.Condition()
+        self._idle = []  # list of (conn, returned_at)
+        self._in_use = set()
+        self._size = 0
+        self._closed = False
+
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "evicted_idle": 0,
+        }
+
+        for _ in range(minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+            self._stats["created"] += 1
+
+    def _connect(self):
+        if self.connection_factory is not None:
+            return psycopg2.connect(self.dsn, connection_factory=self.connection_factory)
+        return psycopg2.connect(self.dsn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._size -= 1
+        self._stats["closed"] += 1
+
+    def _is_healthy(self, conn, idle_for):
+        if conn.closed:
+            return False
+        if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if idle_for < self.check_after:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _evict_idle(self, now):
+        # Oldest idle connections sit at the front of the list.
+        while self._idle and self._size > self.minconn:
+            conn, returned_at = self._idle[0]
+            if now - returned_at < self.max_idle:
+                break
+            self._idle.pop(0)
+            self._discard(conn)
+            self._stats["evicted_idle"] += 1
+
+    def getconn(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeout("Connection pool is closed")
+
+                    now = time.monotonic()
+                    self._evict_idle(now)
+
+                    if self._idle:
+                        conn, returned_at = self._idle.pop()
+                        idle_for = now - returned_at
+                        break
+
+                    if self._size < self.maxconn:
+                        # Reserve the slot so other threads cannot overshoot
+                        # maxconn while we are in the handshake.
+                        self._size += 1
+                        conn, idle_for = None, 0.0
+                        break
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"Timed out after {self.timeout}s waiting for a database connection"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+
+            created = conn is None
+            if created:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(conn, idle_for):
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                    self._discard(conn)
+                    self._cond.notify()
+                continue
+
+            with self._cond:
+                if created:
+                    self._stats["created"] += 1
+                if self._closed:
+                    self._discard(conn)
+                    raise PoolTimeout("Connection pool is closed")
+                self._in_use.add(conn)
+                self._stats["checkouts"] += 1
+                if waited:
+                    wait_time = time.monotonic() - start
+                    self._stats["waits"] += 1
+                    self._stats["wait_time_total"] += wait_time
+                    self._stats["wait_time_max"] = max(self._stats["wait_time_max"], wait_time)
+            return conn
+
+    def putconn(self, conn, close=False):
+        with self._cond:
+            if conn not in self._in_use:
+                return
+
+        # Roll back outside the lock: it is a server round trip, and the
+        # connection stays checked out until it is done.
+        if not close and not conn.closed:
+            try:
+                # Never hand a connection with an open transaction to the
+                # next request.
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                close = True
+
+        with self._cond:
+            if conn not in self._in_use:
+                return
+            self._in_use.discard(conn)
+            if close or conn.closed or self._closed:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._discard(conn)
+            self._idle = []
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self._size,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "min": self.minconn,
+                "max": self.maxconn,
+            })
+        stats["wait_time_avg"] = (
+            stats["wait_time_total"] / stats["waits"] if stats["waits"] else 0.0
+        )
+        return stats
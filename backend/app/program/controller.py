@@ -1,26 +1,20 @@
 from flask import jsonify, request
 from . import program_bp
-from app.models import Program, College
+from app.models import Program, College, Conflict
 import traceback
 from flask_jwt_extended import jwt_required
+from app import batch
+from app.cache import cached_response
+from app.etag import conditional
 
 
 @program_bp.route("/programs", methods=["GET"], strict_slashes=False)
 @jwt_required()
+@conditional("programs.list", ("programs", "colleges", "students"))
+@cached_response("programs.list", depends_on=("programs", "colleges", "students"))
 def get_programs():
     programs = Program.all()
-    program_list = [
-        {
-            "id": p.id,
-            "program_code": p.program_code,
-            "program_name": p.program_name,
-            "college_id": p.college_id,
-            "college_name": getattr(p, "college_name", "N/A"),
-            "num_students": getattr(p, "num_students", 0)
-        }
-        for p in programs
-    ]
-    return jsonify({"programs": program_list}), 200
+    return jsonify({"programs": [p.to_dict() for p in programs]}), 200
 
 @program_bp.route("/programs", methods=["POST"])
 @jwt_required()
@@ -39,13 +33,13 @@ def add_program():
         if not re.match(name_regex, data["program_name"]) or not re.match(name_regex, data["program_code"]):
             return jsonify({"error": "Names should contain only letters and spaces"}), 400
 
-        if Program.exists(program_name):
-            return jsonify({"error": "Program name already exists"}), 400
-        
         formatted_name =  data["program_name"].strip().title()
 
         program = Program(program_code=program_code, program_name=formatted_name, college_id=college_id)
-        program.add()
+        try:
+            program.add()
+        except Conflict as e:
+            return jsonify({"error": str(e)}), 400
         return jsonify({
             "message": "Program added successfully",
             "program": {
@@ -93,12 +87,12 @@ def update_program(program_id):
             return jsonify({"error": "Names should contain only letters and spaces"}), 400
         
 
-        if Program.is_name_taken(program_name, program_id):
-            return jsonify({"error": "Program name already exists"}), 400
-
         formatted_name =  data["program_name"].strip().title()
 
-        success = Program.update_program(program_id, program_code, formatted_name, college_id)
+        try:
+            success = Program.update_program(program_id, program_code, formatted_name, college_id)
+        except Conflict as e:
+            return jsonify({"error": str(e)}), 400
         if success:
             return jsonify({"message": "Program updated successfully"}), 200
         else:
@@ -106,3 +100,10 @@ def update_program(program_id):
     except Exception as e:
         print(f"Error updating program: {e}")
         return jsonify({"error": "Server error"}), 500
+
+
+@program_bp.route("/programs/batch", methods=["POST"])
+@jwt_required()
+def batch_programs():
+    body, status = batch.handle_batch_request(batch.PROGRAMS, request.get_json(silent=True))
+    return jsonify(body), status
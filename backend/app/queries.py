@@ -0,0 +1,127 @@
+import re
+import threading
+import time
+import weakref
+
+_placeholder = re.compile(r"%s|%%")
+
+
+def to_positional(sql):
+    """Translate psycopg2 ``%s`` placeholders into Postgres ``$n`` ones."""
+    counter = iter(range(1, 10000))
+    return _placeholder.sub(lambda m: "%" if m.group(0) == "%%" else f"${next(counter)}", sql)
+
+
+class Query:
+    __slots__ = ("name", "sql", "statement", "prepare_sql", "execute_sql")
+
+    def __init__(self, name, sql):
+        self.name = name
+        self.sql = sql
+        self.statement = "q_" + re.sub(r"\W", "_", name)
+        nparams = len(re.findall(r"%s", sql))
+        self.prepare_sql = f"PREPARE {self.statement} AS {to_positional(sql)}"
+        if nparams:
+            self.execute_sql = f"EXECUTE {self.statement} ({', '.join(['%s'] * nparams)})"
+        else:
+            self.execute_sql = f"EXECUTE {self.statement}"
+
+
+class QueryRegistry:
+    """Named SQL statements, prepared once per pooled connection.
+
+    ``execute`` issues ``PREPARE`` the first time a connection runs a query
+    and ``EXECUTE`` after that, so Postgres parses and plans each statement
+    once per session instead of once per call.  Every call is timed under
+    the query's name.
+    """
+
+    def __init__(self, prepare=True):
+        self.prepare = prepare
+        self._queries = {}
+        self._prepared = weakref.WeakKeyDictionary()  # connection -> set of query names
+        self._lock = threading.Lock()
+        self._timings = {}  # name -> [calls, total, max]
+
+    def register(self, name, sql):
+        if name in self._queries and self._queries[name].sql != sql:
+            raise ValueError(f"Query '{name}' is already registered with different SQL")
+        query = Query(name, sql)
+        self._queries[name] = query
+        return query
+
+    def get(self, name):
+        return self._queries[name]
+
+    def _prepared_on(self, conn):
+        with self._lock:
+            prepared = self._prepared.get(conn)
+            if prepared is None:
+                prepared = self._prepared[conn] = set()
+            return prepared
+
+    def _record(self, name, elapsed):
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                self._timings[name] = [1, elapsed, elapsed]
+            else:
+                timing[0] += 1
+                timing[1] += elapsed
+                timing[2] = max(timing[2], elapsed)
+
+    def execute(self, cursor, name, params=()):
+        query = self._queries[name]
+        start = time.perf_counter()
+        try:
+            if self.prepare:
+                # A connection is only used by one thread at a time, so its
+                # set needs no locking once fetched.
+                prepared = self._prepared_on(cursor.connection)
+                if name not in prepared:
+                    cursor.execute(query.prepare_sql)
+                    prepared.add(name)
+                cursor.execute(query.execute_sql, params)
+            else:
+                cursor.execute(query.sql, params)
+        finally:
+            self._record(name, time.perf_counter() - start)
+        return cursor
+
+    def stats(self):
+        with self._lock:
+            timings = {name: list(t) for name, t in self._timings.items()}
+            connections = len(self._prepared)
+        queries = {}
+        for name in sorted(self._queries):
+            calls, total, worst = timings.get(name, (0, 0.0, 0.0))
+            queries[name] = {
+                "calls": calls,
+                "time_total_ms": round(total * 1000, 3),
+                "time_avg_ms": round(total / calls * 1000, 3) if calls else 0.0,
+                "time_max_ms": round(worst * 1000, 3),
+            }
+        return {"prepare": self.prepare, "connections": connections, "queries": queries}
+
+
+registry = QueryRegistry()
+
+
+def register(name, sql):
+    return registry.register(name, sql)
+
+
+def sql(name):
+    return registry.get(name).sql
+
+
+def execute(cursor, name, params=()):
+    return registry.execute(cursor, name, params)
+
+
+def stats():
+    return registry.stats()
+
+
+def init_app(app):
+    registry.prepare = app.config.get("QUERY_PREPARE", True)
@@ -0,0 +1,137 @@
+"""Login rate limiting.
+
+``RateLimiter`` counts in process memory, so with several workers each one
+enforces the limit on its own and a client can make up to ``limit`` times
+the number of workers attempts per window.  ``RedisRateLimiter`` keeps the
+counters in Redis so the limit holds across workers and serving modes;
+choose it with ``LOGIN_RATE_LIMIT_BACKEND=redis``.
+"""
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # optional dependency
+    redis = None
+
+
+class RateLimiter:
+    """Sliding-window rate limiter (two fixed windows, weighted) keyed by string."""
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self._counts = {}  # key -> (window_start, current, previous)
+        self._lock = threading.Lock()
+        self._next_prune = time.monotonic() + window
+
+    def _estimate(self, key, now):
+        start, current, previous = self._counts.get(key, (now, 0, 0))
+        elapsed = now - start
+        if elapsed >= 2 * self.window:
+            start, current, previous = now, 0, 0
+        elif elapsed >= self.window:
+            start, current, previous = start + self.window, 0, current
+            elapsed -= self.window
+        weight = max(0.0, 1 - elapsed / self.window)
+        return (start, current, previous), current + previous * weight
+
+    def hit(self, key):
+        """Record an attempt; returns ``(allowed, retry_after_seconds)``."""
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            state, used = self._estimate(key, now)
+            start, current, previous = state
+            if used >= self.limit:
+                self._counts[key] = state
+                return False, max(1, int(start + self.window - now) + 1)
+            self._counts[key] = (start, current + 1, previous)
+            return True, 0
+
+    def reset(self, key):
+        with self._lock:
+            self._counts.pop(key, None)
+
+    def _prune(self, now):
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.window
+        stale = [k for k, (start, _, _) in self._counts.items() if now - start >= 2 * self.window]
+        for key in stale:
+            del self._counts[key]
+
+
+# KEYS: current window counter, previous window counter.
+# ARGV: limit, weight of the previous window, counter TTL in seconds.
+_HIT_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if current + previous * tonumber(ARGV[2]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RedisRateLimiter:
+    """:class:`RateLimiter` with its counters in Redis, shared by every worker.
+
+    Windows are aligned to wall-clock multiples of ``window`` so all workers
+    agree on them; the check and the increment run as one script.  If Redis
+    is unreachable the attempt is counted by a per-process limiter instead.
+    """
+
+    def __init__(self, limit, window, url, prefix):
+        self.limit = limit
+        self.window = window
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._hit = self._client.register_script(_HIT_SCRIPT)
+        self._fallback = RateLimiter(limit, window)
+
+    def _keys(self, key, index):
+        return [f"{self.prefix}{key}:{index}", f"{self.prefix}{key}:{index - 1}"]
+
+    def hit(self, key):
+        """Record an attempt; returns ``(allowed, retry_after_seconds)``."""
+        now = time.time()
+        index = int(now // self.window)
+        start = index * self.window
+        weight = max(0.0, 1 - (now - start) / self.window)
+        try:
+            allowed = self._hit(keys=self._keys(key, index), args=[self.limit, weight, int(2 * self.window) + 1])
+        except redis.RedisError as e:
+            print(f"[ratelimit] Redis unavailable, counting per worker: {e}")
+            return self._fallback.hit(key)
+        if not allowed:
+            return False, max(1, int(start + self.window - now) + 1)
+        return True, 0
+
+    def reset(self, key):
+        self._fallback.reset(key)
+        try:
+            self._client.delete(*self._keys(key, int(time.time() // self.window)))
+        except redis.RedisError as e:
+            print(f"[ratelimit] Could not reset {key}: {e}")
+
+
+login_by_user = RateLimiter(limit=5, window=60)
+login_by_ip = RateLimiter(limit=20, window=60)
+
+
+def _limiter(app, name, limit):
+    window = app.config.get("LOGIN_RATE_LIMIT_WINDOW", 60)
+    if app.config.get("LOGIN_RATE_LIMIT_BACKEND", "local") == "redis":
+        if redis is not None and app.config.get("REDIS_URL"):
+            return RedisRateLimiter(limit, window, app.config["REDIS_URL"], prefix=f"ssis:ratelimit:{name}:")
+        print("[ratelimit] redis not available, counting login attempts per worker")
+    return RateLimiter(limit=limit, window=window)
+
+
+def init_app(app):
+    global login_by_user, login_by_ip
+    login_by_user = _limiter(app, "user", app.config.get("LOGIN_RATE_LIMIT_USER", 5))
+    login_by_ip = _limiter(app, "ip", app.config.get("LOGIN_RATE_LIMIT_IP", 20))
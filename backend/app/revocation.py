@@ -0,0 +1,182 @@
+import threading
+import time
+
+from app.database import get_db
+
+
+class LocalBackend:
+    """In-process stand-in for the shared store (single worker / development)."""
+
+    def __init__(self):
+        self._entries = {}  # jti -> (seq, expires_at)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._seq += 1
+            self._entries[jti] = (self._seq, expires_at)
+
+    def changes_since(self, last_seq):
+        now = time.time()
+        with self._lock:
+            changes = [
+                (seq, jti, expires_at)
+                for jti, (seq, expires_at) in self._entries.items()
+                if seq > last_seq and expires_at > now
+            ]
+            return changes, self._seq
+
+    def purge(self):
+        now = time.time()
+        with self._lock:
+            for jti in [j for j, (_, exp) in self._entries.items() if exp <= now]:
+                del self._entries[jti]
+
+
+class PostgresBackend:
+    """Revocations stored in ``revoked_tokens``, shared by every worker."""
+
+    def add(self, jti, expires_at):
+        db = get_db()
+        cursor = db.cursor()
+        try:
+            cursor.execute(
+                """INSERT INTO revoked_tokens (jti, expires_at)
+                   VALUES (%s, to_timestamp(%s))
+                   ON CONFLICT (jti) DO NOTHING""",
+                (jti, expires_at)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def changes_since(self, last_seq):
+        # Ids become visible in commit order (migration 0012), so nothing
+        # can commit below the watermark later.
+        db = get_db()
+        cursor = db.cursor()
+        try:
+            cursor.execute(
+                """SELECT id, jti, EXTRACT(EPOCH FROM expires_at)
+                   FROM revoked_tokens
+                   WHERE id > %s AND expires_at > NOW()
+                   ORDER BY id""",
+                (last_seq,)
+            )
+            rows = cursor.fetchall()
+        except Exception:
+            # Runs inside whatever request triggered the sync; leave its
+            # connection usable.
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+        changes = [(seq, jti, float(exp)) for seq, jti, exp in rows]
+        return changes, (changes[-1][0] if changes else last_seq)
+
+    def purge(self):
+        db = get_db()
+        cursor = db.cursor()
+        try:
+            cursor.execute("DELETE FROM revoked_tokens WHERE expires_at <= NOW()")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+class RevocationStore:
+    """Token blocklist with a local front cache.
+
+    The front cache is a dict of every live revoked ``jti`` mirrored from
+    the shared backend.  It is refreshed incrementally at most every
+    ``sync_interval`` seconds, so the per-request check is a clock read and
+    a dict lookup.  Entries drop out once the token would have expired
+    anyway, which keeps the mirror bounded by the token lifetime.
+    """
+
+    def __init__(self, backend=None, sync_interval=2.0, purge_interval=300.0):
+        self.backend = backend or LocalBackend()
+        self.sync_interval = sync_interval
+        self.purge_interval = purge_interval
+        self._local = {}  # jti -> expires_at
+        self._last_seq = 0
+        self._next_sync = 0.0
+        self._next_purge = time.time() + purge_interval
+        self._lock = threading.Lock()
+        self._stats = {"checks": 0, "revoked_hits": 0, "syncs": 0, "sync_errors": 0}
+
+    def revoke(self, jti, expires_at):
+        self.backend.add(jti, expires_at)
+        self._local[jti] = expires_at
+
+    def is_revoked(self, jti):
+        self._stats["checks"] += 1
+        if time.time() >= self._next_sync:
+            self.sync()
+        if jti in self._local:
+            self._stats["revoked_hits"] += 1
+            return True
+        return False
+
+    def sync(self):
+        if not self._lock.acquire(blocking=False):
+            return  # another thread is already syncing
+        try:
+            now = time.time()
+            self._next_sync = now + self.sync_interval
+            try:
+                changes, self._last_seq = self.backend.changes_since(self._last_seq)
+                if now >= self._next_purge:
+                    self._next_purge = now + self.purge_interval
+                    self.backend.purge()
+            except Exception as e:
+                self._stats["sync_errors"] += 1
+                print(f"[revocation] Sync failed: {e}")
+                return
+            for _, jti, expires_at in changes:
+                self._local[jti] = expires_at
+            expired = [jti for jti, exp in list(self._local.items()) if exp <= now]
+            for jti in expired:
+                self._local.pop(jti, None)
+            self._stats["syncs"] += 1
+        finally:
+            self._lock.release()
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats.update({
+            "backend": type(self.backend).__name__,
+            "cached_revocations": len(self._local),
+        })
+        return stats
+
+
+store = RevocationStore()
+
+
+def revoke(jti, expires_at):
+    store.revoke(jti, expires_at)
+
+
+def is_revoked(jti):
+    return store.is_revoked(jti)
+
+
+def stats():
+    return store.stats()
+
+
+def init_app(app):
+    global store
+    backend = PostgresBackend() if app.config.get("REVOCATION_BACKEND", "postgres") == "postgres" else LocalBackend()
+    store = RevocationStore(
+        backend=backend,
+        sync_interval=app.config.get("REVOCATION_SYNC_INTERVAL", 2.0),
+    )
@@ -0,0 +1,185 @@
+import heapq
+import re
+import threading
+from array import array
+
+from flask import current_app
+
+from app.database import table_versions
+
+_words = re.compile(r"\w+")
+
+
+def normalise(term):
+    return " ".join(term.lower().split())
+
+
+def like_escape(term):
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def trigrams(text):
+    """Trigrams the way pg_trgm builds them: per word, padded with two leading and one trailing space."""
+    grams = set()
+    for word in _words.findall(text.lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class NgramIndex:
+    """In-process trigram index over students, used when pg_trgm is unavailable.
+
+    Scores mirror the SQL path: the share of the term's trigrams found in a
+    student's document, plus a bonus when some word starts with the term.
+
+    The index is one immutable snapshot, ``(version, rows, documents,
+    postings)``, replaced by a single assignment, so searches never lock.
+    When the students or programs rows in ``table_versions`` move (writes
+    from any worker, the importer or the CLI), the next search starts a
+    rebuild in a background thread and keeps answering from the old
+    snapshot until it is swapped in.  Only the very first build blocks.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._builder = None
+        self._stats = {"builds": 0, "build_errors": 0}
+
+    @staticmethod
+    def _build(version, rows):
+        postings = {}
+        documents = []
+        for position, row in enumerate(rows):
+            document = normalise(" ".join(str(v) for v in (
+                row.id_number, row.first_name, row.last_name, row.program_code, row.program_name
+            )))
+            documents.append(document)
+            for gram in trigrams(document):
+                postings.setdefault(gram, []).append(position)
+        postings = {gram: array("I", positions) for gram, positions in postings.items()}
+        return version, tuple(rows), tuple(documents), postings
+
+    @staticmethod
+    def _load(loader):
+        # Versions first: rows read afterwards are at least that new, so a
+        # write racing the load costs one more rebuild, never a stale index.
+        version = tuple(table_versions(("students", "programs")))
+        return version, loader()
+
+    def _rebuild(self, app, loader):
+        try:
+            with app.app_context():
+                snapshot = self._build(*self._load(loader))
+            self._snapshot = snapshot
+            self._stats["builds"] += 1
+        except Exception as e:
+            self._stats["build_errors"] += 1
+            print(f"[search] Index rebuild failed: {e}")
+        finally:
+            with self._lock:
+                self._builder = None
+
+    def _ensure(self, loader):
+        version = tuple(table_versions(("students", "programs")))
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot[0] == version:
+            return snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._build(*self._load(loader))
+                    self._stats["builds"] += 1
+                return self._snapshot
+        with self._lock:
+            if self._builder is None:
+                self._builder = threading.Thread(
+                    target=self._rebuild, args=(current_app._get_current_object(), loader),
+                    name="search-index", daemon=True,
+                )
+                self._builder.start()
+        return snapshot
+
+    def wait(self, timeout=None):
+        """Block until a background rebuild in progress has been swapped in."""
+        builder = self._builder
+        if builder is not None:
+            builder.join(timeout)
+
+    def reset(self):
+        self.wait()
+        self._snapshot = None
+
+    def search(self, term, loader, limit=20, similarity=0.4):
+        _, rows, documents, postings = self._ensure(loader)
+        term = normalise(term)
+        grams = trigrams(term)
+        if not grams:
+            return []
+
+        counts = {}
+        for gram in grams:
+            for position in postings.get(gram, ()):
+                counts[position] = counts.get(position, 0) + 1
+
+        word_prefix = " " + term
+        scored = []
+        for position, count in counts.items():
+            score = count / len(grams)
+            if score < similarity:
+                continue
+            document = documents[position]
+            if document.startswith(term) or word_prefix in document:
+                score += 0.5
+            scored.append((score, -rows[position].student_id, position))
+
+        best = heapq.nlargest(limit, scored)
+        return [(rows[position], score) for score, _, position in best]
+
+    def stats(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {"rows": 0, "trigrams": 0, "version": None, "rebuilding": False, **self._stats}
+        return {
+            "rows": len(snapshot[1]), "trigrams": len(snapshot[3]), "version": snapshot[0],
+            "rebuilding": self._builder is not None, **self._stats,
+        }
+
+
+ngram_index = NgramIndex()
+
+
+def backend(app=None):
+    """``trigram`` when the database has pg_trgm and the search index, else ``ngram``."""
+    app = app or current_app._get_current_object()
+    chosen = app.extensions.get("search_backend")
+    if chosen is not None:
+        return chosen
+
+    configured = app.config.get("SEARCH_BACKEND", "auto")
+    if configured != "auto":
+        chosen = configured
+    else:
+        from app.database import get_pool
+
+        pool = get_pool(app)
+        conn = pool.getconn()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')
+                    AND to_regclass('students_search_key_trgm_idx') IS NOT NULL
+            """)
+            chosen = "trigram" if cursor.fetchone()[0] else "ngram"
+            cursor.close()
+        finally:
+            pool.putconn(conn)
+    app.extensions["search_backend"] = chosen
+    return chosen
+
+
+def init_app(app):
+    app.config.setdefault("SEARCH_BACKEND", "auto")
+    app.config.setdefault("SEARCH_SIMILARITY", 0.4)
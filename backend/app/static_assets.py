@@ -0,0 +1,189 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+
+import click
+from flask import current_app, request, send_file
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+IMMUTABLE_PREFIX = "_next/static/"
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/xml")
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class Asset:
+    __slots__ = ("path", "filename", "mimetype", "size", "mtime", "etag", "variants", "cache_control")
+
+    def __init__(self, path, filename, mimetype, size, mtime, etag, cache_control):
+        self.path = path
+        self.filename = filename
+        self.mimetype = mimetype
+        self.size = size
+        self.mtime = mtime
+        self.etag = etag
+        self.cache_control = cache_control
+        self.variants = {}  # encoding -> filename
+
+
+def _cache_control(path, mimetype):
+    if path.startswith(IMMUTABLE_PREFIX):
+        # Next.js content-hashes everything under _next/static.
+        return "public, max-age=31536000, immutable"
+    if mimetype == "text/html":
+        return "no-cache"
+    return "public, max-age=3600"
+
+
+def _file_etag(filename):
+    digest = hashlib.sha1()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StaticManifest:
+    """In-memory index of the exported frontend, built once at startup.
+
+    Requests are resolved against the index only, so serving an asset or
+    falling back to ``index.html`` does not touch the filesystem until the
+    file itself is sent.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.assets = {}
+        self.routes = {}
+        self.index = None
+        self.build()
+
+    def build(self):
+        assets = {}
+        if os.path.isdir(self.root):
+            for dirpath, _, filenames in os.walk(self.root):
+                for name in filenames:
+                    if name.endswith((".br", ".gz")):
+                        continue
+                    filename = os.path.join(dirpath, name)
+                    path = os.path.relpath(filename, self.root).replace(os.sep, "/")
+                    mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                    stat = os.stat(filename)
+                    asset = Asset(
+                        path=path,
+                        filename=filename,
+                        mimetype=mimetype,
+                        size=stat.st_size,
+                        mtime=stat.st_mtime,
+                        etag=_file_etag(filename),
+                        cache_control=_cache_control(path, mimetype),
+                    )
+                    for encoding, suffix in ENCODINGS:
+                        if os.path.isfile(filename + suffix):
+                            asset.variants[encoding] = filename + suffix
+                    assets[path] = asset
+
+        # Next's static export writes /students as students.html or
+        # students/index.html; map the clean URLs onto those files.
+        routes = dict(assets)
+        for path, asset in assets.items():
+            if path.endswith("/index.html"):
+                routes.setdefault(path[:-len("/index.html")], asset)
+            elif path.endswith(".html"):
+                routes.setdefault(path[:-len(".html")], asset)
+
+        self.assets = assets
+        self.routes = routes
+        self.index = assets.get("index.html")
+
+    def resolve(self, path):
+        path = path.strip("/")
+        return self.routes.get(path) if path else self.index
+
+    def serve(self, path):
+        asset = self.resolve(path) or self.index
+        if asset is None:
+            return {"error": "Frontend has not been built"}, 404
+
+        encoding = None
+        if asset.variants:
+            accepted = request.accept_encodings
+            for candidate, _ in ENCODINGS:
+                if candidate in asset.variants and accepted[candidate]:
+                    encoding = candidate
+                    break
+
+        etag = f"{asset.etag}-{encoding}" if encoding else asset.etag
+        if etag in request.if_none_match:
+            response = current_app.response_class(status=304)
+        else:
+            filename = asset.variants[encoding] if encoding else asset.filename
+            response = send_file(
+                filename,
+                mimetype=asset.mimetype,
+                etag=False,
+                conditional=False,
+                last_modified=asset.mtime,
+            )
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = asset.cache_control
+        if asset.variants:
+            response.vary.add("Accept-Encoding")
+        return response
+
+
+def precompress(root, min_size=1024):
+    """Write .gz (and .br when brotli is installed) next to compressible assets."""
+    written = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.endswith((".br", ".gz")):
+                continue
+            mimetype = mimetypes.guess_type(name)[0] or ""
+            if not mimetype.startswith(COMPRESSIBLE_TYPES):
+                continue
+            filename = os.path.join(dirpath, name)
+            with open(filename, "rb") as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+            with open(filename + ".gz", "wb") as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+            written += 1
+            if brotli is not None:
+                with open(filename + ".br", "wb") as f:
+                    f.write(brotli.compress(data, quality=11))
+                written += 1
+    return written
+
+
+@click.command("static-compress")
+def static_compress_command():
+    """Pre-compress the exported frontend assets."""
+    root = current_app.extensions["static_manifest"].root
+    written = precompress(root)
+    click.echo(f"Wrote {written} compressed file(s) under {root}.")
+    if brotli is None:
+        click.echo("brotli is not installed; only .gz variants were written.")
+
+
+def init_app(app, root):
+    manifest = StaticManifest(root)
+    app.extensions["static_manifest"] = manifest
+    app.cli.add_command(static_compress_command)
+
+    @app.route("/", defaults={"path": ""})
+    @app.route("/<path:path>")
+    def serve_frontend(path):
+        if path.startswith("api/"):
+            return {"error": "API route not found"}, 404
+        return manifest.serve(path)
+
+    return manifest
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+stats_bp = Blueprint("stats", __name__, url_prefix="/api/dashboard")
+
+from . import controller
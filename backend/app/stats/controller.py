@@ -0,0 +1,55 @@
+import time
+
+import click
+from flask import current_app, jsonify
+from flask_jwt_extended import jwt_required
+
+from . import stats_bp
+from app.cache import cached_response
+from app.models import EnrolmentStats
+
+STATS_DEPENDS_ON = ("students", "programs", "colleges", "enrolment_stats", "enrolment_stats_reconciled")
+
+
+@stats_bp.route("/stats/summary", methods=["GET"])
+@jwt_required()
+@cached_response("stats.summary", STATS_DEPENDS_ON)
+def get_stats_summary():
+    return jsonify(EnrolmentStats.summary()), 200
+
+
+@stats_bp.route("/stats", methods=["GET"])
+@jwt_required()
+@cached_response("stats.report", STATS_DEPENDS_ON)
+def get_stats():
+    return jsonify(EnrolmentStats.report()), 200
+
+
+@stats_bp.cli.command("reconcile")
+@click.option("--loop", is_flag=True,
+              help="Keep running, reconciling every STATS_RECONCILE_INTERVAL seconds.")
+def reconcile_command(loop):
+    """Rebuild the enrolment statistics from the students table.
+
+    Write paths keep the cells current with deltas; this full rebuild only
+    corrects drift.  Run it from cron, or as one long-lived process with
+    ``--loop``.  Concurrent runs skip while another holds the lock.
+    """
+    if not loop:
+        drifted = EnrolmentStats.reconcile()
+        click.echo(f"Enrolment statistics reconciled; {drifted} cell(s) corrected.")
+        return
+
+    interval = current_app.config["STATS_RECONCILE_INTERVAL"]
+    if not interval:
+        raise click.UsageError("STATS_RECONCILE_INTERVAL must be positive to use --loop")
+    while True:
+        try:
+            drifted = EnrolmentStats.reconcile(wait=False)
+            if drifted is None:
+                click.echo("Reconciliation already running elsewhere; skipped.")
+            else:
+                click.echo(f"Enrolment statistics reconciled; {drifted} cell(s) corrected.")
+        except Exception as e:
+            click.echo(f"[stats] Reconciliation failed: {e}", err=True)
+        time.sleep(interval)
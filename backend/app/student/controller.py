@@ -1,16 +1,230 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app, Response, stream_with_context
 from . import student_bp
+import base64
+import io
+import json
+import click
+import psycopg2
 import app.models as models
+from . import importer
 from flask_jwt_extended import jwt_required
+from app import batch
+from app.cache import cached_response
+from app.etag import conditional
+
+PAGE_SIZE_DEFAULT = 50
+PAGE_SIZE_MAX = 500
+EXPORT_ITERSIZE_MAX = 50000
+
+
+def encode_cursor(key):
+    raw = json.dumps(key, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(token, sort="student_id"):
+    """Inverse of ``encode_cursor``; the key must have the types ``sort`` produces."""
+    try:
+        value, student_id = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    # bool is an int subclass, and JSON true/false must not reach SQL either.
+    expected = int if sort == "student_id" else str
+    if (
+        type(student_id) is not int
+        or type(value) is not expected
+        or not -2 ** 31 <= student_id < 2 ** 31
+        or (expected is int and not -2 ** 31 <= value < 2 ** 31)
+    ):
+        raise ValueError("Invalid cursor")
+    return value, student_id
+
+
+def parse_limit(value, default=PAGE_SIZE_DEFAULT, maximum=PAGE_SIZE_MAX):
+    """``limit`` query value -> int; absent means ``default``, above ``maximum`` is capped."""
+    if value in (None, ""):
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError("'limit' must be an integer")
+    if limit < 1:
+        raise ValueError("'limit' must be at least 1")
+    return min(limit, maximum)
+
+
+def parse_ids(value):
+    """``ids=3,7,9`` -> ``[3, 7, 9]``; lets change-feed clients refetch just the rows that changed."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        ids = [int(part) for part in value.split(",") if part.strip()]
+    except ValueError:
+        raise ValueError("'ids' must be a comma-separated list of integers")
+    if len(ids) > PAGE_SIZE_MAX:
+        raise ValueError(f"'ids' accepts at most {PAGE_SIZE_MAX} ids")
+    return ids
+
+
+def _int_arg(name):
+    value = request.args.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+
 
 @student_bp.route("/students", methods=["GET"])
 @jwt_required()
+@conditional("students.list", ("students", "programs", "colleges"))
 def list_students():
-    students = models.Student.all()
-    return jsonify([s.__dict__ for s in students])
+    # Without query parameters keep returning the full roster as a bare list
+    # so existing clients keep working.
+    if not request.args:
+        students = models.Student.all()
+        return jsonify([s.__dict__ for s in students])
+
+    sort = request.args.get("sort", "student_id")
+    order = request.args.get("order", "asc").lower()
+    if sort not in models.STUDENT_SORT_COLUMNS:
+        return jsonify({"error": f"Cannot sort by '{sort}'"}), 400
+    if order not in ("asc", "desc"):
+        return jsonify({"error": "'order' must be 'asc' or 'desc'"}), 400
+
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        college_id = _int_arg("college_id")
+        program_id = _int_arg("program_id")
+        ids = parse_ids(request.args.get("ids"))
+        cursor_key = None
+        if request.args.get("cursor"):
+            cursor_key = decode_cursor(request.args["cursor"], sort)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    gender = request.args.get("gender", "").strip().capitalize() or None
+    year_level = request.args.get("year_level", "").strip() or None
+    q = request.args.get("q", "").strip() or None
+    include_total = request.args.get("include_total", "").lower() in ("1", "true", "yes")
+
+    students, next_key, has_more, total = models.Student.page(
+        limit=limit,
+        cursor_key=cursor_key,
+        sort=sort,
+        order=order,
+        include_total=include_total,
+        college_id=college_id,
+        program_id=program_id,
+        gender=gender,
+        year_level=year_level,
+        q=q,
+        ids=ids,
+    )
+
+    response = {
+        "students": [s.__dict__ for s in students],
+        "has_more": has_more,
+        "next_cursor": encode_cursor(next_key) if next_key else None,
+    }
+    if include_total:
+        response["total"] = total
+    return jsonify(response)
+
+@student_bp.route("/students/facets", methods=["GET"])
+@jwt_required()
+@conditional("students.facets", ("students", "programs", "colleges"))
+@cached_response("students.facets", ("students", "programs", "colleges"))
+def student_facets():
+    """Counts per year level, gender, college and program, optionally under the list filters."""
+    try:
+        college_id = _int_arg("college_id")
+        program_id = _int_arg("program_id")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    facets = models.Student.facets(
+        college_id=college_id,
+        program_id=program_id,
+        gender=request.args.get("gender", "").strip().capitalize() or None,
+        year_level=request.args.get("year_level", "").strip() or None,
+        q=request.args.get("q", "").strip() or None,
+    )
+    return jsonify(facets)
+
+
+SEARCH_LIMIT_DEFAULT = 20
+SEARCH_LIMIT_MAX = 100
+
+
+@student_bp.route("/students/search", methods=["GET"])
+@jwt_required()
+@cached_response("students.search", ("students", "programs"))
+def search_students():
+    """Ranked, typo-tolerant search over id number, names and program."""
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify({"error": "'q' is required"}), 400
+    try:
+        limit = parse_limit(request.args.get("limit"), SEARCH_LIMIT_DEFAULT, SEARCH_LIMIT_MAX)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    matches = models.Student.search(
+        q, limit=limit, similarity=current_app.config["SEARCH_SIMILARITY"]
+    )
+    return jsonify({"query": q, "students": [m.to_dict() for m in matches]})
+
+@student_bp.route("/students/export", methods=["GET"])
+@jwt_required()
+@conditional("students.export", ("students", "programs", "colleges"))
+def export_students():
+    """Stream the full roster as NDJSON (default) or a chunked JSON array."""
+    fmt = request.args.get("format", "ndjson").lower()
+    if fmt not in ("ndjson", "json"):
+        return jsonify({"error": "'format' must be 'ndjson' or 'json'"}), 400
+    try:
+        itersize = _int_arg("itersize") or current_app.config["EXPORT_ITERSIZE"]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    itersize = max(1, min(itersize, EXPORT_ITERSIZE_MAX))
+
+    columns = models.STUDENT_COLUMNS
+
+    def generate():
+        chunk = []
+        first = True
+        if fmt == "json":
+            yield "["
+        for row in models.Student.iter_rows(itersize=itersize):
+            line = json.dumps(dict(zip(columns, row)), default=str)
+            if fmt == "ndjson":
+                chunk.append(line + "\n")
+            else:
+                chunk.append(line if first else "," + line)
+                first = False
+            if len(chunk) >= itersize:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+        if fmt == "json":
+            yield "]"
+
+    mimetype = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    filename = f"students.{fmt}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
 
 @student_bp.route("/students/year-levels", methods=["GET"])
 @jwt_required()
+@conditional("students.year_levels", ("students",))
+@cached_response("students.year_levels", depends_on=("students",))
 def get_year_levels():
     try:
         year_levels = models.Student.get_year_levels()
@@ -20,6 +234,8 @@ def get_year_levels():
 
 @student_bp.route("/students/genders", methods=["GET"])
 @jwt_required()
+@conditional("students.genders", ("students",))
+@cached_response("students.genders", depends_on=("students",))
 def get_genders():
     """Get distinct genders from students"""
     try:
@@ -35,8 +251,8 @@ def add_student():
     data = request.get_json()
     import re
     
-    name_regex = r"^[A-Za-z\s]+$"
-    id_regex = r"^\d{4}-\d{4}$"
+    name_regex = importer.NAME_REGEX
+    id_regex = importer.ID_REGEX
     
     required_fields = ["id_number", "last_name", "first_name", "gender", "year_level", "college_id", "program_id"]
     for field in required_fields:
@@ -48,10 +264,12 @@ def add_student():
 
     if not re.match(id_regex, data["id_number"]):
         return jsonify({"error": "ID number must follow the format XXXX-XXXX (digits only)"}), 400
-    
-    if models.Student.exists(data["id_number"]):
-        return jsonify({"error": "ID number already exists"}), 400
-    
+
+    try:
+        int(data["college_id"])
+        int(data["program_id"])
+    except (TypeError, ValueError):
+        return jsonify({"error": "college_id and program_id must be integers"}), 400
 
     formatted_Lastname = data["last_name"].strip().title()
     formatted_Firstname = data["first_name"].strip().title()
@@ -66,7 +284,12 @@ def add_student():
         program_id=data.get("program_id"),
         photo_url=data.get("photo_url")
     )
-    student.add()
+    try:
+        student.add()
+    except models.Conflict as e:
+        return jsonify({"error": str(e)}), 400
+    except (psycopg2.DataError, psycopg2.IntegrityError) as e:
+        return jsonify({"error": "Invalid student data", "detail": str(e).strip()}), 400
     print("✅ Student added route reached")
     return jsonify({
         "message": "Student added successfully",
@@ -81,6 +304,44 @@ def add_student():
             "photo_url" : student.photo_url
         }}), 201
 
+@student_bp.route("/students/import", methods=["POST"])
+@jwt_required()
+def import_students():
+    """Bulk import students from an uploaded CSV (multipart 'file' or a text/csv body)."""
+    upload = request.files.get("file")
+    try:
+        if upload is not None:
+            report, error = importer.import_students_file(upload)
+        elif request.mimetype == "text/csv":
+            stream = io.TextIOWrapper(request.stream, encoding="utf-8-sig", newline="")
+            report, error = importer.import_students(stream)
+        else:
+            return jsonify({"error": "Upload a CSV file as 'file' or send a text/csv body"}), 400
+    except Exception as e:
+        print(f"Error importing students: {e}")
+        return jsonify({"error": "Failed to import students", "detail": str(e)}), 500
+
+    if error:
+        return jsonify({"error": error}), 400
+    return jsonify(report), 200
+
+
+@student_bp.cli.command("import")
+@click.argument("csv_file", type=click.Path(exists=True, dir_okay=False))
+def import_students_command(csv_file):
+    """Bulk import students from CSV_FILE."""
+    with open(csv_file, encoding="utf-8-sig", newline="") as f:
+        report, error = importer.import_students(f)
+    if error:
+        raise click.ClickException(error)
+    click.echo(
+        f"{report['received']} rows read: {report['inserted']} inserted, "
+        f"{report['updated']} updated, {report['rejected']} rejected"
+    )
+    for e in report["errors"]:
+        click.echo(f"  line {e['line']} ({e['id_number']}): {e['error']}", err=True)
+
+
 @student_bp.route("/students/<string:id_number>", methods=["DELETE"])
 @jwt_required()
 def delete_student(id_number):
@@ -106,4 +367,11 @@ def update_student(id_number):
     )
     if success:
         return jsonify({"message": f"Student {id_number} updated successfully"}), 200
-    return jsonify({"error": f"Failed to update student {id_number}"}), 400
\ No newline at end of file
+    return jsonify({"error": f"Failed to update student {id_number}"}), 400
+
+
+@student_bp.route("/students/batch", methods=["POST"])
+@jwt_required()
+def batch_students():
+    body, status = batch.handle_batch_request(batch.STUDENTS, request.get_json(silent=True))
+    return jsonify(body), status
@@ -0,0 +1,222 @@
+import csv
+import io
+import re
+
+from app.database import get_db
+from app.models import EnrolmentStats
+
+NAME_REGEX = r"^[A-Za-z\s]+$"
+ID_REGEX = r"^\d{4}-\d{4}$"
+GENDERS = ("Male", "Female", "Others")
+YEAR_LEVELS = ("1", "2", "3", "4", "4+")
+
+REQUIRED_FIELDS = ["id_number", "last_name", "first_name", "gender", "year_level", "college_id", "program_id"]
+STAGING_COLUMNS = ["line", "id_number", "last_name", "first_name", "gender", "year_level", "college_id", "program_id", "photo_url"]
+
+# Column widths from the students table; COPY would abort the whole import
+# on the first value that does not fit.
+MAX_LENGTHS = {"id_number": 20, "last_name": 50, "first_name": 50}
+# Same for the INTEGER columns.
+INT_MIN, INT_MAX = -2 ** 31, 2 ** 31 - 1
+
+COPY_BATCH_SIZE = 5000
+
+_name_re = re.compile(NAME_REGEX)
+_id_re = re.compile(ID_REGEX)
+
+
+def validate_row(row):
+    """Validate and normalise one CSV row.
+
+    Returns ``(values, None)`` with the staging column values, or
+    ``(None, error_message)``.
+    """
+    for field in REQUIRED_FIELDS:
+        if not (row.get(field) or "").strip():
+            return None, f"'{field}' is required"
+
+    for field, max_length in MAX_LENGTHS.items():
+        if len(row[field].strip()) > max_length:
+            return None, f"'{field}' must be at most {max_length} characters"
+
+    first_name = row["first_name"].strip()
+    last_name = row["last_name"].strip()
+    if not _name_re.match(first_name) or not _name_re.match(last_name):
+        return None, "Names should contain only letters and spaces"
+
+    id_number = row["id_number"].strip()
+    if not _id_re.match(id_number):
+        return None, "ID number must follow the format XXXX-XXXX (digits only)"
+
+    gender = row["gender"].strip().capitalize()
+    if gender not in GENDERS:
+        return None, f"gender must be one of {', '.join(GENDERS)}"
+
+    year_level = row["year_level"].strip()
+    if year_level not in YEAR_LEVELS:
+        return None, f"year_level must be one of {', '.join(YEAR_LEVELS)}"
+
+    try:
+        college_id = int(row["college_id"])
+        program_id = int(row["program_id"])
+    except ValueError:
+        return None, "college_id and program_id must be integers"
+    if not (INT_MIN <= college_id <= INT_MAX and INT_MIN <= program_id <= INT_MAX):
+        return None, "college_id and program_id are out of range"
+
+    photo_url = (row.get("photo_url") or "").strip() or None
+
+    return [
+        id_number,
+        last_name.title(),
+        first_name.title(),
+        gender,
+        year_level,
+        college_id,
+        program_id,
+        photo_url,
+    ], None
+
+
+def _copy_batch(cursor, batch):
+    buf = io.StringIO()
+    csv.writer(buf).writerows(batch)
+    buf.seek(0)
+    cursor.copy_expert(
+        f"COPY student_import ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+        buf
+    )
+
+
+def import_students(stream):
+    """Bulk load students from a CSV text stream.
+
+    Valid rows are COPY'd into a temporary staging table in batches, rows
+    that would violate constraints are weeded out with set-based checks,
+    and the remainder is upserted into ``students`` with one statement.
+    Everything runs in a single transaction.
+    """
+    errors = []
+    received = 0
+
+    db = get_db()
+    cursor = db.cursor()
+    try:
+        cursor.execute("""
+            CREATE TEMP TABLE student_import (
+                line INTEGER NOT NULL,
+                id_number VARCHAR(20) NOT NULL,
+                last_name VARCHAR(50) NOT NULL,
+                first_name VARCHAR(50) NOT NULL,
+                gender VARCHAR(10) NOT NULL,
+                year_level VARCHAR(3) NOT NULL,
+                college_id INTEGER NOT NULL,
+                program_id INTEGER NOT NULL,
+                photo_url TEXT
+            ) ON COMMIT DROP
+        """)
+
+        reader = csv.DictReader(stream)
+        missing = [f for f in REQUIRED_FIELDS if f not in (reader.fieldnames or [])]
+        if missing:
+            db.rollback()
+            cursor.close()
+            return None, f"CSV is missing columns: {', '.join(missing)}"
+
+        batch = []
+        for row in reader:
+            received += 1
+            values, error = validate_row(row)
+            if error:
+                errors.append({"line": reader.line_num, "id_number": row.get("id_number"), "error": error})
+                continue
+            batch.append([reader.line_num] + values)
+            if len(batch) >= COPY_BATCH_SIZE:
+                _copy_batch(cursor, batch)
+                batch = []
+        if batch:
+            _copy_batch(cursor, batch)
+
+        # The last occurrence of an id_number in the file wins.
+        cursor.execute("""
+            DELETE FROM student_import a
+            USING (
+                SELECT id_number, MAX(line) AS line FROM student_import GROUP BY id_number
+            ) kept
+            WHERE a.id_number = kept.id_number AND a.line < kept.line
+            RETURNING a.line, a.id_number, kept.line
+        """)
+        for line, id_number, kept in cursor.fetchall():
+            errors.append({"line": line, "id_number": id_number, "error": f"Duplicate id_number, superseded by line {kept}"})
+
+        cursor.execute("""
+            DELETE FROM student_import si
+            WHERE NOT EXISTS (SELECT 1 FROM colleges c WHERE c.id = si.college_id)
+            RETURNING si.line, si.id_number
+        """)
+        for line, id_number in cursor.fetchall():
+            errors.append({"line": line, "id_number": id_number, "error": "College not found"})
+
+        cursor.execute("""
+            DELETE FROM student_import si
+            WHERE NOT EXISTS (SELECT 1 FROM programs p WHERE p.id = si.program_id)
+            RETURNING si.line, si.id_number
+        """)
+        for line, id_number in cursor.fetchall():
+            errors.append({"line": line, "id_number": id_number, "error": "Program not found"})
+
+        # Statistics deltas: the cells rows leave (locked so they cannot move
+        # again before the upsert) and the cells the upsert puts them in.
+        cursor.execute("""
+            SELECT s.college_id, s.program_id, s.year_level, s.gender, COUNT(*)
+            FROM (
+                SELECT s.college_id, s.program_id, s.year_level, s.gender
+                FROM students s JOIN student_import si USING (id_number)
+                FOR UPDATE OF s
+            ) s
+            GROUP BY 1, 2, 3, 4
+        """)
+        deltas = {tuple(row[:4]): -row[4] for row in cursor.fetchall()}
+
+        cursor.execute("""
+            INSERT INTO students (id_number, last_name, first_name, gender, year_level, college_id, program_id, photo_url)
+            SELECT id_number, last_name, first_name, gender, year_level, college_id, program_id, photo_url
+            FROM student_import
+            ON CONFLICT (id_number) DO UPDATE SET
+                last_name = EXCLUDED.last_name,
+                first_name = EXCLUDED.first_name,
+                gender = EXCLUDED.gender,
+                year_level = EXCLUDED.year_level,
+                college_id = EXCLUDED.college_id,
+                program_id = EXCLUDED.program_id,
+                photo_url = EXCLUDED.photo_url
+            RETURNING (xmax = 0), college_id, program_id, year_level, gender
+        """)
+        outcomes = cursor.fetchall()
+        inserted = sum(1 for row in outcomes if row[0])
+        updated = len(outcomes) - inserted
+
+        for row in outcomes:
+            cell = tuple(row[1:])
+            deltas[cell] = deltas.get(cell, 0) + 1
+        EnrolmentStats.apply(cursor, deltas)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    errors.sort(key=lambda e: e["line"])
+    return {
+        "received": received,
+        "inserted": inserted,
+        "updated": updated,
+        "rejected": len(errors),
+        "errors": errors,
+    }, None
+
+
+def import_students_file(file_storage):
+    stream = io.TextIOWrapper(file_storage.stream, encoding="utf-8-sig", newline="")
+    return import_students(stream)
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+system_bp = Blueprint("system", __name__, url_prefix="/api/system")
+
+from . import controller
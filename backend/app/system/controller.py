@@ -0,0 +1,56 @@
+from flask import jsonify
+from . import system_bp
+from app.database import pool_stats
+from app import cache
+from app import revocation
+from app import passwords
+from app import identity
+from app import queries
+from app import changefeed
+from flask_jwt_extended import jwt_required
+
+
+@system_bp.route("/pool", methods=["GET"])
+@jwt_required()
+def get_pool_stats():
+    stats = pool_stats()
+    if stats is None:
+        return jsonify({"pool": None, "message": "Pool not initialised yet"}), 200
+    return jsonify({"pool": stats}), 200
+
+
+@system_bp.route("/cache", methods=["GET"])
+@jwt_required()
+def get_cache_stats():
+    return jsonify({"cache": cache.stats()}), 200
+
+
+@system_bp.route("/revocations", methods=["GET"])
+@jwt_required()
+def get_revocation_stats():
+    return jsonify({"revocations": revocation.stats()}), 200
+
+
+@system_bp.route("/passwords", methods=["GET"])
+@jwt_required()
+def get_password_hasher_stats():
+    return jsonify({"passwords": passwords.stats()}), 200
+
+
+@system_bp.route("/identity", methods=["GET"])
+@jwt_required()
+def get_identity_cache_stats():
+    return jsonify({"identity": identity.stats()}), 200
+
+
+
+@system_bp.route("/queries", methods=["GET"])
+@jwt_required()
+def get_query_stats():
+    return jsonify({"queries": queries.stats()}), 200
+
+
+@system_bp.route("/changes", methods=["GET"])
+@jwt_required()
+def get_change_feed_stats():
+    return jsonify({"changes": changefeed.stats()}), 200
@@ -4,7 +4,10 @@ from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identi
 import app.models as models
 from . import user_bp
 import datetime
-from .. import BLOCKLIST
+from app import revocation
+from app import passwords
+from app import ratelimit
+from app import identity
 
 @user_bp.route("/login", methods=["POST"])
 def login():
@@ -12,8 +15,26 @@ def login():
     username = data.get("username")
     password = data.get("password")
 
-    user = models.Users.get_by_username(username)
-    if user and user.check_password(password): 
+    user_key = f"user:{(username or '').strip().lower()}"
+    for limiter, key in ((ratelimit.login_by_ip, f"ip:{request.remote_addr}"), (ratelimit.login_by_user, user_key)):
+        allowed, retry_after = limiter.hit(key)
+        if not allowed:
+            response = jsonify({"message": "Too many login attempts, try again later"})
+            response.headers["Retry-After"] = str(retry_after)
+            return response, 429
+
+    try:
+        user = models.Users.get_by_username(username)
+        valid = bool(user and user.check_password(password))
+        if valid and user.needs_rehash():
+            user.rehash_password(password)
+    except passwords.HasherBusy:
+        response = jsonify({"message": "Server busy, try again shortly"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+
+    if valid:
+        ratelimit.login_by_user.reset(user_key)
         long_expiry = datetime.timedelta(minutes=5)
         access_token = create_access_token(
             identity=str(user.id), 
@@ -29,7 +50,7 @@ def login():
 def logout():
     token_payload = get_jwt()
     jti = token_payload["jti"]
-    BLOCKLIST.add(jti)
+    revocation.revoke(jti, token_payload["exp"])
     return jsonify({"success": True, "message": "Token has been successfully blocklisted"}), 200
 
 
@@ -40,13 +61,9 @@ def get_current_user():
         user_id = int(get_jwt_identity())
     except Exception:
         user_id = get_jwt_identity()
-    user = models.Users.get_by_id(user_id) 
+    user = identity.get_identity(user_id, models.Users.get_by_id)
 
     if user:
-        return jsonify({
-            "id": user.id,
-            "username": user.username,
-            "email": user.email
-        }), 200
+        return jsonify(user), 200
     
     return jsonify({"message": "User not found"}), 404
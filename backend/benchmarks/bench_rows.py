@@ -0,0 +1,76 @@
+"""Compare per-row memory and list serialisation time for student rows.
+
+Runs without a database: synthetic cursor tuples are turned into rows the
+way the list endpoints do it (one ``Student`` object per row, serialised
+via ``__dict__``) and as ``StudentRow`` tuples serialised via ``to_dict``.
+The tuples are smaller, but building a dict per row costs more than the
+objects' ready-made ``__dict__``, so only the search index keeps them.
+
+    python benchmarks/bench_rows.py [--rows 50000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask import Flask  # noqa: E402
+
+from app.json_provider import FastJSONProvider  # noqa: E402
+from app.models import STUDENT_COLUMNS, Student, StudentRow  # noqa: E402
+
+
+def synthetic_rows(count):
+    return [
+        (i, f"2024-{i:04d}", f"Last{i}", f"First{i}", "Male" if i % 2 else "Female",
+         f"{i % 4 + 1}st Year", i % 7 + 1, i % 30 + 1, f"BS{i % 30}", f"Program {i % 30}", None)
+        for i in range(1, count + 1)
+    ]
+
+
+def measure(rows, build, to_dict, dumps, repeat):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = build(rows)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del objects
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dumps([to_dict(o) for o in build(rows)])
+        best = min(best, time.perf_counter() - start)
+    return size / len(rows), best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    assert len(STUDENT_COLUMNS) == len(rows[0])
+    dumps = FastJSONProvider(Flask(__name__)).dumps
+
+    results = {
+        "Student (class + __dict__)": measure(
+            rows, lambda rs: [Student._from_row(r) for r in rs],
+            lambda s: s.__dict__, dumps, args.repeat),
+        "StudentRow (namedtuple)": measure(
+            rows, lambda rs: [StudentRow._make(r) for r in rs],
+            StudentRow.to_dict, dumps, args.repeat),
+    }
+
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"{'':28}{'bytes/row':>12}{'build+json ms':>16}")
+    for name, (per_row, seconds) in results.items():
+        print(f"{name:28}{per_row:12.0f}{seconds * 1000:16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# gunicorn.conf.py -- production server settings
+#
+#   gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Reload code without dropping connections with `kill -HUP <master pid>`.
+from app import config
+
+bind = config.WEB_BIND
+backlog = config.WEB_BACKLOG
+
+# Threads per worker let a worker overlap requests that wait on Postgres.
+worker_class = "gthread"
+workers = config.WEB_WORKERS
+threads = config.WEB_THREADS
+
+timeout = config.WEB_TIMEOUT
+graceful_timeout = config.WEB_GRACEFUL_TIMEOUT
+keepalive = config.WEB_KEEPALIVE
+
+# Recycle workers periodically; jitter keeps them from restarting together.
+max_requests = config.WEB_MAX_REQUESTS
+max_requests_jitter = config.WEB_MAX_REQUESTS_JITTER
+
+# Import the app once in the master so workers share its memory copy-on-write.
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Each worker builds its own connection pool on first use.
+    from wsgi import app
+    app.extensions.pop("db_pool", None)
@@ -0,0 +1,32 @@
+-- Base schema.  IF NOT EXISTS so existing databases can be baselined.
+
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    username VARCHAR(50) NOT NULL UNIQUE,
+    user_password VARCHAR(255) NOT NULL,
+    email VARCHAR(100) NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS colleges (
+    id SERIAL PRIMARY KEY,
+    college_code VARCHAR(20) NOT NULL UNIQUE,
+    college_name VARCHAR(100) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS programs (
+    id SERIAL PRIMARY KEY,
+    program_code VARCHAR(20) NOT NULL UNIQUE,
+    program_name VARCHAR(100) NOT NULL,
+    college_id INTEGER REFERENCES colleges(id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS students (
+    student_id SERIAL PRIMARY KEY,
+    id_number VARCHAR(20) NOT NULL UNIQUE,
+    last_name VARCHAR(50) NOT NULL,
+    first_name VARCHAR(50) NOT NULL,
+    gender VARCHAR(10) NOT NULL CHECK (gender IN ('Male', 'Female', 'Others')),
+    year_level VARCHAR(3) NOT NULL CHECK (year_level IN ('1','2','3','4','4+')),
+    college_id INTEGER REFERENCES colleges(id) ON DELETE SET NULL,
+    program_id INTEGER REFERENCES programs(id) ON DELETE SET NULL
+);
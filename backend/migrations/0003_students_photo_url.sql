@@ -0,0 +1,3 @@
+-- Student.add and update_by_id_number write photo_url, which the base schema never created.
+
+ALTER TABLE students ADD COLUMN IF NOT EXISTS photo_url TEXT;
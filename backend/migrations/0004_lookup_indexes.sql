@@ -0,0 +1,22 @@
+-- Indexes backing the lookups in app/models.py
+
+-- College.exists / is_name_taken, Program.exists / is_name_taken
+CREATE INDEX IF NOT EXISTS colleges_lower_name_idx ON colleges (LOWER(college_name));
+CREATE INDEX IF NOT EXISTS programs_lower_name_idx ON programs (LOWER(program_name));
+
+-- Foreign keys: joins in Program.all / Student.all and the nulling UPDATEs
+-- in delete_program / delete_college
+CREATE INDEX IF NOT EXISTS students_program_id_idx ON students (program_id);
+CREATE INDEX IF NOT EXISTS students_college_id_idx ON students (college_id);
+CREATE INDEX IF NOT EXISTS programs_college_id_idx ON programs (college_id);
+
+-- get_year_levels / get_genders and the matching list filters
+CREATE INDEX IF NOT EXISTS students_year_level_idx ON students (year_level);
+CREATE INDEX IF NOT EXISTS students_gender_idx ON students (gender);
+
+-- Keyset pagination on the name sort keys (Student.page)
+CREATE INDEX IF NOT EXISTS students_last_name_idx ON students (last_name, student_id);
+CREATE INDEX IF NOT EXISTS students_first_name_idx ON students (first_name, student_id);
+
+-- Program.all orders by name
+CREATE INDEX IF NOT EXISTS programs_name_idx ON programs (program_name);
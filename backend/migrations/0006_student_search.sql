@@ -0,0 +1,27 @@
+-- Server-side student search (Student.search).
+--
+-- pg_trgm is optional: where the extension cannot be created the app falls
+-- back to the in-process n-gram index in app/search.py.
+
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+EXCEPTION WHEN insufficient_privilege OR undefined_file OR feature_not_supported THEN
+    RAISE NOTICE 'pg_trgm is not available; student search will use the in-process index';
+END
+$$;
+
+-- One lower-cased document per student: id number and both names.
+ALTER TABLE students ADD COLUMN IF NOT EXISTS search_key TEXT
+    GENERATED ALWAYS AS (LOWER(id_number || ' ' || first_name || ' ' || last_name)) STORED;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+        CREATE INDEX IF NOT EXISTS students_search_key_trgm_idx
+            ON students USING gin (search_key gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS programs_search_trgm_idx
+            ON programs USING gin (LOWER(program_code || ' ' || program_name) gin_trgm_ops);
+    END IF;
+END
+$$;
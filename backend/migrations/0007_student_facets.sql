@@ -0,0 +1,100 @@
+-- Per-value student counts for the filter dimensions (Student.facets).
+--
+-- Maintained by statement-level triggers over transition tables, so a bulk
+-- import or batch touches each facet row once per statement rather than
+-- once per student.  dimension 'all' holds the total.
+
+CREATE TABLE IF NOT EXISTS student_facets (
+    dimension VARCHAR(20) NOT NULL,
+    value VARCHAR(50) NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, value)
+);
+
+-- The (dimension, value) pairs one student contributes to.
+CREATE OR REPLACE FUNCTION student_facet_pairs(
+    year_level VARCHAR, gender VARCHAR, college_id INTEGER, program_id INTEGER
+) RETURNS TABLE (dimension VARCHAR, value VARCHAR) AS $$
+    SELECT f.dimension, f.value
+    FROM (VALUES
+        ('all'::VARCHAR, ''::VARCHAR),
+        ('year_level', year_level),
+        ('gender', gender),
+        ('college_id', college_id::VARCHAR),
+        ('program_id', program_id::VARCHAR)
+    ) AS f(dimension, value)
+    WHERE f.value IS NOT NULL
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION refresh_student_facets() RETURNS VOID AS $$
+BEGIN
+    DELETE FROM student_facets;
+    INSERT INTO student_facets (dimension, value, count)
+    SELECT f.dimension, f.value, COUNT(*)
+    FROM students s
+    CROSS JOIN LATERAL student_facet_pairs(s.year_level, s.gender, s.college_id, s.program_id) f
+    GROUP BY f.dimension, f.value;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the transition tables that exist for TG_OP are referenced.
+CREATE OR REPLACE FUNCTION student_facets_on_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM student_facets;
+    ELSIF TG_OP = 'INSERT' THEN
+        INSERT INTO student_facets AS sf (dimension, value, count)
+        SELECT f.dimension, f.value, COUNT(*)
+        FROM new_rows n
+        CROSS JOIN LATERAL student_facet_pairs(n.year_level, n.gender, n.college_id, n.program_id) f
+        GROUP BY f.dimension, f.value
+        ON CONFLICT (dimension, value) DO UPDATE SET count = sf.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE student_facets sf
+        SET count = sf.count - d.removed
+        FROM (
+            SELECT f.dimension, f.value, COUNT(*) AS removed
+            FROM old_rows o
+            CROSS JOIN LATERAL student_facet_pairs(o.year_level, o.gender, o.college_id, o.program_id) f
+            GROUP BY f.dimension, f.value
+        ) d
+        WHERE sf.dimension = d.dimension AND sf.value = d.value;
+    ELSE
+        -- Net the old and new values so edits that leave the facet columns
+        -- alone write nothing.
+        INSERT INTO student_facets AS sf (dimension, value, count)
+        SELECT f.dimension, f.value, SUM(c.delta)
+        FROM (
+            SELECT year_level, gender, college_id, program_id, -1 AS delta FROM old_rows
+            UNION ALL
+            SELECT year_level, gender, college_id, program_id, 1 FROM new_rows
+        ) c
+        CROSS JOIN LATERAL student_facet_pairs(c.year_level, c.gender, c.college_id, c.program_id) f
+        GROUP BY f.dimension, f.value
+        HAVING SUM(c.delta) <> 0
+        ON CONFLICT (dimension, value) DO UPDATE SET count = sf.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS student_facets_insert ON students;
+CREATE TRIGGER student_facets_insert AFTER INSERT ON students
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_facets_on_change();
+
+DROP TRIGGER IF EXISTS student_facets_update ON students;
+CREATE TRIGGER student_facets_update AFTER UPDATE ON students
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_facets_on_change();
+
+DROP TRIGGER IF EXISTS student_facets_delete ON students;
+CREATE TRIGGER student_facets_delete AFTER DELETE ON students
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION student_facets_on_change();
+
+DROP TRIGGER IF EXISTS student_facets_truncate ON students;
+CREATE TRIGGER student_facets_truncate AFTER TRUNCATE ON students
+    FOR EACH STATEMENT EXECUTE FUNCTION student_facets_on_change();
+
+SELECT refresh_student_facets();
@@ -0,0 +1,29 @@
+-- Enrolment statistics (EnrolmentStats in app/models.py).
+--
+-- One row per (college, program, year level, gender) cell; 0 stands in for
+-- a student without a college or program.  The model write paths adjust the
+-- affected cells in the same transaction and EnrolmentStats.reconcile
+-- rebuilds the table from students periodically.
+
+CREATE TABLE IF NOT EXISTS enrolment_stats (
+    college_id INTEGER NOT NULL,
+    program_id INTEGER NOT NULL,
+    year_level VARCHAR(3) NOT NULL,
+    gender VARCHAR(10) NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (college_id, program_id, year_level, gender)
+);
+
+CREATE TABLE IF NOT EXISTS enrolment_stats_reconciled (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    reconciled_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    corrected_cells INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO enrolment_stats (college_id, program_id, year_level, gender, count)
+SELECT COALESCE(college_id, 0), COALESCE(program_id, 0), year_level, gender, COUNT(*)
+FROM students
+GROUP BY 1, 2, 3, 4
+ON CONFLICT DO NOTHING;
+
+INSERT INTO enrolment_stats_reconciled DEFAULT VALUES ON CONFLICT DO NOTHING;
@@ -0,0 +1,21 @@
+-- Case-insensitive uniqueness for college and program names.  The write
+-- paths rely on these instead of a separate existence check, so two
+-- concurrent writers can no longer both pass the check.
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM colleges GROUP BY LOWER(college_name) HAVING COUNT(*) > 1) THEN
+        RAISE EXCEPTION 'colleges has names that differ only in case; rename them before migrating';
+    END IF;
+    IF EXISTS (SELECT 1 FROM programs GROUP BY LOWER(program_name) HAVING COUNT(*) > 1) THEN
+        RAISE EXCEPTION 'programs has names that differ only in case; rename them before migrating';
+    END IF;
+END
+$$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS colleges_lower_name_key ON colleges (LOWER(college_name));
+CREATE UNIQUE INDEX IF NOT EXISTS programs_lower_name_key ON programs (LOWER(program_name));
+
+-- Superseded by the unique indexes above.
+DROP INDEX IF EXISTS colleges_lower_name_idx;
+DROP INDEX IF EXISTS programs_lower_name_idx;
@@ -0,0 +1,104 @@
+-- Change feed for the dashboard event stream (app/changefeed.py).
+--
+-- Statement-level triggers over transition tables append one row per
+-- changed student, program or college and send a single NOTIFY per
+-- statement; NOTIFY is only delivered on commit.  The event id is the
+-- resume cursor (SSE Last-Event-ID), so ids must become visible in order:
+-- the triggers take a transaction-scoped advisory lock before drawing ids,
+-- which holds back a second writer until the first commits.  Student
+-- writes already serialise on the 'all' row of student_facets, so this
+-- costs them nothing extra.
+
+CREATE TABLE IF NOT EXISTS change_events (
+    id BIGSERIAL PRIMARY KEY,
+    entity VARCHAR(20) NOT NULL,
+    entity_id INTEGER,
+    op VARCHAR(10) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS change_events_created_at_idx ON change_events (created_at);
+
+-- TG_ARGV[0] is the entity name, TG_ARGV[1] its key column.
+CREATE OR REPLACE FUNCTION change_events_on_change() RETURNS TRIGGER AS $$
+DECLARE
+    entity_name VARCHAR := TG_ARGV[0];
+    key_column TEXT := TG_ARGV[1];
+    emitted INTEGER;
+BEGIN
+    PERFORM pg_advisory_xact_lock(72707371);
+    IF TG_OP = 'TRUNCATE' THEN
+        INSERT INTO change_events (entity, entity_id, op) VALUES (entity_name, NULL, 'reset');
+    ELSIF TG_OP = 'INSERT' THEN
+        EXECUTE format(
+            'INSERT INTO change_events (entity, entity_id, op)
+             SELECT %L, n.%I, ''insert'' FROM new_rows n ORDER BY n.%I',
+            entity_name, key_column, key_column
+        );
+    ELSIF TG_OP = 'DELETE' THEN
+        EXECUTE format(
+            'INSERT INTO change_events (entity, entity_id, op)
+             SELECT %L, o.%I, ''delete'' FROM old_rows o ORDER BY o.%I',
+            entity_name, key_column, key_column
+        );
+    ELSE
+        -- Upserts that rewrite a row unchanged emit nothing.
+        EXECUTE format(
+            'INSERT INTO change_events (entity, entity_id, op)
+             SELECT %L, n.%I, ''update''
+             FROM new_rows n JOIN old_rows o ON o.%I = n.%I
+             WHERE n IS DISTINCT FROM o
+             ORDER BY n.%I',
+            entity_name, key_column, key_column, key_column, key_column
+        );
+    END IF;
+    GET DIAGNOSTICS emitted = ROW_COUNT;
+    IF emitted > 0 THEN
+        -- Identical notifications within a transaction are folded into one.
+        PERFORM pg_notify('change_events', '');
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    target RECORD;
+BEGIN
+    FOR target IN
+        SELECT * FROM (VALUES
+            ('students', 'student', 'student_id'),
+            ('programs', 'program', 'id'),
+            ('colleges', 'college', 'id')
+        ) AS t(table_name, entity, key_column)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS change_events_insert ON %I', target.table_name);
+        EXECUTE format(
+            'CREATE TRIGGER change_events_insert AFTER INSERT ON %I
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION change_events_on_change(%L, %L)',
+            target.table_name, target.entity, target.key_column
+        );
+        EXECUTE format('DROP TRIGGER IF EXISTS change_events_update ON %I', target.table_name);
+        EXECUTE format(
+            'CREATE TRIGGER change_events_update AFTER UPDATE ON %I
+                REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION change_events_on_change(%L, %L)',
+            target.table_name, target.entity, target.key_column
+        );
+        EXECUTE format('DROP TRIGGER IF EXISTS change_events_delete ON %I', target.table_name);
+        EXECUTE format(
+            'CREATE TRIGGER change_events_delete AFTER DELETE ON %I
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION change_events_on_change(%L, %L)',
+            target.table_name, target.entity, target.key_column
+        );
+        EXECUTE format('DROP TRIGGER IF EXISTS change_events_truncate ON %I', target.table_name);
+        EXECUTE format(
+            'CREATE TRIGGER change_events_truncate AFTER TRUNCATE ON %I
+                FOR EACH STATEMENT EXECUTE FUNCTION change_events_on_change(%L, %L)',
+            target.table_name, target.entity, target.key_column
+        );
+    END LOOP;
+END
+$$;
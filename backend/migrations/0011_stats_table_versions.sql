@@ -0,0 +1,19 @@
+-- Change counters for the enrolment statistics tables.
+--
+-- The /stats responses are cached under table_versions (app/cache.py);
+-- reconciliation rewrites enrolment_stats and stamps
+-- enrolment_stats_reconciled without touching students, so both tables
+-- need counters of their own for a reconcile run from any worker or from
+-- 'flask stats reconcile' to reach every cache.
+
+INSERT INTO table_versions (table_name)
+VALUES ('enrolment_stats'), ('enrolment_stats_reconciled')
+ON CONFLICT DO NOTHING;
+
+DROP TRIGGER IF EXISTS table_version_enrolment_stats ON enrolment_stats;
+CREATE TRIGGER table_version_enrolment_stats AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON enrolment_stats
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS table_version_enrolment_stats_reconciled ON enrolment_stats_reconciled;
+CREATE TRIGGER table_version_enrolment_stats_reconciled AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON enrolment_stats_reconciled
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
@@ -0,0 +1,20 @@
+-- Commit-ordered revocation ids.
+--
+-- Workers mirror revoked_tokens by polling 'id > last seen id'
+-- (app/revocation.py, app/aio/auth.py).  Two concurrent revocations can
+-- draw ids 5 and 6 and commit 6 first; a poll in between moves the
+-- watermark past 5 and never sees it.  Taking a transaction-scoped
+-- advisory lock before any id is drawn holds the second writer back until
+-- the first commits, so ids become visible in order (as for
+-- change_events in 0010).  Revocations are rare; the wait is negligible.
+
+CREATE OR REPLACE FUNCTION revoked_tokens_serialize() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(72707372);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS revoked_tokens_serialize ON revoked_tokens;
+CREATE TRIGGER revoked_tokens_serialize BEFORE INSERT ON revoked_tokens
+    FOR EACH STATEMENT EXECUTE FUNCTION revoked_tokens_serialize();
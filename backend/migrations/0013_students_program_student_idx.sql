@@ -0,0 +1,9 @@
+-- Students of one program in student_id order.
+--
+-- The program-name branch of the trigram search (app/models.py) takes only
+-- the first LIMIT students of each matching program; with student_id in the
+-- key that is a short index range instead of every student in the program.
+-- The wider index also serves everything students_program_id_idx did.
+
+CREATE INDEX IF NOT EXISTS students_program_student_idx ON students (program_id, student_id);
+DROP INDEX IF EXISTS students_program_id_idx;
@@ -0,0 +1,70 @@
+-- Order the change feed by writing transaction instead of a global lock.
+--
+-- 0010 made event ids commit-ordered by taking one advisory lock in every
+-- trigger, which serialised all writes to students, programs and colleges
+-- until commit.  Instead each event now records the top-level transaction
+-- id that wrote it, and readers (app/changefeed.py) only take events whose
+-- transaction is older than the oldest one still running
+-- (pg_snapshot_xmin), in (xid, id) order.  Those events are final: any
+-- transaction that can still commit has an xid at or above that horizon,
+-- so it sorts after everything already read and the (xid, id) cursor
+-- never skips an event.  The cost is that a long-running transaction holds
+-- the feed back until it ends.
+--
+-- Events written before this migration all get the migration's xid and
+-- keep their id order.
+
+ALTER TABLE change_events
+    ADD COLUMN IF NOT EXISTS xid BIGINT NOT NULL DEFAULT pg_current_xact_id()::text::bigint;
+
+CREATE INDEX IF NOT EXISTS change_events_xid_id_idx ON change_events (xid, id);
+
+-- Newest (xid, id) removed by pruning; a client resuming from before it
+-- may have missed events and has to reload.
+CREATE TABLE IF NOT EXISTS change_events_pruned (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    xid BIGINT NOT NULL DEFAULT 0,
+    event_id BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO change_events_pruned DEFAULT VALUES ON CONFLICT DO NOTHING;
+
+-- TG_ARGV[0] is the entity name, TG_ARGV[1] its key column.
+CREATE OR REPLACE FUNCTION change_events_on_change() RETURNS TRIGGER AS $$
+DECLARE
+    entity_name VARCHAR := TG_ARGV[0];
+    key_column TEXT := TG_ARGV[1];
+    emitted INTEGER;
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        INSERT INTO change_events (entity, entity_id, op) VALUES (entity_name, NULL, 'reset');
+    ELSIF TG_OP = 'INSERT' THEN
+        EXECUTE format(
+            'INSERT INTO change_events (entity, entity_id, op)
+             SELECT %L, n.%I, ''insert'' FROM new_rows n ORDER BY n.%I',
+            entity_name, key_column, key_column
+        );
+    ELSIF TG_OP = 'DELETE' THEN
+        EXECUTE format(
+            'INSERT INTO change_events (entity, entity_id, op)
+             SELECT %L, o.%I, ''delete'' FROM old_rows o ORDER BY o.%I',
+            entity_name, key_column, key_column
+        );
+    ELSE
+        -- Upserts that rewrite a row unchanged emit nothing.
+        EXECUTE format(
+            'INSERT INTO change_events (entity, entity_id, op)
+             SELECT %L, n.%I, ''update''
+             FROM new_rows n JOIN old_rows o ON o.%I = n.%I
+             WHERE n IS DISTINCT FROM o
+             ORDER BY n.%I',
+            entity_name, key_column, key_column, key_column, key_column
+        );
+    END IF;
+    GET DIAGNOSTICS emitted = ROW_COUNT;
+    IF emitted > 0 THEN
+        -- Identical notifications within a transaction are folded into one.
+        PERFORM pg_notify('change_events', '');
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
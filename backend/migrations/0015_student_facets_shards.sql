@@ -0,0 +1,77 @@
+-- Spread the facet counters over shards.
+--
+-- With one row per (dimension, value), every student write updated the
+-- 'all' row, and every write for the same gender or year level updated
+-- that row too.  Concurrent writers queued on those row locks until
+-- commit.  Each counter is now split into 16 shards picked by
+-- student_id, so writes for different students rarely touch the same
+-- row.  Readers sum the shards (app/models.py).
+--
+-- A student keeps its shard across updates, so the UPDATE branch still
+-- nets old against new within one row.  Every branch upserts, so a shard
+-- row may go negative while the sum stays exact.
+
+ALTER TABLE student_facets ADD COLUMN IF NOT EXISTS shard SMALLINT NOT NULL DEFAULT 0;
+ALTER TABLE student_facets DROP CONSTRAINT IF EXISTS student_facets_pkey;
+ALTER TABLE student_facets ADD PRIMARY KEY (dimension, value, shard);
+
+CREATE OR REPLACE FUNCTION student_facet_shard(student_id INTEGER) RETURNS SMALLINT AS $$
+    SELECT (student_id % 16)::SMALLINT
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION refresh_student_facets() RETURNS VOID AS $$
+BEGIN
+    DELETE FROM student_facets;
+    INSERT INTO student_facets (dimension, value, shard, count)
+    SELECT f.dimension, f.value, student_facet_shard(s.student_id), COUNT(*)
+    FROM students s
+    CROSS JOIN LATERAL student_facet_pairs(s.year_level, s.gender, s.college_id, s.program_id) f
+    GROUP BY 1, 2, 3;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the transition tables that exist for TG_OP are referenced.
+CREATE OR REPLACE FUNCTION student_facets_on_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM student_facets;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO student_facets AS sf (dimension, value, shard, count)
+        SELECT f.dimension, f.value, student_facet_shard(n.student_id), COUNT(*)
+        FROM new_rows n
+        CROSS JOIN LATERAL student_facet_pairs(n.year_level, n.gender, n.college_id, n.program_id) f
+        GROUP BY 1, 2, 3
+        ORDER BY 1, 2, 3
+        ON CONFLICT (dimension, value, shard) DO UPDATE SET count = sf.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO student_facets AS sf (dimension, value, shard, count)
+        SELECT f.dimension, f.value, student_facet_shard(o.student_id), -COUNT(*)
+        FROM old_rows o
+        CROSS JOIN LATERAL student_facet_pairs(o.year_level, o.gender, o.college_id, o.program_id) f
+        GROUP BY 1, 2, 3
+        ORDER BY 1, 2, 3
+        ON CONFLICT (dimension, value, shard) DO UPDATE SET count = sf.count + EXCLUDED.count;
+    ELSE
+        -- Net the old and new values so edits that leave the facet columns
+        -- alone write nothing.
+        INSERT INTO student_facets AS sf (dimension, value, shard, count)
+        SELECT f.dimension, f.value, student_facet_shard(c.student_id), SUM(c.delta)
+        FROM (
+            SELECT student_id, year_level, gender, college_id, program_id, -1 AS delta FROM old_rows
+            UNION ALL
+            SELECT student_id, year_level, gender, college_id, program_id, 1 FROM new_rows
+        ) c
+        CROSS JOIN LATERAL student_facet_pairs(c.year_level, c.gender, c.college_id, c.program_id) f
+        GROUP BY 1, 2, 3
+        HAVING SUM(c.delta) <> 0
+        ORDER BY 1, 2, 3
+        ON CONFLICT (dimension, value, shard) DO UPDATE SET count = sf.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT refresh_student_facets();
@@ -0,0 +1,173 @@
+-- Per-college program and student counts, read by College.all_with_counts
+-- when COLLEGE_COUNTS_TABLE is on.
+--
+-- num_students counts the students enrolled in the college's programs.
+-- Student writes adjust the affected colleges by delta.  Program writes are
+-- rare and can move every student of a program at once, so they recount
+-- the colleges they touch instead; that also covers program deletes, whose
+-- ON DELETE SET NULL on students has already run (and found no program to
+-- charge) by the time the statement trigger fires.
+--
+-- Replaces the row-level triggers setup_db.py --college-counts used to
+-- install.
+
+CREATE TABLE IF NOT EXISTS college_counts (
+    college_id INTEGER PRIMARY KEY REFERENCES colleges(id) ON DELETE CASCADE,
+    num_programs INTEGER NOT NULL DEFAULT 0,
+    num_students INTEGER NOT NULL DEFAULT 0
+);
+
+DROP TRIGGER IF EXISTS college_counts_college ON colleges;
+DROP TRIGGER IF EXISTS college_counts_program ON programs;
+DROP TRIGGER IF EXISTS college_counts_program_delete ON programs;
+DROP TRIGGER IF EXISTS college_counts_student ON students;
+DROP FUNCTION IF EXISTS college_counts_on_college();
+DROP FUNCTION IF EXISTS college_counts_on_program();
+DROP FUNCTION IF EXISTS college_counts_on_student();
+DROP FUNCTION IF EXISTS college_counts_bump(INTEGER, INTEGER, INTEGER);
+
+CREATE OR REPLACE FUNCTION recount_colleges(college_ids INTEGER[]) RETURNS VOID AS $$
+    INSERT INTO college_counts AS cc (college_id, num_programs, num_students)
+    SELECT c.id,
+        (SELECT COUNT(*) FROM programs p WHERE p.college_id = c.id),
+        (SELECT COUNT(*) FROM students s JOIN programs p ON s.program_id = p.id
+         WHERE p.college_id = c.id)
+    FROM colleges c
+    WHERE c.id = ANY(college_ids)
+    ORDER BY c.id
+    ON CONFLICT (college_id) DO UPDATE
+    SET num_programs = EXCLUDED.num_programs, num_students = EXCLUDED.num_students;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION refresh_college_counts() RETURNS VOID AS $$
+BEGIN
+    DELETE FROM college_counts;
+    PERFORM recount_colleges(ARRAY(SELECT id FROM colleges));
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the transition tables that exist for TG_OP are referenced.
+CREATE OR REPLACE FUNCTION college_counts_on_college() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM refresh_college_counts();
+    ELSE
+        INSERT INTO college_counts (college_id)
+        SELECT id FROM new_rows ORDER BY id
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION college_counts_on_program() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        PERFORM refresh_college_counts();
+    ELSIF TG_OP = 'INSERT' THEN
+        PERFORM recount_colleges(ARRAY(SELECT college_id FROM new_rows));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM recount_colleges(ARRAY(SELECT college_id FROM old_rows));
+    ELSE
+        PERFORM recount_colleges(ARRAY(
+            SELECT o.college_id FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE n.college_id IS DISTINCT FROM o.college_id
+            UNION
+            SELECT n.college_id FROM old_rows o JOIN new_rows n ON n.id = o.id
+            WHERE n.college_id IS DISTINCT FROM o.college_id
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Upserts apply the deltas in college order, so concurrent writers lock the
+-- rows in the same order.
+CREATE OR REPLACE FUNCTION college_counts_on_student() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE college_counts SET num_students = 0 WHERE num_students <> 0;
+    ELSIF TG_OP = 'INSERT' THEN
+        INSERT INTO college_counts AS cc (college_id, num_students)
+        SELECT p.college_id, COUNT(*)
+        FROM new_rows n JOIN programs p ON p.id = n.program_id
+        WHERE p.college_id IS NOT NULL
+        GROUP BY p.college_id
+        ORDER BY p.college_id
+        ON CONFLICT (college_id) DO UPDATE SET num_students = cc.num_students + EXCLUDED.num_students;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO college_counts AS cc (college_id, num_students)
+        SELECT p.college_id, -COUNT(*)
+        FROM old_rows o JOIN programs p ON p.id = o.program_id
+        WHERE p.college_id IS NOT NULL
+        GROUP BY p.college_id
+        ORDER BY p.college_id
+        ON CONFLICT (college_id) DO UPDATE SET num_students = cc.num_students + EXCLUDED.num_students;
+    ELSE
+        -- Net old against new so edits that keep the program write nothing.
+        INSERT INTO college_counts AS cc (college_id, num_students)
+        SELECT p.college_id, SUM(c.delta)
+        FROM (
+            SELECT program_id, -1 AS delta FROM old_rows
+            UNION ALL
+            SELECT program_id, 1 FROM new_rows
+        ) c
+        JOIN programs p ON p.id = c.program_id
+        WHERE p.college_id IS NOT NULL
+        GROUP BY p.college_id
+        HAVING SUM(c.delta) <> 0
+        ORDER BY p.college_id
+        ON CONFLICT (college_id) DO UPDATE SET num_students = cc.num_students + EXCLUDED.num_students;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS college_counts_college_insert ON colleges;
+CREATE TRIGGER college_counts_college_insert AFTER INSERT ON colleges
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION college_counts_on_college();
+
+DROP TRIGGER IF EXISTS college_counts_college_truncate ON colleges;
+CREATE TRIGGER college_counts_college_truncate AFTER TRUNCATE ON colleges
+    FOR EACH STATEMENT EXECUTE FUNCTION college_counts_on_college();
+
+DROP TRIGGER IF EXISTS college_counts_program_insert ON programs;
+CREATE TRIGGER college_counts_program_insert AFTER INSERT ON programs
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION college_counts_on_program();
+
+DROP TRIGGER IF EXISTS college_counts_program_update ON programs;
+CREATE TRIGGER college_counts_program_update AFTER UPDATE ON programs
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION college_counts_on_program();
+
+DROP TRIGGER IF EXISTS college_counts_program_delete ON programs;
+CREATE TRIGGER college_counts_program_delete AFTER DELETE ON programs
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION college_counts_on_program();
+
+DROP TRIGGER IF EXISTS college_counts_program_truncate ON programs;
+CREATE TRIGGER college_counts_program_truncate AFTER TRUNCATE ON programs
+    FOR EACH STATEMENT EXECUTE FUNCTION college_counts_on_program();
+
+DROP TRIGGER IF EXISTS college_counts_student_insert ON students;
+CREATE TRIGGER college_counts_student_insert AFTER INSERT ON students
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION college_counts_on_student();
+
+DROP TRIGGER IF EXISTS college_counts_student_update ON students;
+CREATE TRIGGER college_counts_student_update AFTER UPDATE ON students
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION college_counts_on_student();
+
+DROP TRIGGER IF EXISTS college_counts_student_delete ON students;
+CREATE TRIGGER college_counts_student_delete AFTER DELETE ON students
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION college_counts_on_student();
+
+DROP TRIGGER IF EXISTS college_counts_student_truncate ON students;
+CREATE TRIGGER college_counts_student_truncate AFTER TRUNCATE ON students
+    FOR EACH STATEMENT EXECUTE FUNCTION college_counts_on_student();
+
+SELECT refresh_college_counts();
@@ -1,3 +1,5 @@
+# Development server only; use `gunicorn -c gunicorn.conf.py wsgi:app` in production.
+import os
 from app import create_app
 from dotenv import load_dotenv
 
@@ -5,4 +7,4 @@ load_dotenv('.env')
 app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    app.run(debug=os.getenv("FLASK_DEBUG", "false").lower() in ("1", "true", "yes"))
@@ -1,6 +1,5 @@
 # setup_db.py
 import psycopg2
-from psycopg2 import sql
 from dotenv import load_dotenv
 import os
 
@@ -12,63 +11,87 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
-def create_tables():
-    conn = psycopg2.connect(
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Arbitrary key for pg_advisory_lock so only one process migrates at a time.
+MIGRATION_LOCK_ID = 72707369
+
+def connect():
+    return psycopg2.connect(
         dbname=DB_NAME,
         user=DB_USER,
         password=DB_PASSWORD,
         host=DB_HOST,
         port=DB_PORT
     )
-    cursor = conn.cursor()
 
-    # Users table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        id SERIAL PRIMARY KEY,
-        username VARCHAR(50) NOT NULL UNIQUE,
-        user_password VARCHAR(255) NOT NULL,
-        email VARCHAR(100) NOT NULL UNIQUE
-    );
-    """)
+def load_migrations():
+    """Return ``[(version, name, path)]`` for ``migrations/NNNN_name.sql`` sorted by version."""
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        if not filename.endswith(".sql"):
+            continue
+        prefix, _, rest = filename.partition("_")
+        if not prefix.isdigit():
+            continue
+        migrations.append((int(prefix), rest[:-len(".sql")], os.path.join(MIGRATIONS_DIR, filename)))
+    migrations.sort()
+    return migrations
 
-    # Colleges table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS colleges (
-        id SERIAL PRIMARY KEY,
-        college_code VARCHAR(20) NOT NULL UNIQUE,
-        college_name VARCHAR(100) NOT NULL
-    );
-    """)
+def latest_version():
+    migrations = load_migrations()
+    return migrations[-1][0] if migrations else 0
 
-    # Programs table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS programs (
-        id SERIAL PRIMARY KEY,
-        program_code VARCHAR(20) NOT NULL UNIQUE,
-        program_name VARCHAR(100) NOT NULL,
-        college_id INTEGER REFERENCES colleges(id) ON DELETE SET NULL
-    );
-    """)
+def migrate(target=None):
+    """Apply pending migrations, each in its own transaction."""
+    conn = connect()
+    cursor = conn.cursor()
+    applied_now = []
+    try:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+        """)
+        conn.commit()
+
+        cursor.execute("SELECT version FROM schema_migrations")
+        applied = {row[0] for row in cursor.fetchall()}
 
-    # Students table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS students (
-        student_id SERIAL PRIMARY KEY,
-        id_number VARCHAR(20) NOT NULL UNIQUE,
-        last_name VARCHAR(50) NOT NULL,
-        first_name VARCHAR(50) NOT NULL,
-        gender VARCHAR(10) NOT NULL CHECK (gender IN ('Male', 'Female', 'Others')),
-        year_level VARCHAR(3) NOT NULL CHECK (year_level IN ('1','2','3','4','4+')),
-        college_id INTEGER REFERENCES colleges(id) ON DELETE SET NULL,
-        program_id INTEGER REFERENCES programs(id) ON DELETE SET NULL
-    );
-    """)
+        for version, name, path in load_migrations():
+            if version in applied or (target is not None and version > target):
+                continue
+            with open(path, encoding="utf-8") as f:
+                statements = f.read()
+            try:
+                cursor.execute(statements)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                print(f"Migration {version:04d}_{name} failed")
+                raise
+            applied_now.append(version)
+            print(f"Applied migration {version:04d}_{name}")
+    finally:
+        cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+        conn.commit()
+        cursor.close()
+        conn.close()
 
-    conn.commit()
-    cursor.close()
-    conn.close()
-    print("All tables created successfully (if not existed).")
+    if not applied_now:
+        print("Database schema is up to date.")
+    return applied_now
+
+def create_tables():
+    # Kept for callers of the old entry point; the schema now lives in migrations/.
+    return migrate()
 
 if __name__ == "__main__":
-    create_tables()
+    migrate()
@@ -0,0 +1,124 @@
+"""Shared fixtures.
+
+Tests that need Postgres run against ``TEST_DATABASE_URL`` and are skipped
+when it is not set.  The database is migrated once and emptied before each
+test, so never point it at a database whose data you want to keep::
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/ssis_test python -m pytest
+"""
+import os
+from urllib.parse import urlparse
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+# app.config reads the environment at import time; point it at the test
+# database before anything imports the app.
+if TEST_DATABASE_URL:
+    _url = urlparse(TEST_DATABASE_URL)
+    os.environ.update({
+        "DB_HOST": _url.hostname or "localhost",
+        "DB_PORT": str(_url.port or 5432),
+        "DB_NAME": _url.path.lstrip("/"),
+        "DB_USERNAME": _url.username or "",
+        "DB_PASSWORD": _url.password or "",
+    })
+os.environ["SCHEMA_STARTUP"] = "off"
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+requires_db = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+CLEAN_SQL = """
+    TRUNCATE students, programs, colleges, enrolment_stats, revoked_tokens RESTART IDENTITY CASCADE;
+    TRUNCATE change_events RESTART IDENTITY;
+    UPDATE change_events_pruned SET xid = 0, event_id = 0;
+    SELECT refresh_student_facets();
+"""
+
+
+@pytest.fixture(scope="session")
+def app():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    import setup_db
+    from app import create_app, database
+
+    setup_db.migrate()
+    app = create_app()
+    app.config["TESTING"] = True
+    yield app
+    database.close_pool(app)
+
+
+@pytest.fixture
+def db(app):
+    """A cursor on a freshly emptied database (autocommit)."""
+    import psycopg2
+
+    conn = psycopg2.connect(app.config["DATABASE_URL"])
+    conn.autocommit = True
+    cursor = conn.cursor()
+    cursor.execute(CLEAN_SQL)
+    from app import cache
+    cache.cache.configure(enabled=app.config["CACHE_ENABLED"], ttl=app.config["CACHE_TTL"])
+    yield cursor
+    cursor.close()
+    conn.close()
+
+
+@pytest.fixture
+def client(app, db):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(app):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity="1")
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def catalogue(db):
+    """Two colleges with one program each; returns their ids."""
+    db.execute("""
+        INSERT INTO colleges (college_code, college_name) VALUES ('CCS', 'Computing'), ('COE', 'Engineering');
+        INSERT INTO programs (program_code, program_name, college_id)
+        VALUES ('BSCS', 'Computer Science', 1), ('BSCE', 'Civil Engineering', 2);
+    """)
+    return {"colleges": (1, 2), "programs": (1, 2)}
+
+
+def add_students(db, rows):
+    """Insert ``(id_number, last_name, first_name, gender, year_level, college_id, program_id)`` rows."""
+    db.executemany("""
+        INSERT INTO students (id_number, last_name, first_name, gender, year_level, college_id, program_id)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, rows)
+
+
+@pytest.fixture(scope="session")
+def aio_app(app):
+    """The ASGI app on the same database (its response cache is off)."""
+    from app.aio import create_asgi_app
+
+    return create_asgi_app()
+
+
+def aio_requests(aio_app, calls):
+    """Run ``(method, path, kwargs)`` calls against the ASGI app; returns ``[(status, json)]``."""
+    import asyncio
+
+    async def run():
+        results = []
+        async with aio_app.test_app() as test_app:
+            client = test_app.test_client()
+            for method, path, kwargs in calls:
+                res = await client.open(path, method=method, **kwargs)
+                results.append((res.status_code, await res.get_json(force=True, silent=True)))
+        return results
+
+    return asyncio.run(run())
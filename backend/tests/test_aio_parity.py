@@ -0,0 +1,139 @@
+"""The ASGI routes must answer exactly like the Flask ones on the same data."""
+import pytest
+
+from conftest import add_students, aio_requests, requires_db
+
+STUDENTS = [
+    ("2024-0001", "Santos", "Ana", "Female", "1", 1, 1),
+    ("2024-0002", "Reyes", "Ben", "Male", "2", 1, 1),
+    ("2024-0003", "Cruz", "Carla", "Female", "3", 2, 2),
+    ("2024-0004", "Reyes", "Dan", "Male", "4", 2, 2),
+    ("2024-0005", "Bautista", "Eve", "Others", "1", 1, 1),
+]
+
+READS = [
+    "/api/dashboard/students",
+    "/api/dashboard/students?limit=2",
+    "/api/dashboard/students?limit=2&sort=last_name&order=desc&include_total=1",
+    "/api/dashboard/students?college_id=1&gender=female&include_total=true",
+    "/api/dashboard/students?q=rey",
+    "/api/dashboard/students?ids=1,3,5",
+    "/api/dashboard/students?limit=0",
+    "/api/dashboard/students?college_id=x",
+    "/api/dashboard/students?sort=nope",
+    "/api/dashboard/students?cursor=garbage",
+    "/api/dashboard/students/facets",
+    "/api/dashboard/students/facets?college_id=2",
+    "/api/dashboard/students/facets?q=reyes&year_level=2",
+    "/api/dashboard/students/facets?program_id=x",
+    "/api/dashboard/students/year-levels",
+    "/api/dashboard/students/genders",
+    "/api/dashboard/colleges",
+    "/api/dashboard/programs",
+]
+
+
+def _sync(client, method, path, kwargs):
+    res = client.open(path, method=method, **kwargs)
+    return res.status_code, res.get_json(force=True, silent=True)
+
+
+@pytest.fixture
+def roster(db, catalogue):
+    add_students(db, STUDENTS)
+    db.execute("SELECT refresh_student_facets()")
+
+
+@requires_db
+def test_reads_match(client, aio_app, auth_headers, roster):
+    calls = [("GET", path, {"headers": auth_headers}) for path in READS]
+    for path, sync, aio in zip(READS, [_sync(client, *call) for call in calls], aio_requests(aio_app, calls)):
+        assert aio == sync, path
+
+
+@requires_db
+def test_cursor_walk_matches(client, aio_app, auth_headers, roster):
+    path = "/api/dashboard/students?limit=2&sort=last_name"
+    sync_pages, aio_pages = [], []
+    while True:
+        status, page = _sync(client, "GET", path, {"headers": auth_headers})
+        [(aio_status, aio_page)] = aio_requests(aio_app, [("GET", path, {"headers": auth_headers})])
+        assert status == aio_status == 200
+        sync_pages.append(page)
+        aio_pages.append(aio_page)
+        if not page["has_more"]:
+            break
+        path = f"/api/dashboard/students?limit=2&sort=last_name&cursor={page['next_cursor']}"
+    assert aio_pages == sync_pages
+    assert len(sync_pages) == 3
+
+
+WRITES = [
+    ("POST", "/api/dashboard/colleges", {"json": {"college_code": "CAS", "college_name": "arts"}}),
+    ("POST", "/api/dashboard/colleges", {"json": {"college_code": "CASX", "college_name": "ARTS"}}),
+    ("POST", "/api/dashboard/colleges", {"json": {"college_code": "X", "college_name": "Bad1"}}),
+    ("PUT", "/api/dashboard/colleges/3", {"json": {"college_code": "CAS", "college_name": "Computing"}}),
+    ("POST", "/api/dashboard/programs", {"json": {"program_code": "BSA", "program_name": "art", "college_id": 3}}),
+    ("POST", "/api/dashboard/programs", {"json": {"program_code": "BSA", "program_name": "Other", "college_id": 3}}),
+    ("POST", "/api/dashboard/students", {"json": {
+        "id_number": "2024-0006", "last_name": "lim", "first_name": "fe", "gender": "Female",
+        "year_level": "2", "college_id": 3, "program_id": 3}}),
+    ("POST", "/api/dashboard/students", {"json": {
+        "id_number": "2024-0006", "last_name": "Lim", "first_name": "Fe", "gender": "Female",
+        "year_level": "2", "college_id": 3, "program_id": 3}}),
+    ("POST", "/api/dashboard/students", {"json": {
+        "id_number": "20240007", "last_name": "Lim", "first_name": "Fe", "gender": "Female",
+        "year_level": "2", "college_id": 3, "program_id": 3}}),
+    ("PUT", "/api/dashboard/students/2024-0006", {"json": {
+        "last_name": "Lim", "first_name": "Fe", "gender": "Female",
+        "year_level": "3", "college_id": 1, "program_id": 1}}),
+    ("PUT", "/api/dashboard/students/2099-0000", {"json": {
+        "last_name": "Lim", "first_name": "Fe", "gender": "Female",
+        "year_level": "3", "college_id": 1, "program_id": 1}}),
+    ("DELETE", "/api/dashboard/students/2024-0006", {}),
+    ("DELETE", "/api/dashboard/students/2024-0006", {}),
+    ("DELETE", "/api/dashboard/programs/3", {}),
+    ("DELETE", "/api/dashboard/colleges/3", {}),
+    ("DELETE", "/api/dashboard/colleges/3", {}),
+]
+
+STATE_SQL = """
+    SELECT json_build_object(
+        'colleges', (SELECT json_agg(c ORDER BY id) FROM (SELECT id, college_code, college_name FROM colleges) c),
+        'programs', (SELECT json_agg(p ORDER BY id) FROM (SELECT id, program_code, program_name, college_id FROM programs) p),
+        'students', (SELECT json_agg(s ORDER BY id_number) FROM (
+            SELECT id_number, last_name, first_name, gender, year_level, college_id, program_id FROM students) s),
+        'stats', (SELECT json_agg(e ORDER BY e.*) FROM enrolment_stats e WHERE count <> 0)
+    )::text
+"""
+
+
+def _reset(db):
+    from conftest import CLEAN_SQL
+
+    db.execute(CLEAN_SQL)
+    db.execute("""
+        INSERT INTO colleges (college_code, college_name) VALUES ('CCS', 'Computing'), ('COE', 'Engineering');
+        INSERT INTO programs (program_code, program_name, college_id)
+        VALUES ('BSCS', 'Computer Science', 1), ('BSCE', 'Civil Engineering', 2);
+    """)
+
+
+@requires_db
+def test_writes_match(client, aio_app, auth_headers, db):
+    _reset(db)
+    sync = []
+    for method, path, kwargs in WRITES:
+        sync.append(_sync(client, method, path, dict(kwargs, headers=auth_headers)))
+        db.execute(STATE_SQL)
+        sync.append(db.fetchone()[0])
+
+    _reset(db)
+    aio = []
+    for method, path, kwargs in WRITES:
+        aio.extend(aio_requests(aio_app, [(method, path, dict(kwargs, headers=auth_headers))]))
+        db.execute(STATE_SQL)
+        aio.append(db.fetchone()[0])
+
+    for i, (expected, actual) in enumerate(zip(sync, aio)):
+        assert actual == expected, WRITES[i // 2][:2]
@@ -0,0 +1,49 @@
+import pytest
+
+from conftest import add_students, aio_requests, requires_db
+
+NEW_STUDENT = {
+    "id_number": "2024-0009", "last_name": "santos", "first_name": "ana",
+    "gender": "Female", "year_level": "1", "college_id": 1, "program_id": 1,
+}
+
+
+@requires_db
+@pytest.mark.parametrize("changes", [
+    {"college_id": "abc"},
+    {"program_id": [1]},
+    {"college_id": 99},
+    {"gender": "unknown"},
+])
+def test_add_student_rejects_bad_values_with_400(client, aio_app, auth_headers, catalogue, changes):
+    body = dict(NEW_STUDENT, **changes)
+    [(status, payload)] = aio_requests(aio_app, [
+        ("POST", "/api/dashboard/students", {"json": body, "headers": auth_headers}),
+    ])
+    sync = client.post("/api/dashboard/students", json=body, headers=auth_headers)
+    assert status == sync.status_code == 400
+    assert payload["error"] == sync.get_json()["error"]
+
+
+@requires_db
+def test_add_student_coerces_numeric_year_level(aio_app, auth_headers, db, catalogue):
+    [(status, _)] = aio_requests(aio_app, [
+        ("POST", "/api/dashboard/students", {"json": dict(NEW_STUDENT, year_level=2), "headers": auth_headers}),
+    ])
+    assert status == 201
+    db.execute("SELECT year_level FROM students WHERE id_number = '2024-0009'")
+    assert db.fetchone() == ("2",)
+
+
+@requires_db
+def test_update_student_coerces_types(aio_app, auth_headers, db, catalogue):
+    add_students(db, [("2024-0001", "Santos", "Ana", "Female", "1", 1, 1)])
+    body = {"last_name": "Santos", "first_name": "Ana", "gender": "Female",
+            "year_level": 3, "college_id": "2", "program_id": 2}
+    [(status, _), (bad_status, _)] = aio_requests(aio_app, [
+        ("PUT", "/api/dashboard/students/2024-0001", {"json": body, "headers": auth_headers}),
+        ("PUT", "/api/dashboard/students/2024-0001", {"json": dict(body, college_id="x"), "headers": auth_headers}),
+    ])
+    assert (status, bad_status) == (200, 400)
+    db.execute("SELECT year_level, college_id, program_id FROM students WHERE id_number = '2024-0001'")
+    assert db.fetchone() == ("3", 2, 2)
@@ -0,0 +1,130 @@
+import pytest
+
+from conftest import add_students, requires_db
+
+STUDENTS_URL = "/api/dashboard/students/batch"
+
+
+def _student(id_number, **overrides):
+    data = {"id_number": id_number, "last_name": "Santos", "first_name": "Ana",
+            "gender": "Female", "year_level": "1", "college_id": 1, "program_id": 1}
+    data.update(overrides)
+    return {"op": "create", "data": data}
+
+
+def _id_numbers(db):
+    db.execute("SELECT id_number FROM students ORDER BY id_number")
+    return [row[0] for row in db.fetchall()]
+
+
+def _statuses(body):
+    return [(r["status"], r.get("error")) for r in body["results"]]
+
+
+@requires_db
+def test_atomic_batch_commits_every_operation(client, auth_headers, db, catalogue):
+    add_students(db, [("2024-0001", "Reyes", "Ben", "Male", "2", 1, 1)])
+    res = client.post(STUDENTS_URL, headers=auth_headers, json={"operations": [
+        _student("2024-0002"),
+        _student("2024-0003", college_id=2, program_id=2),
+        {"op": "update", "id_number": "2024-0002", "data": {"year_level": "3"}},
+        {"op": "delete", "id_number": "2024-0001"},
+    ]})
+    assert res.status_code == 200
+    body = res.get_json()
+    assert (body["committed"], body["succeeded"], body["failed"]) == (True, 4, 0)
+    assert _id_numbers(db) == ["2024-0002", "2024-0003"]
+
+
+@requires_db
+def test_atomic_batch_skips_everything_after_a_validation_error(client, auth_headers, db, catalogue):
+    res = client.post(STUDENTS_URL, headers=auth_headers, json={"operations": [
+        _student("2024-0001"),
+        _student("2024-0002", gender="Robot"),
+    ]})
+    assert res.status_code == 400
+    assert _statuses(res.get_json()) == [
+        ("skipped", None),
+        ("error", "'gender' must be one of Male, Female, Others"),
+    ]
+    assert _id_numbers(db) == []
+
+
+@requires_db
+def test_atomic_batch_reports_repeated_id_numbers_as_conflicts(client, auth_headers, db, catalogue):
+    add_students(db, [("2024-0001", "Reyes", "Ben", "Male", "2", 1, 1)])
+    res = client.post(STUDENTS_URL, headers=auth_headers, json={"operations": [
+        _student("2024-0002"),
+        _student("2024-0002", first_name="Bea"),
+        _student("2024-0001"),
+    ]})
+    assert res.status_code == 400
+    assert _statuses(res.get_json()) == [
+        ("rolled_back", None),
+        ("error", "ID number already exists"),
+        ("error", "ID number already exists"),
+    ]
+    assert _id_numbers(db) == ["2024-0001"]
+
+
+@requires_db
+def test_atomic_batch_reports_database_errors_on_every_item(client, auth_headers, db, catalogue):
+    res = client.post(STUDENTS_URL, headers=auth_headers, json={"operations": [
+        _student("2024-0001"),
+        _student("2024-0002", program_id=99),
+    ]})
+    assert res.status_code == 400
+    results = res.get_json()["results"]
+    assert {r["status"] for r in results} == {"error"}
+    assert all("foreign key" in r["error"] for r in results)
+    assert _id_numbers(db) == []
+
+
+@requires_db
+def test_best_effort_batch_commits_the_good_items(client, auth_headers, db, catalogue):
+    res = client.post(STUDENTS_URL, headers=auth_headers, json={"mode": "best_effort", "operations": [
+        _student("2024-0001"),
+        _student("2024-0001", first_name="Bea"),
+        _student("2024-0002", program_id=99),
+        {"op": "update", "id_number": "2024-0009", "data": {"year_level": "2"}},
+        _student("2024-0003", gender="Robot"),
+        _student("2024-0004"),
+    ]})
+    assert res.status_code == 200
+    body = res.get_json()
+    statuses = _statuses(body)
+    assert statuses[0] == ("ok", None)
+    assert statuses[1] == ("error", "ID number already exists")
+    assert statuses[2][0] == "error" and "foreign key" in statuses[2][1]
+    assert statuses[3] == ("error", "Not found")
+    assert statuses[4] == ("error", "'gender' must be one of Male, Female, Others")
+    assert statuses[5] == ("ok", None)
+    assert (body["committed"], body["succeeded"], body["failed"]) == (True, 2, 4)
+    assert _id_numbers(db) == ["2024-0001", "2024-0004"]
+
+
+@pytest.mark.parametrize("value", [2 ** 31, -2 ** 31 - 1])
+@requires_db
+def test_integer_columns_are_range_checked(client, auth_headers, db, catalogue, value):
+    res = client.post(STUDENTS_URL, headers=auth_headers, json={"operations": [
+        _student("2024-0001", college_id=value),
+    ]})
+    assert res.status_code == 400
+    assert _statuses(res.get_json()) == [("error", "'college_id' is out of range")]
+
+
+@requires_db
+def test_deletes_detach_referencing_rows(client, auth_headers, db, catalogue):
+    add_students(db, [("2024-0001", "Reyes", "Ben", "Male", "2", 1, 1)])
+    res = client.post("/api/dashboard/programs/batch", headers=auth_headers, json={"operations": [
+        {"op": "delete", "id": 1},
+    ]})
+    assert res.status_code == 200
+    res = client.post("/api/dashboard/colleges/batch", headers=auth_headers, json={"operations": [
+        {"op": "delete", "id": 2},
+    ]})
+    assert res.status_code == 200
+    db.execute("SELECT college_id, program_id FROM students")
+    assert db.fetchall() == [(1, None)]
+    db.execute("SELECT id, college_id FROM programs")
+    assert db.fetchall() == [(2, None)]
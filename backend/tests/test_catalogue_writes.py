@@ -0,0 +1,94 @@
+import threading
+
+import psycopg2
+
+from app import queries
+from conftest import add_students, requires_db
+
+
+def _post(client, headers, path, body):
+    res = client.post(path, headers=headers, json=body)
+    return res.status_code, res.get_json()
+
+
+@requires_db
+def test_college_name_and_code_clashes_are_reported(client, auth_headers, db, catalogue):
+    assert _post(client, auth_headers, "/api/dashboard/colleges",
+                 {"college_code": "CAS", "college_name": "arts"})[0] == 201
+    assert _post(client, auth_headers, "/api/dashboard/colleges",
+                 {"college_code": "XYZ", "college_name": "ARTS"}) == (400, {"error": "College already exists"})
+    assert _post(client, auth_headers, "/api/dashboard/colleges",
+                 {"college_code": "CAS", "college_name": "Sciences"}) == \
+        (400, {"error": "College code already exists"})
+
+    res = client.put("/api/dashboard/colleges/1", headers=auth_headers,
+                     json={"college_code": "CCS", "college_name": "Arts"})
+    assert (res.status_code, res.get_json()) == \
+        (400, {"error": "College name already taken by another college"})
+    res = client.put("/api/dashboard/colleges/99", headers=auth_headers,
+                     json={"college_code": "NEW", "college_name": "Nowhere"})
+    assert res.status_code == 400
+    db.execute("SELECT COUNT(*) FROM colleges")
+    assert db.fetchone() == (3,)
+
+
+@requires_db
+def test_program_and_student_clashes_are_reported(client, auth_headers, db, catalogue):
+    assert _post(client, auth_headers, "/api/dashboard/programs",
+                 {"program_code": "BSIT", "program_name": "computer science", "college_id": 1}) == \
+        (400, {"error": "Program name already exists"})
+
+    add_students(db, [("2024-0001", "Santos", "Ana", "Female", "1", 1, 1)])
+    assert _post(client, auth_headers, "/api/dashboard/students", {
+        "id_number": "2024-0001", "last_name": "Reyes", "first_name": "Ben",
+        "gender": "Male", "year_level": "2", "college_id": 1, "program_id": 1,
+    }) == (400, {"error": "ID number already exists"})
+
+
+@requires_db
+def test_deletes_report_missing_rows_and_detach_references(client, auth_headers, db, catalogue):
+    add_students(db, [("2024-0001", "Santos", "Ana", "Female", "1", 1, 1)])
+    res = client.delete("/api/dashboard/programs/1", headers=auth_headers)
+    assert res.get_json() == {"message": "Program 'BSCS' deleted successfully"}
+    assert client.delete("/api/dashboard/programs/1", headers=auth_headers).status_code == 404
+
+    res = client.delete("/api/dashboard/colleges/1", headers=auth_headers)
+    assert res.get_json() == {"message": "College 'CCS' deleted successfully"}
+    assert client.delete("/api/dashboard/colleges/1", headers=auth_headers).status_code == 404
+
+    db.execute("SELECT college_id, program_id FROM students")
+    assert db.fetchall() == [(None, None)]
+
+
+@requires_db
+def test_concurrent_adds_of_one_name_leave_one_row(app, db, catalogue):
+    """The second insert waits on the first and then inserts nothing, without a separate check."""
+    first = psycopg2.connect(app.config["DATABASE_URL"])
+    second = psycopg2.connect(app.config["DATABASE_URL"])
+    sql = queries.sql("college.add")
+    try:
+        cursor = first.cursor()
+        cursor.execute(sql, ("CAS", "Arts"))
+        assert cursor.fetchone() is not None
+
+        results = []
+
+        def add_again():
+            with second.cursor() as other:
+                other.execute(sql, ("CAS2", "ARTS"))
+                results.append(other.fetchone())
+            second.commit()
+
+        thread = threading.Thread(target=add_again)
+        thread.start()
+        thread.join(0.3)
+        assert thread.is_alive()  # blocked on the uncommitted row
+
+        first.commit()
+        thread.join(5)
+        assert results == [None]
+    finally:
+        first.close()
+        second.close()
+    db.execute("SELECT college_code FROM colleges WHERE LOWER(college_name) = 'arts'")
+    assert db.fetchall() == [("CAS",)]
@@ -0,0 +1,192 @@
+import json
+import time
+
+import psycopg2
+import pytest
+
+from app import changefeed
+from app.database import get_pool
+from conftest import requires_db
+
+
+def _wait_for_events(feed, count, timeout=5.0):
+    """Wait until the listener has read ``count`` events; returns their cursors."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if feed.stats()["events"] >= count:
+            return [changefeed.cursor_of(e) for e in feed._buffer]
+        time.sleep(0.02)
+    raise AssertionError(f"listener did not read {count} events; at {feed.stats()['events']}")
+
+
+def _add_colleges(db, *codes):
+    for code in codes:
+        db.execute("INSERT INTO colleges (college_code, college_name) VALUES (%s, %s)", (code, f"College {code}"))
+
+
+def _cursors(db):
+    db.execute("SELECT xid, id FROM change_events ORDER BY xid, id")
+    return [tuple(row) for row in db.fetchall()]
+
+
+@pytest.fixture
+def feed(app, db, monkeypatch):
+    """A fresh listener on the emptied change_events table, installed as the app's feed."""
+    feed = changefeed.ChangeFeed(dsn=app.config["DATABASE_URL"], buffer_size=3, poll_interval=0.2)
+    monkeypatch.setattr(changefeed, "feed", feed)
+    assert feed.head() == changefeed.START
+    return feed
+
+
+@requires_db
+def test_read_from_buffer(app, db, feed):
+    _add_colleges(db, "A", "B")
+    db.execute("UPDATE colleges SET college_name = 'Renamed' WHERE college_code = 'A'")
+    _wait_for_events(feed, 3)
+
+    events, reset = feed.read(changefeed.START)
+    assert not reset
+    assert [(e.id, e.entity, e.entity_id, e.op) for e in events] == [
+        (1, "college", 1, "insert"), (2, "college", 2, "insert"), (3, "college", 1, "update"),
+    ]
+    assert feed.read(feed.head()) == ([], False)
+    assert feed.stats()["backfills"] == 0
+
+
+@requires_db
+def test_resume_before_the_buffer_backfills_from_the_table(app, db, feed):
+    _add_colleges(db, "A", "B", "C", "D", "E")
+    _wait_for_events(feed, 5)
+    cursors = _cursors(db)
+
+    with app.app_context():
+        events, reset = feed.read(changefeed.START)
+    assert not reset
+    assert [e.id for e in events] == [1, 2]
+    assert feed.stats()["backfills"] == 1
+    events, reset = feed.read(cursors[1])
+    assert [e.id for e in events] == [3, 4, 5]
+
+
+@requires_db
+def test_resume_from_pruned_events_resets(app, db, feed):
+    _add_colleges(db, "A", "B", "C", "D", "E")
+    _wait_for_events(feed, 5)
+    cursors = _cursors(db)
+    db.execute("UPDATE change_events SET created_at = NOW() - INTERVAL '2 days' WHERE id <= 2")
+    changefeed.queries.execute(db, "changes.prune", (86400,))
+
+    with app.app_context():
+        assert feed.read(changefeed.START) == ([], True)
+        assert feed.read(cursors[0]) == ([], True)
+        events, reset = feed.read(cursors[1])
+    assert not reset and [e.id for e in events] == [3, 4, 5]
+    assert feed.stats()["resets"] == 2
+
+
+@requires_db
+def test_resume_from_an_unknown_future_cursor_resets(app, db, feed):
+    _add_colleges(db, "A")
+    _wait_for_events(feed, 1)
+    assert feed.read((2 ** 40, 1)) == ([], True)
+
+
+@requires_db
+def test_writers_to_different_tables_do_not_wait_for_each_other(app, db, feed):
+    first = psycopg2.connect(app.config["DATABASE_URL"])
+    second = psycopg2.connect(app.config["DATABASE_URL"])
+    try:
+        first.cursor().execute("INSERT INTO colleges (college_code, college_name) VALUES ('A', 'College A')")
+        cursor = second.cursor()
+        cursor.execute("SET lock_timeout = '1s'")
+        cursor.execute("INSERT INTO programs (program_code, program_name) VALUES ('P', 'Program P')")
+        second.commit()
+
+        # The program committed, but the college's transaction is older and
+        # still open: its event is held back so the cursor cannot move past
+        # the college's.
+        time.sleep(0.5)
+        assert feed.stats()["events"] == 0
+
+        first.commit()
+        _wait_for_events(feed, 2)
+        events, _ = feed.read(changefeed.START)
+        assert [(e.entity, e.id) for e in events] == [("college", 1), ("program", 2)]
+    finally:
+        first.close()
+        second.close()
+
+
+def _frames(body):
+    frames = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if line and not line.startswith(":"))
+        if "event" in fields:
+            frames.append((fields["id"], fields["event"], json.loads(fields["data"])))
+    return frames
+
+
+def _stream(client, auth_headers, app, last_event_id=None):
+    headers = dict(auth_headers)
+    if last_event_id is not None:
+        headers["Last-Event-ID"] = last_event_id
+    app.config.update(CHANGE_FEED_MAX_AGE=0.3, CHANGE_FEED_HEARTBEAT=0.1)
+    try:
+        res = client.get("/api/dashboard/changes", headers=headers)
+        body = res.get_data(as_text=True)
+        res.close()
+    finally:
+        app.config.update(CHANGE_FEED_MAX_AGE=300.0, CHANGE_FEED_HEARTBEAT=15.0)
+    return res, body, _frames(body)
+
+
+@requires_db
+def test_stream_frames(client, auth_headers, app, db, feed):
+    _add_colleges(db, "A", "B")
+    first, second = _wait_for_events(feed, 2)
+    first, second = changefeed.format_cursor(first), changefeed.format_cursor(second)
+
+    res, body, frames = _stream(client, auth_headers, app)
+    assert res.status_code == 200 and res.mimetype == "text/event-stream"
+    assert body.startswith("retry: 3000\n\n")
+    assert frames == [(second, "ready", {"id": second})]
+    assert ": keepalive" in body
+
+    _, _, frames = _stream(client, auth_headers, app, last_event_id=first)
+    assert frames == [(second, "change", {"id": 2, "entity": "college", "entity_id": 2, "op": "insert"})]
+
+    _, _, frames = _stream(client, auth_headers, app, last_event_id=f"{2 ** 40}-1")
+    assert frames[0] == (second, "reset", {"id": second})
+
+    # A bare id from before cursors carried the xid.
+    _, _, frames = _stream(client, auth_headers, app, last_event_id="1")
+    assert frames[0] == (second, "reset", {"id": second})
+
+    assert feed.stats()["streams"] == 0
+
+
+@requires_db
+def test_stream_does_not_hold_a_database_connection(client, auth_headers, app, feed):
+    app.config.update(CHANGE_FEED_MAX_AGE=0.3, CHANGE_FEED_HEARTBEAT=0.1)
+    try:
+        res = client.get("/api/dashboard/changes", headers=auth_headers)
+        chunks = iter(res.response)
+        assert next(chunks).startswith(b"retry:")
+        assert get_pool(app).stats()["in_use"] == 0
+        res.close()
+    finally:
+        app.config.update(CHANGE_FEED_MAX_AGE=300.0, CHANGE_FEED_HEARTBEAT=15.0)
+
+
+@requires_db
+def test_stream_rejects_bad_last_event_id(client, auth_headers, feed):
+    res = client.get("/api/dashboard/changes", headers=dict(auth_headers, **{"Last-Event-ID": "abc"}))
+    assert res.status_code == 400
+
+
+@requires_db
+def test_stream_slots_are_limited(client, auth_headers, feed):
+    feed.max_streams = 0
+    res = client.get("/api/dashboard/changes", headers=auth_headers)
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "5"
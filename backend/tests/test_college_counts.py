@@ -0,0 +1,67 @@
+from app.models import COLLEGE_COUNTS_SQL, COLLEGE_COUNTS_TABLE_SQL
+from conftest import add_students, requires_db
+
+STUDENTS = [
+    ("2024-0001", "Santos", "Ana", "Female", "1", 1, 1),
+    ("2024-0002", "Reyes", "Ben", "Male", "2", 1, 1),
+    ("2024-0003", "Cruz", "Carla", "Female", "3", 2, 2),
+]
+
+
+def _table(db):
+    db.execute(COLLEGE_COUNTS_TABLE_SQL)
+    return db.fetchall()
+
+
+def _aggregated(db):
+    db.execute(COLLEGE_COUNTS_SQL)
+    return db.fetchall()
+
+
+@requires_db
+def test_counts_follow_student_writes(db, catalogue):
+    add_students(db, STUDENTS)
+    assert [row[3:] for row in _table(db)] == [(1, 2), (1, 1)]
+
+    db.execute("UPDATE students SET program_id = 2 WHERE id_number = '2024-0001'")
+    db.execute("UPDATE students SET first_name = 'Bea' WHERE id_number = '2024-0002'")
+    db.execute("DELETE FROM students WHERE id_number = '2024-0003'")
+    assert [row[3:] for row in _table(db)] == [(1, 1), (1, 1)]
+    assert _table(db) == _aggregated(db)
+
+
+@requires_db
+def test_counts_follow_program_and_college_writes(db, catalogue):
+    add_students(db, STUDENTS)
+    db.execute("INSERT INTO colleges (college_code, college_name) VALUES ('CAS', 'Arts')")
+    db.execute("UPDATE programs SET college_id = 3 WHERE id = 1")
+    assert _table(db) == _aggregated(db)
+    assert [row[3:] for row in _table(db)] == [(0, 0), (1, 1), (1, 2)]
+
+    # The ON DELETE SET NULL on students runs before the statement trigger.
+    db.execute("DELETE FROM programs WHERE id = 2")
+    assert [row[3:] for row in _table(db)] == [(0, 0), (0, 0), (1, 2)]
+
+    db.execute("DELETE FROM colleges WHERE id = 3")
+    assert _table(db) == _aggregated(db)
+    db.execute("SELECT COUNT(*) FROM college_counts")
+    assert db.fetchone() == (2,)
+
+
+@requires_db
+def test_refresh_matches_the_triggers(db, catalogue):
+    add_students(db, STUDENTS)
+    db.execute("UPDATE college_counts SET num_students = 99")
+    db.execute("SELECT refresh_college_counts()")
+    assert _table(db) == _aggregated(db)
+
+
+@requires_db
+def test_colleges_endpoint_reads_the_table_when_enabled(app, client, auth_headers, db, catalogue, monkeypatch):
+    add_students(db, STUDENTS)
+    monkeypatch.setitem(app.config, "COLLEGE_COUNTS_TABLE", True)
+    # Skew the table so the response shows where the figures came from.
+    db.execute("UPDATE college_counts SET num_students = num_students + 100 WHERE college_id = 1")
+    res = client.get("/api/dashboard/colleges", headers=auth_headers)
+    assert res.status_code == 200
+    assert [c["num_students"] for c in res.get_json()["colleges"]] == [102, 1]
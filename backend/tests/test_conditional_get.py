@@ -0,0 +1,62 @@
+from app.database import table_versions
+from conftest import add_students, requires_db
+
+COLLEGES = "/api/dashboard/colleges"
+
+
+@requires_db
+def test_matching_etag_gets_304(client, auth_headers, catalogue):
+    first = client.get(COLLEGES, headers=auth_headers)
+    assert first.status_code == 200 and first.headers["ETag"]
+
+    again = client.get(COLLEGES, headers=dict(auth_headers, **{"If-None-Match": first.headers["ETag"]}))
+    assert again.status_code == 304
+    assert again.headers["ETag"] == first.headers["ETag"]
+    assert again.get_data() == b""
+
+
+@requires_db
+def test_etag_depends_on_query_string(client, auth_headers, db, catalogue):
+    add_students(db, [("2024-0001", "Santos", "Ana", "Female", "1", 1, 1)])
+    a = client.get("/api/dashboard/students?limit=1", headers=auth_headers)
+    b = client.get("/api/dashboard/students?limit=2", headers=auth_headers)
+    assert a.headers["ETag"] != b.headers["ETag"]
+
+
+@requires_db
+def test_write_elsewhere_changes_etag_and_body(client, auth_headers, db, catalogue):
+    first = client.get(COLLEGES, headers=auth_headers)
+
+    # A write that never went through this process's cache.
+    db.execute("UPDATE colleges SET college_name = 'Computer Studies' WHERE id = 1")
+
+    res = client.get(COLLEGES, headers=dict(auth_headers, **{"If-None-Match": first.headers["ETag"]}))
+    assert res.status_code == 200
+    assert res.headers["ETag"] != first.headers["ETag"]
+    assert "Computer Studies" in [c["college_name"] for c in res.get_json()["colleges"]]
+
+    # The fresh ETag validates the fresh body, served from the cache.
+    again = client.get(COLLEGES, headers=dict(auth_headers, **{"If-None-Match": res.headers["ETag"]}))
+    assert again.status_code == 304
+    assert client.get(COLLEGES, headers=auth_headers).get_data() == res.get_data()
+
+
+@requires_db
+def test_facets_etag_follows_student_writes(client, auth_headers, db, catalogue):
+    first = client.get("/api/dashboard/students/facets", headers=auth_headers)
+    add_students(db, [("2024-0001", "Santos", "Ana", "Female", "1", 1, 1)])
+    res = client.get("/api/dashboard/students/facets",
+                     headers=dict(auth_headers, **{"If-None-Match": first.headers["ETag"]}))
+    assert res.status_code == 200
+    assert res.headers["ETag"] != first.headers["ETag"]
+
+
+@requires_db
+def test_table_versions_are_read_once_per_request(app, db, catalogue):
+    with app.test_request_context():
+        before = table_versions(("colleges", "programs"))
+        db.execute("INSERT INTO colleges (college_code, college_name) VALUES ('CAS', 'Arts')")
+        assert table_versions(("colleges", "programs")) == before
+        assert table_versions(("programs",)) == before[1:]
+    with app.test_request_context():
+        assert table_versions(("colleges",))[0] > before[0]
@@ -0,0 +1,82 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app import identity, models
+from app.identity import IdentityCache
+from conftest import requires_db
+
+
+class Loader:
+    def __init__(self, username="ana"):
+        self.username = username
+        self.calls = 0
+
+    def __call__(self, user_id):
+        self.calls += 1
+        return SimpleNamespace(id=user_id, username=self.username, email=f"{self.username}@example.com",
+                               password="$2b$12$secret")
+
+
+def test_repeated_lookups_hit_the_cache_without_the_password():
+    cache, loader = IdentityCache(), Loader()
+    first = cache.get(7, loader)
+    assert cache.get(7, loader) == first == {"id": 7, "username": "ana", "email": "ana@example.com"}
+    assert loader.calls == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_invalidate_forces_a_reload():
+    cache, loader = IdentityCache(), Loader()
+    cache.get(7, loader)
+    loader.username = "ana2"
+    cache.invalidate(7)
+    assert cache.get(7, loader)["username"] == "ana2"
+    assert loader.calls == 2
+
+
+def test_missing_users_are_not_cached():
+    cache = IdentityCache()
+    calls = []
+    assert cache.get(7, lambda user_id: calls.append(user_id)) is None
+    assert cache.get(7, lambda user_id: calls.append(user_id)) is None
+    assert calls == [7, 7]
+
+
+def test_entries_expire_after_the_ttl():
+    cache, loader = IdentityCache(ttl=0.01), Loader()
+    cache.get(7, loader)
+    time.sleep(0.05)
+    cache.get(7, loader)
+    assert loader.calls == 2
+
+
+@pytest.fixture
+def user(app, db):
+    db.execute("""
+        INSERT INTO users (username, user_password, email) VALUES ('identity-test', 'x', 'identity-test@example.com')
+        RETURNING id
+    """)
+    user_id = db.fetchone()[0]
+    yield user_id
+    db.execute("DELETE FROM users WHERE id = %s", (user_id,))
+
+
+@requires_db
+def test_me_reflects_profile_updates(app, client, db, user):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user))}"}
+    assert client.get("/api/auth/me", headers=headers).get_json()["username"] == "identity-test"
+
+    # A write that bypasses the model is not seen until the entry is invalidated.
+    db.execute("UPDATE users SET username = 'identity-raw' WHERE id = %s", (user,))
+    assert client.get("/api/auth/me", headers=headers).get_json()["username"] == "identity-test"
+
+    with app.app_context():
+        assert models.Users.update(user, "identity-new", "identity-test@example.com")
+    assert client.get("/api/auth/me", headers=headers).get_json()["username"] == "identity-new"
+    assert identity.stats()["invalidations"] >= 1
@@ -0,0 +1,49 @@
+from flask import g
+
+from app import models
+from app.database import get_db
+from app.instrumentation import InstrumentedCursor, RequestStats
+from conftest import add_students, requires_db
+
+STUDENTS = [
+    (f"2024-{n:04d}", "Santos", "Ana", "Female", "1", 1, 1) for n in range(1, 8)
+]
+
+
+@requires_db
+def test_json_responses_carry_server_timing(client, auth_headers, db, catalogue):
+    add_students(db, STUDENTS)
+    res = client.get("/api/dashboard/students?limit=5", headers=auth_headers)
+    assert res.status_code == 200
+    timings = res.headers.getlist("Server-Timing")
+    assert [t.split(";")[0] for t in timings] == ["db", "db-slowest", "app"]
+    assert 'queries, ' in timings[0]
+
+
+@requires_db
+def test_named_cursor_iteration_counts_rows(app, db, catalogue):
+    add_students(db, STUDENTS)
+    with app.test_request_context():
+        g.sql_stats = RequestStats()
+        rows = list(models.Student.iter_rows(itersize=3))
+        assert len(rows) == len(STUDENTS)
+        assert g.sql_stats.rows == len(STUDENTS)
+        get_db().rollback()
+
+
+@requires_db
+def test_streamed_responses_skip_server_timing_and_log_on_close(
+    client, auth_headers, db, catalogue, capsys, monkeypatch
+):
+    add_students(db, STUDENTS)
+    monkeypatch.setattr(InstrumentedCursor, "slow_threshold", 0.0)
+    res = client.get("/api/dashboard/students/export?itersize=3", headers=auth_headers)
+    assert res.status_code == 200
+    assert "Server-Timing" not in res.headers
+    assert "[slow-query]" not in capsys.readouterr().out
+
+    assert len(res.get_data(as_text=True).splitlines()) == len(STUDENTS)
+    res.close()
+    logged = [line for line in capsys.readouterr().out.splitlines() if line.startswith("[slow-query]")]
+    # The export query only runs once the body streams.
+    assert any("FROM students s" in line for line in logged)
@@ -0,0 +1,61 @@
+import datetime
+import decimal
+import json
+import math
+import uuid
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.json_provider import FastJSONProvider
+
+pytest.importorskip("orjson")
+
+PAYLOAD = {
+    "b": [1, 2.5, None, True, "text"],
+    "a": {"nested": {"z": 1, "y": 2}, "counts": {2: "int key", 1: "another"}},
+    "created": datetime.datetime(2024, 5, 17, 8, 30, 15, tzinfo=datetime.timezone.utc),
+    "naive": datetime.datetime(2024, 5, 17, 8, 30, 15),
+    "day": datetime.date(2024, 5, 17),
+    "amount": decimal.Decimal("12.50"),
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+}
+
+
+@pytest.fixture
+def flask_app():
+    return Flask(__name__)
+
+
+@pytest.fixture
+def providers(flask_app):
+    return FastJSONProvider(flask_app), DefaultJSONProvider(flask_app)
+
+
+def test_dumps_decodes_to_the_same_values_as_the_default_provider(providers):
+    fast, default = providers
+    assert json.loads(fast.dumps(PAYLOAD)) == json.loads(default.dumps(PAYLOAD))
+
+
+def test_datetimes_keep_the_http_date_format(providers):
+    fast, _ = providers
+    assert json.loads(fast.dumps(PAYLOAD))["created"] == "Fri, 17 May 2024 08:30:15 GMT"
+
+
+def test_non_ascii_and_nan_are_the_documented_differences(providers):
+    fast, default = providers
+    assert fast.loads(fast.dumps({"name": "Peña"})) == default.loads(default.dumps({"name": "Peña"}))
+    assert fast.dumps({"x": math.nan}) == '{"x":null}'
+
+
+def test_response_body_matches_the_default_provider(flask_app, providers):
+    fast, default = providers
+    with flask_app.app_context():
+        assert fast.response(PAYLOAD).get_data() == default.response(PAYLOAD).get_data()
+
+
+def test_unknown_types_still_raise(providers):
+    fast, _ = providers
+    with pytest.raises(TypeError):
+        fast.dumps({"x": object()})
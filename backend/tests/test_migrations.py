@@ -0,0 +1,92 @@
+import psycopg2
+import pytest
+
+import setup_db
+from conftest import TEST_DATABASE_URL, requires_db
+
+SCRATCH_DB = "ssis_migrations_test"
+
+
+def test_load_migrations_sorts_by_version_and_skips_other_files(tmp_path, monkeypatch):
+    for name in ("0010_tenth.sql", "0002_second.sql", "0001_first.sql", "README.md", "notes.sql"):
+        (tmp_path / name).write_text("SELECT 1;")
+    monkeypatch.setattr(setup_db, "MIGRATIONS_DIR", str(tmp_path))
+    assert [(v, n) for v, n, _ in setup_db.load_migrations()] == [
+        (1, "first"), (2, "second"), (10, "tenth"),
+    ]
+    assert setup_db.latest_version() == 10
+
+
+@pytest.fixture
+def scratch_db(monkeypatch):
+    """An empty database that ``setup_db`` is pointed at."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    admin = psycopg2.connect(TEST_DATABASE_URL)
+    admin.autocommit = True
+    with admin.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DB}")
+        cursor.execute(f"CREATE DATABASE {SCRATCH_DB}")
+    monkeypatch.setattr(setup_db, "DB_NAME", SCRATCH_DB)
+    yield
+    with admin.cursor() as cursor:
+        cursor.execute(f"DROP DATABASE IF EXISTS {SCRATCH_DB}")
+    admin.close()
+
+
+def _versions(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT version FROM schema_migrations ORDER BY version")
+        return [row[0] for row in cursor.fetchall()]
+
+
+@requires_db
+def test_migrate_applies_pending_versions_once(scratch_db):
+    every = [v for v, _, _ in setup_db.load_migrations()]
+    assert setup_db.migrate(target=4) == [v for v in every if v <= 4]
+    assert setup_db.migrate() == [v for v in every if v > 4]
+    assert setup_db.migrate() == []
+
+    conn = setup_db.connect()
+    try:
+        assert _versions(conn) == every
+    finally:
+        conn.close()
+
+
+@requires_db
+def test_failed_migration_rolls_back_and_is_not_recorded(scratch_db, tmp_path, monkeypatch):
+    (tmp_path / "0001_good.sql").write_text("CREATE TABLE good (id INTEGER);")
+    (tmp_path / "0002_bad.sql").write_text("CREATE TABLE half (id INTEGER); SELECT missing_column FROM good;")
+    monkeypatch.setattr(setup_db, "MIGRATIONS_DIR", str(tmp_path))
+    with pytest.raises(psycopg2.Error):
+        setup_db.migrate()
+
+    conn = setup_db.connect()
+    try:
+        assert _versions(conn) == [1]
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('half')")
+            assert cursor.fetchone() == (None,)
+    finally:
+        conn.close()
+
+
+@requires_db
+@pytest.mark.parametrize("sql, index", [
+    ("SELECT id FROM colleges WHERE LOWER(college_name) = LOWER('x')", "colleges_lower_name_key"),
+    ("SELECT id FROM programs WHERE LOWER(program_name) = LOWER('x')", "programs_lower_name_key"),
+    ("SELECT student_id FROM students WHERE program_id = 1", "students_program_student_idx"),
+    ("SELECT student_id FROM students WHERE college_id = 1", "students_college_id_idx"),
+    ("SELECT id FROM programs WHERE college_id = 1", "programs_college_id_idx"),
+    ("SELECT student_id FROM students ORDER BY last_name, student_id LIMIT 10", "students_last_name_idx"),
+])
+def test_hot_lookups_can_use_their_indexes(db, sql, index):
+    db.execute("BEGIN")
+    try:
+        db.execute("SET LOCAL enable_seqscan = off")
+        db.execute(f"EXPLAIN {sql}")
+        plan = "\n".join(row[0] for row in db.fetchall())
+    finally:
+        db.execute("ROLLBACK")
+    assert index in plan
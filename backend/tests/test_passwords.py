@@ -0,0 +1,23 @@
+import threading
+
+from app.passwords import PasswordHasher
+
+
+def test_counters_stay_exact_under_concurrent_use():
+    hasher = PasswordHasher(rounds=4, workers=4, max_queue=64)
+    hashed = hasher.hash("secret")
+
+    def verify():
+        for _ in range(10):
+            assert hasher.verify("secret", hashed)
+
+    threads = [threading.Thread(target=verify) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    # Done callbacks may still be running; let the workers drain.
+    hasher._get_executor().shutdown(wait=True)
+
+    stats = hasher.stats()
+    assert (stats["hashed"], stats["verified"], stats["in_flight"], stats["rejected"]) == (1, 80, 0, 0)
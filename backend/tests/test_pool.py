@@ -0,0 +1,144 @@
+import threading
+import time
+
+import pytest
+from psycopg2 import extensions
+
+from app.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    class info:
+        transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def __init__(self, healthy=True):
+        self.closed = False
+        self.healthy = healthy
+
+    def cursor(self):
+        if not self.healthy:
+            raise RuntimeError("server closed the connection")
+        return self
+
+    def execute(self, sql):
+        pass
+
+    def fetchone(self):
+        return (1,)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(connect, **kwargs):
+    pool = ConnectionPool("postgresql://unused", minconn=0, **kwargs)
+    pool._connect = connect
+    return pool
+
+
+def test_slow_connect_does_not_block_returns_or_idle_checkouts():
+    release = threading.Event()
+    calls = []
+
+    def connect():
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(5)
+        return FakeConnection()
+
+    pool = make_pool(connect, maxconn=3)
+    first = pool.getconn()
+
+    slow = threading.Thread(target=pool.getconn)
+    slow.start()
+    while len(calls) < 2:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    pool.putconn(first)
+    again = pool.getconn()
+    elapsed = time.monotonic() - started
+
+    release.set()
+    slow.join(5)
+    assert again is first
+    assert elapsed < 0.5
+    assert pool.stats()["size"] == 2
+
+
+def test_slow_rollback_does_not_block_idle_checkouts():
+    rolling_back = threading.Event()
+    release = threading.Event()
+
+    class OpenTransaction(FakeConnection):
+        class info:
+            transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+
+        def rollback(self):
+            rolling_back.set()
+            release.wait(5)
+            self.info = FakeConnection.info
+
+    conns = [OpenTransaction(), FakeConnection()]
+    pool = make_pool(lambda: conns.pop(0), maxconn=2)
+    busy, idle = pool.getconn(), pool.getconn()
+    pool.putconn(idle)
+
+    returning = threading.Thread(target=pool.putconn, args=(busy,))
+    returning.start()
+    assert rolling_back.wait(5)
+
+    started = time.monotonic()
+    again = pool.getconn()
+    elapsed = time.monotonic() - started
+
+    release.set()
+    returning.join(5)
+    assert again is idle
+    assert elapsed < 0.5
+    stats = pool.stats()
+    assert (stats["in_use"], stats["idle"]) == (1, 1)
+
+
+def test_failed_connect_gives_the_slot_back():
+    def connect():
+        raise RuntimeError("connection refused")
+
+    pool = make_pool(connect, maxconn=1)
+    with pytest.raises(RuntimeError):
+        pool.getconn()
+    stats = pool.stats()
+    assert stats["size"] == 0
+    assert stats["created"] == 0
+
+
+def test_unhealthy_idle_connection_is_replaced():
+    fresh = []
+
+    def connect():
+        conn = FakeConnection()
+        fresh.append(conn)
+        return conn
+
+    pool = make_pool(connect, maxconn=2, check_after=0)
+    stale = FakeConnection(healthy=False)
+    pool._idle.append((stale, time.monotonic()))
+    pool._size = 1
+
+    conn = pool.getconn()
+    assert conn is fresh[0]
+    assert stale.closed
+    stats = pool.stats()
+    assert stats["health_check_failures"] == 1
+    assert stats["size"] == 1
+
+
+def test_checkout_times_out_when_exhausted():
+    pool = make_pool(FakeConnection, maxconn=1, timeout=0.05)
+    pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    assert pool.stats()["timeouts"] == 1
@@ -0,0 +1,74 @@
+import psycopg2
+import pytest
+
+from app.queries import Query, QueryRegistry, to_positional
+from conftest import TEST_DATABASE_URL, requires_db
+
+
+def test_placeholders_become_positional():
+    assert to_positional("a = %s AND b LIKE 'x%%' AND c = ANY(%s)") == "a = $1 AND b LIKE 'x%' AND c = ANY($2)"
+
+
+def test_query_builds_prepare_and_execute_statements():
+    query = Query("student.by.id", "SELECT * FROM students WHERE student_id = %s AND gender = %s")
+    assert query.statement == "q_student_by_id"
+    assert query.prepare_sql == \
+        "PREPARE q_student_by_id AS SELECT * FROM students WHERE student_id = $1 AND gender = $2"
+    assert query.execute_sql == "EXECUTE q_student_by_id (%s, %s)"
+    assert Query("all", "SELECT 1").execute_sql == "EXECUTE q_all"
+
+
+def test_names_cannot_be_reused_for_different_sql():
+    registry = QueryRegistry()
+    registry.register("q", "SELECT 1")
+    registry.register("q", "SELECT 1")
+    with pytest.raises(ValueError):
+        registry.register("q", "SELECT 2")
+
+
+@pytest.fixture
+def conn(db):
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    yield conn
+    conn.close()
+
+
+def _prepared(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT name, statement FROM pg_prepared_statements ORDER BY name")
+        return cursor.fetchall()
+
+
+@requires_db
+def test_each_connection_prepares_once(conn):
+    registry = QueryRegistry()
+    registry.register("sum", "SELECT %s::int + %s::int")
+    cursor = conn.cursor()
+    assert registry.execute(cursor, "sum", (1, 2)).fetchone() == (3,)
+    assert registry.execute(cursor, "sum", (3, 4)).fetchone() == (7,)
+    assert _prepared(conn) == [("q_sum", "PREPARE q_sum AS SELECT $1::int + $2::int")]
+
+    # The statement is session state, so it survives a rollback.
+    conn.rollback()
+    assert registry.execute(cursor, "sum", (5, 6)).fetchone() == (11,)
+
+    other = psycopg2.connect(TEST_DATABASE_URL)
+    try:
+        assert registry.execute(other.cursor(), "sum", (1, 1)).fetchone() == (2,)
+        assert [name for name, _ in _prepared(other)] == ["q_sum"]
+    finally:
+        other.close()
+    assert registry.stats()["connections"] == 2
+    del other
+    assert registry.stats()["connections"] == 1
+
+    stats = registry.stats()
+    assert stats["queries"]["sum"]["calls"] == 4
+
+
+@requires_db
+def test_prepare_off_runs_the_plain_sql(conn):
+    registry = QueryRegistry(prepare=False)
+    registry.register("sum", "SELECT %s::int + %s::int")
+    assert registry.execute(conn.cursor(), "sum", (1, 2)).fetchone() == (3,)
+    assert _prepared(conn) == []
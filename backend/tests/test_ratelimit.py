@@ -0,0 +1,71 @@
+import os
+import threading
+import uuid
+
+import pytest
+from flask import Flask
+
+from app import ratelimit
+from conftest import aio_requests, requires_db
+
+TEST_REDIS_URL = os.getenv("TEST_REDIS_URL")
+
+
+def test_limit_then_retry_after():
+    limiter = ratelimit.RateLimiter(limit=3, window=60)
+    assert [limiter.hit("ip:1")[0] for _ in range(4)] == [True, True, True, False]
+    allowed, retry_after = limiter.hit("ip:1")
+    assert not allowed and 1 <= retry_after <= 61
+    assert limiter.hit("ip:2") == (True, 0)
+
+
+def test_reset_clears_a_key():
+    limiter = ratelimit.RateLimiter(limit=1, window=60)
+    limiter.hit("user:ana")
+    assert not limiter.hit("user:ana")[0]
+    limiter.reset("user:ana")
+    assert limiter.hit("user:ana")[0]
+
+
+def test_redis_backend_without_url_counts_per_worker():
+    app = Flask(__name__)
+    app.config.update(LOGIN_RATE_LIMIT_BACKEND="redis", REDIS_URL=None)
+    ratelimit.init_app(app)
+    assert type(ratelimit.login_by_user) is ratelimit.RateLimiter
+    assert type(ratelimit.login_by_ip) is ratelimit.RateLimiter
+
+
+@pytest.mark.skipif(not TEST_REDIS_URL, reason="TEST_REDIS_URL is not set")
+def test_redis_counters_are_shared():
+    prefix = f"test:{uuid.uuid4()}:"
+    one = ratelimit.RedisRateLimiter(2, 60, TEST_REDIS_URL, prefix)
+    two = ratelimit.RedisRateLimiter(2, 60, TEST_REDIS_URL, prefix)
+    assert one.hit("ip:1")[0] and two.hit("ip:1")[0]
+    assert not one.hit("ip:1")[0] and not two.hit("ip:1")[0]
+    one.reset("ip:1")
+    assert two.hit("ip:1")[0]
+
+
+class RecordingLimiter(ratelimit.RateLimiter):
+    def __init__(self):
+        super().__init__(limit=10, window=60)
+        self.threads = []
+
+    def hit(self, key):
+        self.threads.append(threading.current_thread())
+        return super().hit(key)
+
+
+@requires_db
+def test_aio_login_checks_limits_off_the_event_loop(aio_app, db, monkeypatch):
+    by_ip, by_user = RecordingLimiter(), RecordingLimiter()
+    monkeypatch.setattr(ratelimit, "login_by_ip", by_ip)
+    monkeypatch.setattr(ratelimit, "login_by_user", by_user)
+
+    [(status, _)] = aio_requests(aio_app, [
+        ("POST", "/api/auth/login", {"json": {"username": "nobody", "password": "x"}}),
+    ])
+    assert status == 401
+    assert len(by_ip.threads) == len(by_user.threads) == 1
+    # asyncio.run drives the loop on this thread; the hits must not run here.
+    assert threading.current_thread() not in by_ip.threads + by_user.threads
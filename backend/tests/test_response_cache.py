@@ -0,0 +1,44 @@
+from app import cache
+from conftest import requires_db
+
+
+def _codes(res):
+    return [c["college_code"] for c in res.get_json()["colleges"]]
+
+
+@requires_db
+def test_cached_list_is_reused_until_a_write(client, auth_headers, catalogue):
+    first = client.get("/api/dashboard/colleges", headers=auth_headers)
+    second = client.get("/api/dashboard/colleges", headers=auth_headers)
+    assert first.get_data() == second.get_data()
+    assert cache.stats()["endpoints"]["colleges.list"] == {"hits": 1, "misses": 1}
+
+    res = client.post("/api/dashboard/colleges", json={"college_code": "CAS", "college_name": "Arts"},
+                      headers=auth_headers)
+    assert res.status_code == 201
+    assert "CAS" in _codes(client.get("/api/dashboard/colleges", headers=auth_headers))
+
+
+@requires_db
+def test_writes_from_other_connections_invalidate(client, auth_headers, db, catalogue):
+    assert _codes(client.get("/api/dashboard/colleges", headers=auth_headers)) == ["CCS", "COE"]
+
+    # Written outside this process, as the CLI importer or another worker would.
+    db.execute("INSERT INTO colleges (college_code, college_name) VALUES ('CAS', 'Arts')")
+
+    assert "CAS" in _codes(client.get("/api/dashboard/colleges", headers=auth_headers))
+
+
+@requires_db
+def test_stats_follow_reconciliation_elsewhere(client, auth_headers, db, catalogue):
+    db.execute("INSERT INTO enrolment_stats VALUES (1, 1, '1', 'Female', 1)")
+    assert client.get("/api/dashboard/stats", headers=auth_headers).get_json()["total"] == 1
+    summary = client.get("/api/dashboard/stats/summary", headers=auth_headers).get_json()
+
+    # What 'flask stats reconcile' does in its own process.
+    db.execute("UPDATE enrolment_stats SET count = 5")
+    db.execute("UPDATE enrolment_stats_reconciled SET reconciled_at = NOW() + INTERVAL '1 minute'")
+
+    assert client.get("/api/dashboard/stats", headers=auth_headers).get_json()["total"] == 5
+    later = client.get("/api/dashboard/stats/summary", headers=auth_headers).get_json()
+    assert later["reconciled_at"] != summary["reconciled_at"]
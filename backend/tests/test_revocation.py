@@ -0,0 +1,82 @@
+import threading
+import time
+
+import psycopg2
+
+from app import revocation
+from conftest import requires_db
+
+
+def test_local_backend_round_trip():
+    store = revocation.RevocationStore(backend=revocation.LocalBackend(), sync_interval=0)
+    store.revoke("a", time.time() + 60)
+    store.backend.add("b", time.time() + 60)
+    store.backend.add("c", time.time() - 1)
+    assert store.is_revoked("a") and store.is_revoked("b")
+    assert not store.is_revoked("c") and not store.is_revoked("d")
+
+
+@requires_db
+def test_concurrent_revocations_become_visible_in_id_order(app, db):
+    first = psycopg2.connect(app.config["DATABASE_URL"])
+    second = psycopg2.connect(app.config["DATABASE_URL"])
+    try:
+        first.cursor().execute(
+            "INSERT INTO revoked_tokens (jti, expires_at) VALUES ('first', NOW() + INTERVAL '1 hour')"
+        )
+        done = threading.Event()
+
+        def revoke_second():
+            second.cursor().execute(
+                "INSERT INTO revoked_tokens (jti, expires_at) VALUES ('second', NOW() + INTERVAL '1 hour')"
+            )
+            second.commit()
+            done.set()
+
+        worker = threading.Thread(target=revoke_second)
+        worker.start()
+        # The second writer waits for the first to commit instead of
+        # committing a higher id ahead of it.
+        assert not done.wait(0.3)
+        db.execute("SELECT jti FROM revoked_tokens")
+        assert db.fetchall() == []
+
+        first.commit()
+        worker.join(5)
+        assert done.is_set()
+        db.execute("SELECT jti FROM revoked_tokens ORDER BY id")
+        assert db.fetchall() == [("first",), ("second",)]
+    finally:
+        first.close()
+        second.close()
+
+
+@requires_db
+def test_postgres_sync_picks_up_other_workers(app, db):
+    store = revocation.RevocationStore(backend=revocation.PostgresBackend(), sync_interval=0)
+    with app.test_request_context():
+        assert not store.is_revoked("elsewhere")
+        db.execute("INSERT INTO revoked_tokens (jti, expires_at) VALUES ('elsewhere', NOW() + INTERVAL '1 hour')")
+        assert store.is_revoked("elsewhere")
+
+
+@requires_db
+def test_failed_sync_rolls_back_the_request_connection(app, db):
+    from app.database import get_db
+
+    store = revocation.RevocationStore(backend=revocation.PostgresBackend(), sync_interval=0)
+    locker = psycopg2.connect(app.config["DATABASE_URL"])
+    try:
+        locker.cursor().execute("LOCK TABLE revoked_tokens IN ACCESS EXCLUSIVE MODE")
+        with app.test_request_context():
+            conn = get_db()
+            conn.cursor().execute("SET LOCAL lock_timeout = '50ms'")
+            store.sync()
+            assert store.stats()["sync_errors"] == 1
+            assert conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            assert cursor.fetchone() == (1,)
+            conn.rollback()
+    finally:
+        locker.close()
@@ -0,0 +1,49 @@
+import pytest
+
+import setup_db
+from app import database
+from app.database import SchemaVersionError, prepare_schema, schema_version, verify_schema
+from conftest import requires_db
+
+
+@pytest.fixture
+def migrations(monkeypatch):
+    """Records calls to ``setup_db.migrate`` instead of running it."""
+    calls = []
+    monkeypatch.setattr(setup_db, "migrate", lambda: calls.append("migrate") or [])
+    return calls
+
+
+@requires_db
+def test_verify_passes_on_an_up_to_date_schema(app):
+    assert verify_schema(app) == setup_db.latest_version() == schema_version(app)
+
+
+@requires_db
+def test_verify_fails_fast_when_the_schema_is_behind(app, monkeypatch):
+    monkeypatch.setattr(setup_db, "latest_version", lambda: schema_version(app) + 1)
+    with pytest.raises(SchemaVersionError, match="flask db-upgrade"):
+        verify_schema(app)
+
+
+@requires_db
+@pytest.mark.parametrize("mode, expected", [("verify", []), ("off", []), ("migrate", ["migrate"])])
+def test_startup_only_migrates_when_asked(app, monkeypatch, migrations, mode, expected):
+    monkeypatch.setitem(app.config, "SCHEMA_STARTUP", mode)
+    prepare_schema(app)
+    assert migrations == expected
+
+
+@requires_db
+def test_off_skips_the_version_check(app, monkeypatch, migrations):
+    monkeypatch.setitem(app.config, "SCHEMA_STARTUP", "off")
+    monkeypatch.setattr(database, "verify_schema", pytest.fail)
+    prepare_schema(app)
+
+
+@requires_db
+def test_db_upgrade_command_runs_the_migrations(app, migrations):
+    result = app.test_cli_runner().invoke(args=["db-upgrade"])
+    assert result.exit_code == 0, result.output
+    assert migrations == ["migrate"]
+    assert "Applied 0 migration(s)" in result.output
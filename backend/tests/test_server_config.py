@@ -0,0 +1,46 @@
+import os
+import runpy
+
+import pytest
+
+from app import config
+from conftest import requires_db
+
+CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gunicorn.conf.py")
+
+
+def _settings():
+    return {k: v for k, v in runpy.run_path(CONF_PATH).items() if not k.startswith("__")}
+
+
+def test_worker_settings_come_from_config(monkeypatch):
+    monkeypatch.setattr(config, "WEB_WORKERS", 3)
+    monkeypatch.setattr(config, "WEB_THREADS", 8)
+    monkeypatch.setattr(config, "WEB_BIND", "127.0.0.1:9000")
+    monkeypatch.setattr(config, "WEB_MAX_REQUESTS", 500)
+    settings = _settings()
+    assert settings["worker_class"] == "gthread"
+    assert (settings["workers"], settings["threads"], settings["bind"]) == (3, 8, "127.0.0.1:9000")
+    assert settings["max_requests"] == 500
+    assert settings["preload_app"] is True
+
+
+def test_gunicorn_accepts_every_setting():
+    gunicorn_config = pytest.importorskip("gunicorn.config")
+    cfg = gunicorn_config.Config()
+    for name, value in _settings().items():
+        if name == "config":  # the imported app.config module
+            continue
+        cfg.set(name, value)
+    assert cfg.worker_class_str == "gthread"
+    assert cfg.workers == config.WEB_WORKERS
+
+
+@requires_db
+def test_wsgi_entry_point_hands_workers_no_pool(app):
+    import wsgi
+
+    assert "db_pool" not in wsgi.app.extensions
+    wsgi.app.extensions["db_pool"] = object()
+    _settings()["post_fork"](None, None)
+    assert "db_pool" not in wsgi.app.extensions
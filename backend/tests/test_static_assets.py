@@ -0,0 +1,98 @@
+import gzip
+
+import pytest
+from flask import Flask
+
+from app import static_assets
+
+BUNDLE = b"console.log('students');\n" * 200
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / "_next" / "static" / "chunks").mkdir(parents=True)
+    (tmp_path / "index.html").write_text("<html>home</html>")
+    (tmp_path / "students.html").write_text("<html>students</html>")
+    (tmp_path / "favicon.ico").write_bytes(b"\x00" * 10)
+    (tmp_path / "_next" / "static" / "chunks" / "main.js").write_bytes(BUNDLE)
+    return tmp_path
+
+
+def _client(root):
+    app = Flask(__name__)
+    static_assets.init_app(app, str(root))
+    return app, app.test_client()
+
+
+def test_cache_control_follows_the_asset_kind(root):
+    _, client = _client(root)
+    assert client.get("/_next/static/chunks/main.js").headers["Cache-Control"] == \
+        "public, max-age=31536000, immutable"
+    assert client.get("/").headers["Cache-Control"] == "no-cache"
+    assert client.get("/favicon.ico").headers["Cache-Control"] == "public, max-age=3600"
+
+
+def test_clean_urls_and_the_index_fallback(root):
+    _, client = _client(root)
+    assert client.get("/students").get_data() == b"<html>students</html>"
+    assert client.get("/students/").get_data() == b"<html>students</html>"
+    assert client.get("/no/such/page").get_data() == b"<html>home</html>"
+    assert client.get("/../setup_db.py").get_data() == b"<html>home</html>"
+
+    res = client.get("/api/nothing")
+    assert res.status_code == 404
+    assert res.get_json() == {"error": "API route not found"}
+
+
+def test_matching_etag_gets_304(root):
+    _, client = _client(root)
+    etag = client.get("/students").headers["ETag"]
+    res = client.get("/students", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.headers["ETag"] == etag
+    assert res.get_data() == b""
+
+
+def test_precompressed_variants_are_negotiated(root):
+    written = static_assets.precompress(str(root))
+    assert (root / "_next" / "static" / "chunks" / "main.js.gz").exists()
+    # Small files are left alone.
+    assert not (root / "index.html.gz").exists()
+    assert written == (2 if static_assets.brotli else 1)
+
+    _, client = _client(root)
+    plain = client.get("/_next/static/chunks/main.js")
+    assert plain.get_data() == BUNDLE
+    assert "Content-Encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    res = client.get("/_next/static/chunks/main.js", headers={"Accept-Encoding": "gzip"})
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(res.get_data()) == BUNDLE
+    assert res.headers["ETag"] != plain.headers["ETag"]
+
+
+def test_brotli_is_preferred_when_available(root):
+    brotli = pytest.importorskip("brotli")
+    static_assets.precompress(str(root))
+    _, client = _client(root)
+    res = client.get("/_next/static/chunks/main.js", headers={"Accept-Encoding": "gzip, br"})
+    assert res.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(res.get_data()) == BUNDLE
+
+
+def test_missing_build_is_a_404(tmp_path):
+    _, client = _client(tmp_path / "missing")
+    res = client.get("/")
+    assert res.status_code == 404
+    assert res.get_json() == {"error": "Frontend has not been built"}
+
+
+def test_static_compress_command(root):
+    app, _ = _client(root)
+    # The flask CLI pushes an app context for every command.
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=["static-compress"])
+    assert result.exit_code == 0, result.output
+    assert "compressed file(s)" in result.output
+    assert (root / "_next" / "static" / "chunks" / "main.js.gz").exists()
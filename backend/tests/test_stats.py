@@ -0,0 +1,148 @@
+import psycopg2
+
+from app.models import ENROLMENT_ACTUAL_SQL, RECONCILE_LOCK_ID, EnrolmentStats
+from conftest import add_students, requires_db
+
+STUDENTS = [
+    ("2024-0001", "Santos", "Ana", "Female", "1", 1, 1),
+    ("2024-0002", "Reyes", "Ben", "Male", "2", 1, 1),
+    ("2024-0003", "Cruz", "Carla", "Female", "3", 2, 2),
+]
+
+
+def _cells(db):
+    db.execute("SELECT college_id, program_id, year_level, gender, count FROM enrolment_stats WHERE count <> 0 ORDER BY 1, 2, 3, 4")
+    return db.fetchall()
+
+
+def _actual(db):
+    db.execute(f"SELECT * FROM ({ENROLMENT_ACTUAL_SQL}) a ORDER BY 1, 2, 3, 4")
+    return db.fetchall()
+
+
+@requires_db
+def test_reconcile_corrects_drift(app, db, catalogue):
+    # Raw inserts bypass the model write paths, so the cells start out empty.
+    add_students(db, STUDENTS)
+    db.execute("INSERT INTO enrolment_stats VALUES (2, 2, '4', 'Male', 7)")
+    with app.app_context():
+        assert EnrolmentStats.reconcile() == 4
+        assert EnrolmentStats.reconcile() == 0
+    assert _cells(db) == _actual(db)
+    db.execute("SELECT corrected_cells FROM enrolment_stats_reconciled")
+    assert db.fetchone() == (0,)
+
+
+@requires_db
+def test_reconcile_skips_when_another_worker_holds_the_lock(app, db, catalogue):
+    other = psycopg2.connect(app.config["DATABASE_URL"])
+    try:
+        other.cursor().execute("SELECT pg_advisory_xact_lock(%s)", (RECONCILE_LOCK_ID,))
+        with app.app_context():
+            assert EnrolmentStats.reconcile(wait=False) is None
+    finally:
+        other.close()
+
+
+@requires_db
+def test_write_paths_keep_cells_current(client, auth_headers, db, catalogue):
+    for id_number, last, first, gender, year, college, program in STUDENTS:
+        res = client.post("/api/dashboard/students", headers=auth_headers, json={
+            "id_number": id_number, "last_name": last, "first_name": first, "gender": gender,
+            "year_level": year, "college_id": college, "program_id": program,
+        })
+        assert res.status_code == 201
+    client.put("/api/dashboard/students/2024-0002", headers=auth_headers, json={
+        "last_name": "Reyes", "first_name": "Ben", "gender": "Male",
+        "year_level": "3", "college_id": 2, "program_id": 2,
+    })
+    client.delete("/api/dashboard/students/2024-0001", headers=auth_headers)
+    client.delete("/api/dashboard/programs/2", headers=auth_headers)
+
+    assert _cells(db) == _actual(db)
+    # Deleting the program detaches its students but keeps their college.
+    assert _cells(db) == [(2, 0, "3", "Female", 1), (2, 0, "3", "Male", 1)]
+    with client.application.app_context():
+        assert EnrolmentStats.reconcile() == 0
+
+
+@requires_db
+def test_stats_endpoints_match_students(client, auth_headers, db, catalogue):
+    add_students(db, STUDENTS)
+    with client.application.app_context():
+        EnrolmentStats.reconcile()
+
+    report = client.get("/api/dashboard/stats", headers=auth_headers).get_json()
+    assert report["total"] == 3
+    assert {c["college_code"]: c["count"] for c in report["by_college"]} == {"CCS": 2, "COE": 1}
+    assert report["by_gender"] == [{"gender": "Female", "count": 2}, {"gender": "Male", "count": 1}]
+
+    summary = client.get("/api/dashboard/stats/summary", headers=auth_headers).get_json()
+    assert (summary["students"], summary["colleges"], summary["programs"]) == (3, 2, 2)
+    assert summary["reconciled_at"]
+
+
+@requires_db
+def test_reconcile_command(app, db, catalogue):
+    add_students(db, STUDENTS)
+    result = app.test_cli_runner().invoke(args=["stats", "reconcile"])
+    assert result.exit_code == 0, result.output
+    assert "3 cell(s) corrected" in result.output
+    assert _cells(db) == _actual(db)
+
+
+def _reconciled_at(db):
+    db.execute("SELECT reconciled_at FROM enrolment_stats_reconciled")
+    return db.fetchone()[0]
+
+
+@requires_db
+def test_batches_apply_deltas_without_reconciling(client, auth_headers, db, catalogue):
+    add_students(db, STUDENTS[:1])
+    with client.application.app_context():
+        EnrolmentStats.reconcile()
+    reconciled_at = _reconciled_at(db)
+
+    res = client.post("/api/dashboard/students/batch", headers=auth_headers, json={"operations": [
+        {"op": "create", "data": {"id_number": "2024-0002", "last_name": "Reyes", "first_name": "Ben",
+                                  "gender": "Male", "year_level": "2", "college_id": 1, "program_id": 1}},
+        {"op": "create", "data": {"id_number": "2024-0003", "last_name": "Cruz", "first_name": "Carla",
+                                  "gender": "Female", "year_level": "3", "college_id": 2, "program_id": 2}},
+        {"op": "update", "id_number": "2024-0002", "data": {"year_level": "4", "college_id": 2}},
+        {"op": "delete", "id_number": "2024-0001"},
+    ]})
+    assert res.status_code == 200, res.get_json()
+    assert _cells(db) == _actual(db)
+
+    # Best-effort: the failing item is rolled back and contributes no delta.
+    res = client.post("/api/dashboard/students/batch", headers=auth_headers, json={"mode": "best_effort", "operations": [
+        {"op": "update", "id_number": "2024-0003", "data": {"gender": "Others"}},
+        {"op": "update", "id_number": "2024-0002", "data": {"program_id": 99}},
+    ]})
+    assert [r["status"] for r in res.get_json()["results"]] == ["ok", "error"]
+    assert _cells(db) == _actual(db)
+
+    res = client.post("/api/dashboard/programs/batch", headers=auth_headers, json={"operations": [
+        {"op": "delete", "id": 2},
+    ]})
+    assert res.status_code == 200, res.get_json()
+    assert _cells(db) == _actual(db)
+    assert _reconciled_at(db) == reconciled_at
+
+
+@requires_db
+def test_import_applies_deltas_without_reconciling(client, auth_headers, db, catalogue):
+    add_students(db, STUDENTS)
+    with client.application.app_context():
+        EnrolmentStats.reconcile()
+    reconciled_at = _reconciled_at(db)
+
+    body = "id_number,last_name,first_name,gender,year_level,college_id,program_id\n" + "\n".join([
+        "2024-0001,Santos,Ana,Female,2,2,2",
+        "2024-0004,Lim,Dan,Male,1,1,1",
+    ]) + "\n"
+    res = client.post("/api/dashboard/students/import", data=body.encode(),
+                      headers=dict(auth_headers, **{"Content-Type": "text/csv"}))
+    assert res.status_code == 200, res.get_json()
+    assert _cells(db) == _actual(db)
+    assert _reconciled_at(db) == reconciled_at
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from app.database import get_pool
+from conftest import add_students, requires_db
+
+EXPORT_URL = "/api/dashboard/students/export"
+
+STUDENTS = [
+    (f"2024-{n:04d}", "Santos", f"Ana{'a' * n}", ("Female", "Male")[n % 2], "1", 1, 1)
+    for n in range(1, 8)
+]
+
+
+@requires_db
+def test_ndjson_export_streams_every_student_in_order(client, auth_headers, db, catalogue):
+    add_students(db, STUDENTS)
+    res = client.get(EXPORT_URL, query_string={"itersize": 3}, headers=auth_headers)
+    assert res.status_code == 200
+    assert res.is_streamed
+    assert res.mimetype == "application/x-ndjson"
+    assert res.headers["Content-Disposition"] == "attachment; filename=students.ndjson"
+
+    rows = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert [r["id_number"] for r in rows] == [s[0] for s in STUDENTS]
+    assert rows[0]["program_code"] == "BSCS"
+    assert set(rows[0]) == {
+        "student_id", "id_number", "last_name", "first_name", "gender", "year_level",
+        "college_id", "program_id", "program_code", "program_name", "photo_url",
+    }
+
+
+@requires_db
+def test_json_export_is_one_array(client, auth_headers, db, catalogue):
+    add_students(db, STUDENTS)
+    res = client.get(EXPORT_URL, query_string={"format": "json", "itersize": 2}, headers=auth_headers)
+    assert res.status_code == 200
+    body = json.loads(res.get_data(as_text=True))
+    assert [r["id_number"] for r in body] == [s[0] for s in STUDENTS]
+
+
+@requires_db
+def test_empty_roster_exports_an_empty_array(client, auth_headers, db, catalogue):
+    res = client.get(EXPORT_URL, query_string={"format": "json"}, headers=auth_headers)
+    assert json.loads(res.get_data(as_text=True)) == []
+
+
+@requires_db
+@pytest.mark.parametrize("query, error", [
+    ({"format": "csv"}, "'format' must be 'ndjson' or 'json'"),
+    ({"itersize": "many"}, "'itersize' must be an integer"),
+])
+def test_bad_parameters_are_rejected(client, auth_headers, db, query, error):
+    res = client.get(EXPORT_URL, query_string=query, headers=auth_headers)
+    assert res.status_code == 400
+    assert res.get_json() == {"error": error}
+
+
+@requires_db
+def test_export_returns_its_connection_when_done(app, client, auth_headers, db, catalogue):
+    add_students(db, STUDENTS)
+    res = client.get(EXPORT_URL, headers=auth_headers)
+    res.get_data()
+    res.close()
+    assert get_pool(app).stats()["in_use"] == 0
@@ -0,0 +1,54 @@
+from app import queries
+from conftest import add_students, requires_db
+
+STUDENTS = [
+    (f"2024-{n:04d}", f"Last{n}", f"First{n}", ("Female", "Male")[n % 2], str(n % 4 + 1), n % 2 + 1, n % 2 + 1)
+    for n in range(1, 41)
+]
+
+
+def _facets(db):
+    queries.execute(db, "student.facets")
+    return sorted(db.fetchall())
+
+
+def _live(db):
+    db.execute("""
+        SELECT f.dimension, f.value, COUNT(*)::int FROM students s
+        CROSS JOIN LATERAL student_facet_pairs(s.year_level, s.gender, s.college_id, s.program_id) f
+        GROUP BY 1, 2
+    """)
+    return sorted(db.fetchall())
+
+
+@requires_db
+def test_counts_are_spread_over_shards_and_sum_to_the_live_counts(db, catalogue):
+    add_students(db, STUDENTS)
+    db.execute("SELECT COUNT(*) FROM student_facets WHERE dimension = 'all'")
+    assert db.fetchone()[0] > 1
+    assert _facets(db) == _live(db)
+    assert ("all", "", 40) in _facets(db)
+
+
+@requires_db
+def test_updates_and_deletes_keep_the_sharded_counts_exact(db, catalogue):
+    add_students(db, STUDENTS)
+    db.execute("UPDATE students SET gender = 'Male', year_level = '4' WHERE id_number <= '2024-0010'")
+    db.execute("UPDATE students SET college_id = 2, program_id = 2 WHERE id_number BETWEEN '2024-0011' AND '2024-0020'")
+    db.execute("DELETE FROM students WHERE id_number > '2024-0030'")
+    assert _facets(db) == _live(db)
+    assert ("all", "", 30) in _facets(db)
+
+    db.execute("SELECT refresh_student_facets()")
+    assert _facets(db) == _live(db)
+
+
+@requires_db
+def test_facets_endpoint_reports_the_summed_total(client, auth_headers, db, catalogue):
+    add_students(db, STUDENTS)
+    db.execute("DELETE FROM students WHERE id_number > '2024-0035'")
+    res = client.get("/api/dashboard/students/facets", headers=auth_headers)
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body["total"] == 35
+    assert sum(c["count"] for c in body["colleges"]) == 35
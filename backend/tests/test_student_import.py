@@ -0,0 +1,107 @@
+import pytest
+
+from app.student.importer import validate_row
+from conftest import add_students, requires_db
+
+HEADER = "id_number,last_name,first_name,gender,year_level,college_id,program_id\n"
+
+VALID = {
+    "id_number": "2024-0001", "last_name": "santos", "first_name": "ana",
+    "gender": "female", "year_level": "1", "college_id": "1", "program_id": "1",
+}
+
+
+def test_validate_row_normalises():
+    values, error = validate_row(VALID)
+    assert error is None
+    assert values == ["2024-0001", "Santos", "Ana", "Female", "1", 1, 1, None]
+
+
+@pytest.mark.parametrize("field, value, message", [
+    ("last_name", "A" * 51, "'last_name' must be at most 50 characters"),
+    ("first_name", "B" * 51, "'first_name' must be at most 50 characters"),
+    ("id_number", "2024-" + "0" * 16, "'id_number' must be at most 20 characters"),
+    ("gender", "unknown", "gender must be one of Male, Female, Others"),
+    ("college_id", "x", "college_id and program_id must be integers"),
+    ("program_id", "3000000000", "college_id and program_id are out of range"),
+    ("year_level", "", "'year_level' is required"),
+])
+def test_validate_row_rejects(field, value, message):
+    assert validate_row(dict(VALID, **{field: value})) == (None, message)
+
+
+def test_validate_row_accepts_names_at_the_limit():
+    values, error = validate_row(dict(VALID, last_name="A" * 50))
+    assert error is None
+
+
+def _import(client, auth_headers, body):
+    return client.post(
+        "/api/dashboard/students/import",
+        data=body.encode(),
+        headers=dict(auth_headers, **{"Content-Type": "text/csv"}),
+    )
+
+
+@requires_db
+def test_import_reports_rejected_rows(client, auth_headers, db, catalogue):
+    add_students(db, [("2024-0002", "Reyes", "Ben", "Male", "2", 1, 1)])
+    body = HEADER + "\n".join([
+        "2024-0001,Santos,Ana,Female,1,1,1",
+        f"2024-0003,{'A' * 51},Carla,Female,3,2,2",
+        "2024-0002,Reyes,Benedict,Male,3,1,1",
+        "2024-0004,Cruz,Dan,Male,4,9,1",
+        "bad-id,Cruz,Eve,Female,1,1,1",
+        "2024-0005,Bautista,Fay,Female,1,1,1",
+        "2024-0005,Bautista,Fay,Female,2,1,1",
+    ]) + "\n"
+
+    res = _import(client, auth_headers, body)
+
+    assert res.status_code == 200
+    report = res.get_json()
+    assert (report["received"], report["inserted"], report["updated"], report["rejected"]) == (7, 2, 1, 4)
+    assert [(e["line"], e["error"]) for e in report["errors"]] == [
+        (3, "'last_name' must be at most 50 characters"),
+        (5, "College not found"),
+        (6, "ID number must follow the format XXXX-XXXX (digits only)"),
+        (7, "Duplicate id_number, superseded by line 8"),
+    ]
+    db.execute("SELECT id_number, first_name, year_level FROM students ORDER BY id_number")
+    assert db.fetchall() == [
+        ("2024-0001", "Ana", "1"),
+        ("2024-0002", "Benedict", "3"),
+        ("2024-0005", "Fay", "2"),
+    ]
+    db.execute("SELECT SUM(count)::int FROM student_facets WHERE dimension = 'all'")
+    assert db.fetchone() == (3,)
+
+
+@requires_db
+def test_import_reports_the_line_kept_for_repeated_ids(client, auth_headers, db, catalogue):
+    body = HEADER + "\n".join([
+        "2024-0001,Santos,Ana,Female,1,1,1",
+        "2024-0001,Santos,Ana,Female,2,1,1",
+        "2024-0001,Santos,Ana,Female,3,1,1",
+        "2024-0002,Reyes,Ben,Male,1,3000000000,1",
+    ]) + "\n"
+
+    res = _import(client, auth_headers, body)
+
+    assert res.status_code == 200
+    report = res.get_json()
+    assert (report["inserted"], report["rejected"]) == (1, 3)
+    assert [(e["line"], e["error"]) for e in report["errors"]] == [
+        (2, "Duplicate id_number, superseded by line 4"),
+        (3, "Duplicate id_number, superseded by line 4"),
+        (5, "college_id and program_id are out of range"),
+    ]
+    db.execute("SELECT year_level FROM students WHERE id_number = '2024-0001'")
+    assert db.fetchone() == ("3",)
+
+
+@requires_db
+def test_import_missing_columns(client, auth_headers, db):
+    res = _import(client, auth_headers, "id_number,last_name\n2024-0001,Santos\n")
+    assert res.status_code == 400
+    assert "missing columns" in res.get_json()["error"]
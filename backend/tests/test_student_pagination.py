@@ -0,0 +1,119 @@
+import base64
+import json
+
+import pytest
+
+from app.student.controller import decode_cursor, encode_cursor, parse_limit
+from conftest import add_students, requires_db
+
+STUDENTS = [
+    ("2024-0001", "Santos", "Ana", "Female", "1", 1, 1),
+    ("2024-0002", "Reyes", "Ben", "Male", "2", 1, 1),
+    ("2024-0003", "Cruz", "Carla", "Female", "3", 2, 2),
+    ("2024-0004", "Reyes", "Dan", "Male", "4", 2, 2),
+    ("2024-0005", "Bautista", "Eve", "Others", "1", 1, 1),
+]
+
+
+def _raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(["Reyes", 4]), "last_name") == ("Reyes", 4)
+    assert decode_cursor(encode_cursor([7, 7])) == (7, 7)
+
+
+@pytest.mark.parametrize("payload, sort", [
+    (["Reyes", "4"], "last_name"),
+    (["Reyes", True], "last_name"),
+    ([["Reyes"], 4], "last_name"),
+    ([{"a": 1}, 4], "last_name"),
+    (["7", 7], "student_id"),
+    ([7, 2 ** 40], "student_id"),
+    (["Reyes"], "last_name"),
+])
+def test_tampered_cursor_is_rejected(payload, sort):
+    with pytest.raises(ValueError):
+        decode_cursor(_raw_cursor(payload), sort)
+
+
+def test_garbage_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-base64!")
+
+
+@pytest.mark.parametrize("value, expected", [(None, 50), ("", 50), ("10", 10), ("9999", 500)])
+def test_parse_limit(value, expected):
+    assert parse_limit(value) == expected
+
+
+@pytest.mark.parametrize("value", ["0", "-3", "ten"])
+def test_parse_limit_rejects(value):
+    with pytest.raises(ValueError):
+        parse_limit(value)
+
+
+def _walk(client, headers, **params):
+    seen, cursor = [], None
+    while True:
+        query = dict(params)
+        if cursor:
+            query["cursor"] = cursor
+        body = client.get("/api/dashboard/students", query_string=query, headers=headers).get_json()
+        seen.extend(s["id_number"] for s in body["students"])
+        cursor = body["next_cursor"]
+        assert body["has_more"] == (cursor is not None)
+        if not cursor:
+            return seen
+
+
+@requires_db
+@pytest.mark.parametrize("sort, order, expected", [
+    ("student_id", "asc", ["2024-0001", "2024-0002", "2024-0003", "2024-0004", "2024-0005"]),
+    ("student_id", "desc", ["2024-0005", "2024-0004", "2024-0003", "2024-0002", "2024-0001"]),
+    # Ties on last_name are broken by student_id.
+    ("last_name", "asc", ["2024-0005", "2024-0003", "2024-0002", "2024-0004", "2024-0001"]),
+    ("last_name", "desc", ["2024-0001", "2024-0004", "2024-0002", "2024-0003", "2024-0005"]),
+])
+def test_keyset_pages_cover_every_row_once(client, auth_headers, db, catalogue, sort, order, expected):
+    add_students(db, STUDENTS)
+    assert _walk(client, auth_headers, sort=sort, order=order, limit=2) == expected
+
+
+@requires_db
+def test_filters_and_total(client, auth_headers, db, catalogue):
+    add_students(db, STUDENTS)
+    body = client.get(
+        "/api/dashboard/students",
+        query_string={"college_id": 1, "gender": "female", "include_total": "1", "limit": 1},
+        headers=auth_headers,
+    ).get_json()
+    assert [s["id_number"] for s in body["students"]] == ["2024-0001"]
+    assert body["total"] == 1
+    assert body["has_more"] is False
+
+
+@requires_db
+def test_ids_filter(client, auth_headers, db, catalogue):
+    add_students(db, STUDENTS)
+    body = client.get(
+        "/api/dashboard/students", query_string={"ids": "2,4,99", "limit": 3}, headers=auth_headers
+    ).get_json()
+    assert sorted(s["student_id"] for s in body["students"]) == [2, 4]
+
+
+@requires_db
+@pytest.mark.parametrize("query", [
+    {"limit": "0"},
+    {"limit": "-1"},
+    {"sort": "password"},
+    {"order": "sideways"},
+    {"sort": "last_name", "cursor": _raw_cursor([["x"], 1])},
+    {"sort": "student_id", "cursor": _raw_cursor(["1 OR 1=1", 1])},
+    {"ids": "1,two"},
+])
+def test_bad_parameters_are_400(client, auth_headers, query):
+    response = client.get("/api/dashboard/students", query_string=query, headers=auth_headers)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
@@ -0,0 +1,60 @@
+import psycopg2
+import pytest
+
+from app import models, search
+from conftest import add_students, requires_db
+
+
+@pytest.fixture
+def ngram(app):
+    app.extensions["search_backend"] = "ngram"
+    search.ngram_index.reset()
+    yield search.ngram_index
+    app.extensions.pop("search_backend", None)
+    search.ngram_index.reset()
+
+
+@requires_db
+def test_ngram_index_sees_writes_from_other_connections(app, db, catalogue, ngram):
+    add_students(db, [("2024-0001", "Santos", "Ana", "Female", "1", 1, 1)])
+    with app.test_request_context():
+        assert [m.last_name for m in models.Student.search("santos")] == ["Santos"]
+
+    # Written outside the app, as the CLI importer or another worker would.
+    add_students(db, [("2024-0002", "Santiago", "Ben", "Male", "2", 1, 1)])
+    db.execute("UPDATE programs SET program_name = 'Data Science' WHERE id = 1")
+    with app.test_request_context():
+        # The rebuild runs in the background; meanwhile the old snapshot answers.
+        assert [m.last_name for m in models.Student.search("santos")] == ["Santos"]
+    ngram.wait()
+    with app.test_request_context():
+        assert models.Student.search("santiago")[0].last_name == "Santiago"
+        assert {m.last_name for m in models.Student.search("data science")} == {"Santos", "Santiago"}
+    assert ngram.stats()["builds"] >= 2
+
+
+def _trigram_available(app):
+    conn = psycopg2.connect(app.config["DATABASE_URL"])
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT to_regclass('students_search_key_trgm_idx') IS NOT NULL")
+        return cursor.fetchone()[0]
+    finally:
+        conn.close()
+
+
+@requires_db
+def test_trigram_search_bounds_program_matches(app, db, catalogue):
+    if not _trigram_available(app):
+        pytest.skip("pg_trgm is not installed in the test database")
+    add_students(db, [("2024-0001", "Compton", "Ana", "Female", "1", 2, 2)] + [
+        (f"2024-{n:04d}", "Reyes", "Ben", "Male", "2", 1, 1) for n in range(2, 32)
+    ])
+    app.extensions["search_backend"] = "trigram"
+    try:
+        with app.test_request_context():
+            matches = models.Student.search("computer science", limit=5)
+            assert [m.id_number for m in matches] == [f"2024-{n:04d}" for n in range(2, 7)]
+            assert models.Student.search("compton", limit=5)[0].last_name == "Compton"
+    finally:
+        app.extensions.pop("search_backend", None)
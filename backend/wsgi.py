@@ -0,0 +1,7 @@
+from app import create_app, database
+
+app = create_app()
+
+# create_app() may have opened pooled connections (schema check).  Drop them
+# so forked workers never share a socket inherited from the master.
+database.close_pool(app)
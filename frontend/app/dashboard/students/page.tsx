@@ -1,6 +1,6 @@
 "use client";
 
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { Search, Trash2, Pencil, Filter, X } from "lucide-react";
 import { Button } from "@/components/ui/button";
 import {
@@ -20,9 +20,7 @@ import {
 import {
   Pagination,
   PaginationContent,
-  PaginationEllipsis,
   PaginationItem,
-  PaginationLink,
   PaginationNext,
   PaginationPrevious,
 } from "@/components/ui/pagination";
@@ -30,6 +28,19 @@ import AddStudentDialog from "@/components/AddStudent";
 import { useAuth } from "@/app/contexts/AuthContext";
 import { useNotification } from "@/app/contexts/NotificationContext";
 import { supabase } from "@/lib/supabaseClient";
+import { useChangeFeed, type ChangeEvent } from "@/lib/changeFeed";
+
+// Largest limit= the search endpoint accepts (SEARCH_LIMIT_MAX).
+const SEARCH_LIMIT = 100;
+const SEARCH_DEBOUNCE_MS = 300;
+
+// Sort menu labels -> sort= values the students endpoint accepts.
+const SORT_FIELDS: Record<string, string> = {
+  "ID Number": "id_number",
+  "First Name": "first_name",
+  "Last Name": "last_name",
+  "Year Level": "year_level",
+};
 
 interface FilterState {
   college_id: string;
@@ -38,9 +49,42 @@ interface FilterState {
   year_level: string;
 }
 
+const EMPTY_FILTERS: FilterState = {
+  college_id: "",
+  program_id: "",
+  gender: "",
+  year_level: "",
+};
+
+// Search terms that name a gender or year level filter on it instead of
+// running a text search.
+const KEYWORD_FILTERS: Record<string, Partial<FilterState>> = {
+  male: { gender: "Male" },
+  female: { gender: "Female" },
+  others: { gender: "Others" },
+};
+for (const [level, words] of Object.entries({
+  "1": ["1st", "first"],
+  "2": ["2nd", "second"],
+  "3": ["3rd", "third"],
+  "4": ["4th", "fourth"],
+})) {
+  for (const word of [level, ...words, `${words[0]} year`]) {
+    KEYWORD_FILTERS[word] = { year_level: level };
+  }
+}
+
 export default function StudentsPage() {
+  // Rows on the current page; the server filters, sorts and pages.
   const [students, setStudents] = useState<any[]>([]);
-  const [allStudents, setAllStudents] = useState<any[]>([]);
+  // Ranked hits from /students/search while a search term is set.
+  const [searchHits, setSearchHits] = useState<any[] | null>(null);
+  const [rosterTotal, setRosterTotal] = useState(0);
+  const [matchTotal, setMatchTotal] = useState(0);
+  // cursors[n] fetches page n + 1; the first page has none.
+  const [cursors, setCursors] = useState<(string | null)[]>([null]);
+  const [reloadKey, setReloadKey] = useState(0);
+  const requestSeq = useRef(0);
   const [colleges, setColleges] = useState<any[]>([]);
   const [programs, setPrograms] = useState<any[]>([]);
   const [yearLevels, setYearLevels] = useState<number[]>([]);
@@ -51,6 +95,7 @@ export default function StudentsPage() {
   const [sortBy, setSortBy] = useState("Sort By");
   const [order, setOrder] = useState("Ascending");
   const [search, setSearch] = useState("");
+  const [query, setQuery] = useState("");
   const { token, logoutUser } = useAuth();
   const { notify, confirm } = useNotification();
 
@@ -59,26 +104,65 @@ export default function StudentsPage() {
   const [open, setOpen] = useState(false);
 
   // Filter state
-  const [filters, setFilters] = useState<FilterState>({
-    college_id: "",
-    program_id: "",
-    gender: "",
-    year_level: "",
-  });
+  const [filters, setFilters] = useState<FilterState>(EMPTY_FILTERS);
   const [activeFilters, setActiveFilters] = useState<string[]>([]);
 
-  async function fetchStudents() {
+  // Anything that changes the result set starts again from the first page.
+  function restartPaging() {
+    setCurrentPage(1);
+    setCursors([null]);
+  }
+
+  function updateFilters(patch: Partial<FilterState>) {
+    setFilters((prev) => ({ ...prev, ...patch }));
+    restartPaging();
+  }
+
+  useEffect(() => {
+    const timer = setTimeout(() => {
+      setQuery(search.trim());
+      restartPaging();
+    }, SEARCH_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [search]);
+
+  function pageUrl(cursor: string | null) {
+    const params = new URLSearchParams({
+      limit: String(studentsPerPage),
+      include_total: "true",
+      sort: SORT_FIELDS[sortBy] ?? "student_id",
+      order: order === "Descending" ? "desc" : "asc",
+    });
+    for (const [key, value] of Object.entries({ ...filters, ...keywordFilter })) {
+      if (value) params.set(key, value);
+    }
+    if (cursor) params.set("cursor", cursor);
+    return `${process.env.NEXT_PUBLIC_API_URL}/api/dashboard/students?${params}`;
+  }
+
+  function searchUrl() {
+    const params = new URLSearchParams({ q: query, limit: String(SEARCH_LIMIT) });
+    return `${process.env.NEXT_PUBLIC_API_URL}/api/dashboard/students/search?${params}`;
+  }
+
+  const keywordFilter = KEYWORD_FILTERS[query.toLowerCase()];
+  const searching = Boolean(query) && !keywordFilter;
+  // Search hits are paged here, so paging only refetches without a term.
+  const requestUrl = searching ? searchUrl() : pageUrl(cursors[currentPage - 1] ?? null);
+
+  async function fetchStudents(url: string) {
+    // Filters, sort and paging can change while a request is in flight;
+    // only the newest response is applied.
+    const seq = ++requestSeq.current;
     setLoading(true);
     try {
-      const res = await fetch(
-        `${process.env.NEXT_PUBLIC_API_URL}/api/dashboard/students`,
-        {
-          method: "GET",
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        }
-      );
+      const res = await fetch(url, {
+        method: "GET",
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+        cache: "no-store",
+      });
 
       if (res.status === 401) {
         console.error("Token expired or invalid. Logging out.");
@@ -91,22 +175,35 @@ export default function StudentsPage() {
       }
 
       const data = await res.json();
-      const studentData = Array.isArray(data) ? data : data.students || [];
-      setAllStudents(studentData);
-      setStudents(studentData);
+      if (seq !== requestSeq.current) return;
+      if (searching) {
+        setSearchHits(data.students ?? []);
+        return;
+      }
+      setSearchHits(null);
+      setStudents(data.students ?? []);
+      setMatchTotal(data.total ?? 0);
+      setCursors((prev) => {
+        const next = prev.slice(0, currentPage);
+        if (data.has_more && data.next_cursor) next.push(data.next_cursor);
+        return next;
+      });
     } catch (err) {
       console.error("Error fetching students:", err);
+      if (seq !== requestSeq.current) return;
       setStudents([]);
-      setAllStudents([]);
+      setSearchHits(searching ? [] : null);
     } finally {
-      setLoading(false);
+      if (seq === requestSeq.current) setLoading(false);
     }
   }
 
-  async function fetchColleges() {
+  // One request for every filter dimension; the backend serves it from
+  // precomputed facet counts.
+  async function fetchFacets() {
     try {
       const res = await fetch(
-        `${process.env.NEXT_PUBLIC_API_URL}/api/dashboard/colleges`,
+        `${process.env.NEXT_PUBLIC_API_URL}/api/dashboard/students/facets`,
         {
           method: "GET",
           headers: {
@@ -115,94 +212,57 @@ export default function StudentsPage() {
         }
       );
 
-      if (!res.ok) throw new Error("Failed to fetch colleges");
+      if (!res.ok) throw new Error("Failed to fetch facets");
 
       const data = await res.json();
-      setColleges(data.colleges ?? data ?? []);
+      setRosterTotal(data.total ?? 0);
+      setColleges(data.colleges ?? []);
+      setPrograms(data.programs ?? []);
+      setYearLevels((data.year_levels ?? []).map((f: any) => f.value));
+      setGenders((data.genders ?? []).map((f: any) => f.value));
     } catch (err) {
-      console.error("Error fetching colleges:", err);
+      console.error("Error fetching facets:", err);
       setColleges([]);
-    }
-  }
-
-  async function fetchPrograms() {
-    try {
-      const res = await fetch(
-        `${process.env.NEXT_PUBLIC_API_URL}/api/dashboard/programs`,
-        {
-          method: "GET",
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        }
-      );
-
-      if (!res.ok) throw new Error("Failed to fetch programs");
-
-      const data = await res.json();
-      setPrograms(data.programs ?? data ?? []);
-    } catch (err) {
-      console.error("Error fetching programs:", err);
       setPrograms([]);
+      setYearLevels([]);
+      setGenders([]);
     }
   }
 
-  async function fetchYearLevels() {
-    try {
-      const res = await fetch(
-        `${process.env.NEXT_PUBLIC_API_URL}/api/dashboard/students/year-levels`,
-        {
-          headers: { Authorization: `Bearer ${token}` },
-        }
-      );
-
-      const text = await res.text();
-
-      if (!res.ok) {
-        console.error("Year levels API error:", res.status, text);
-        throw new Error("Failed to fetch year levels");
-      }
+  useEffect(() => {
+    if (token) fetchFacets();
+  }, [token]);
 
-      const data = JSON.parse(text);
-      setYearLevels(Array.isArray(data) ? data : []);
-    } catch (err) {
-      console.error("Error fetching year levels:", err);
-      setYearLevels([]);
-    }
+  useEffect(() => {
+    if (token) fetchStudents(requestUrl);
+  }, [token, requestUrl, reloadKey]);
+
+  // Writes from any tab or user: reload the page on screen (one bounded
+  // request) and the facet counts.
+  function applyChanges(events: ChangeEvent[]) {
+    const relevant = events.some(
+      (e) => e.entity === "student" || (e.entity === "program" && (e.op === "update" || e.op === "reset"))
+    );
+    fetchFacets();
+    if (relevant) setReloadKey((k) => k + 1);
   }
 
-  async function fetchGenders() {
-    try {
-      const res = await fetch(
-        `${process.env.NEXT_PUBLIC_API_URL}/api/dashboard/students/genders`,
-        {
-          method: "GET",
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        }
-      );
-
-      if (!res.ok) throw new Error("Failed to fetch genders");
+  const feedConnected = useChangeFeed(token, {
+    onChanges: applyChanges,
+    onReset: () => {
+      restartPaging();
+      setReloadKey((k) => k + 1);
+      fetchFacets();
+    },
+  });
 
-      const data = await res.json();
-      setGenders(Array.isArray(data) ? data : []);
-    } catch (err) {
-      console.error("Error fetching genders:", err);
-      setGenders([]);
-    }
+  // Without a live feed, reload after our own writes.
+  function refreshAfterWrite() {
+    if (feedConnected.current) return;
+    setReloadKey((k) => k + 1);
+    fetchFacets();
   }
 
-  useEffect(() => {
-    if (token) {
-      fetchStudents();
-      fetchColleges();
-      fetchPrograms();
-      fetchYearLevels();
-      fetchGenders();
-    }
-  }, [token]);
-
   useEffect(() => {
     if (filters.college_id && filters.program_id) {
       const selectedProgram = programs.find(
@@ -212,40 +272,11 @@ export default function StudentsPage() {
         selectedProgram &&
         selectedProgram.college_id?.toString() !== filters.college_id.toString()
       ) {
-        setFilters((prev) => ({ ...prev, program_id: "" }));
+        updateFilters({ program_id: "" });
       }
     }
   }, [filters.college_id, filters.program_id, programs]);
 
-  // Apply filters
-  useEffect(() => {
-    let filtered = [...allStudents];
-
-    if (filters.college_id) {
-      filtered = filtered.filter(
-        (s) => s.college_id?.toString() === filters.college_id.toString()
-      );
-    }
-    if (filters.program_id) {
-      filtered = filtered.filter(
-        (s) => s.program_id?.toString() === filters.program_id.toString()
-      );
-    }
-    if (filters.gender) {
-      filtered = filtered.filter(
-        (s) => s.gender?.toLowerCase() === filters.gender.toLowerCase()
-      );
-    }
-    if (filters.year_level) {
-      filtered = filtered.filter(
-        (s) => s.year_level?.toString() === filters.year_level.toString()
-      );
-    }
-
-    setStudents(filtered);
-    setCurrentPage(1);
-  }, [filters, allStudents]);
-
   // Update active filters list
   useEffect(() => {
     const active: string[] = [];
@@ -327,9 +358,7 @@ export default function StudentsPage() {
           console.warn("Error deleting student photo:", err);
         }
 
-        fetchStudents();
-        fetchYearLevels();
-        fetchGenders();
+        refreshAfterWrite();
       } else {
         const error = await res.json();
         notify(error.error || "Failed to delete student", { type: "error" });
@@ -340,78 +369,50 @@ export default function StudentsPage() {
   }
 
   const clearAllFilters = () => {
-    setFilters({
-      college_id: "",
-      program_id: "",
-      gender: "",
-      year_level: "",
-    });
+    updateFilters(EMPTY_FILTERS);
   };
 
   const removeFilter = (filterKey: keyof FilterState) => {
-    setFilters((prev) => ({ ...prev, [filterKey]: "" }));
+    updateFilters({ [filterKey]: "" });
   };
 
-  useEffect(() => {
-    setCurrentPage(1);
-  }, [search, sortBy, order]);
-
-  const displayedStudents = students
-    .filter((s) => {
-      const query = search.toLowerCase().trim();
-      if (!query) return true;
-
-      const yearLevelMap: Record<string, string> = {
-        "1": "1",
-        "1st": "1",
-        first: "1",
-        "1st year": "1",
-        "2": "2",
-        "2nd": "2",
-        second: "2",
-        "2nd year": "2",
-        "3": "3",
-        "3rd": "3",
-        third: "3",
-        "3rd year": "3",
-        "4": "4",
-        "4th": "4",
-        fourth: "4",
-        "4th year": "4",
-      };
-
-      const genderMatch =
-        ["male", "female", "others"].includes(query) &&
-        s.gender.toLowerCase() === query;
-
-      const mappedYear = yearLevelMap[query];
-      const yearLevelMatch =
-        mappedYear && s.year_level.toString() === mappedYear;
-
-      const generalMatch = `${s.first_name} ${s.last_name} ${s.id_number} ${
-        s.program_code
-      } ${s.program_name || ""} ${s.college_name || ""}`
-        .toLowerCase()
-        .includes(query);
-
-      return genderMatch || generalMatch || yearLevelMatch;
-    })
+  const changeSort = (value: string) => {
+    setSortBy(value);
+    restartPaging();
+  };
+
+  const changeOrder = (value: string) => {
+    setOrder(value);
+    restartPaging();
+  };
+
+  // Search results are capped at SEARCH_LIMIT ranked hits, so the filters
+  // and sort narrow that short list here; everything else is done by the
+  // server.
+  const searchMatches = !searching || searchHits === null ? null : searchHits
+    .filter(
+      (s) =>
+        (!filters.college_id || s.college_id?.toString() === filters.college_id) &&
+        (!filters.program_id || s.program_id?.toString() === filters.program_id) &&
+        (!filters.gender || s.gender?.toLowerCase() === filters.gender.toLowerCase()) &&
+        (!filters.year_level || s.year_level?.toString() === filters.year_level)
+    )
     .sort((a, b) => {
-      if (sortBy === "Sort By") return 0;
-      const fieldKey = sortBy.toLowerCase().replace(" ", "_");
-      const fieldA = (a as any)[fieldKey];
-      const fieldB = (b as any)[fieldKey];
-      if (!fieldA || !fieldB) return 0;
-      if (order === "Ascending")
-        return String(fieldA).localeCompare(String(fieldB));
-      return String(fieldB).localeCompare(String(fieldA));
+      const fieldKey = SORT_FIELDS[sortBy];
+      if (!fieldKey) return 0;
+      const cmp = String(a[fieldKey] ?? "").localeCompare(String(b[fieldKey] ?? ""));
+      return order === "Ascending" ? cmp : -cmp;
     });
 
-  const totalPages = Math.ceil(displayedStudents.length / studentsPerPage);
-  const paginatedStudents = displayedStudents.slice(
-    (currentPage - 1) * studentsPerPage,
-    currentPage * studentsPerPage
-  );
+  const shownTotal = searchMatches ? searchMatches.length : matchTotal;
+  const totalPages = Math.max(1, Math.ceil(shownTotal / studentsPerPage));
+  const paginatedStudents = searchMatches
+    ? searchMatches.slice((currentPage - 1) * studentsPerPage, currentPage * studentsPerPage)
+    : students;
+  // Keyset paging only knows the cursor of the page after the current one.
+  const hasNextPage = searchMatches
+    ? currentPage < totalPages
+    : cursors.length > currentPage;
 
   // Helper function to get year level label
   const getYearLevelLabel = (level: number) => {
@@ -446,15 +447,11 @@ export default function StudentsPage() {
         {/* Add Student */}
         <div className="flex glass rounded-lg gap-3 p-4 items-center shadow-lg">
           <AddStudentDialog
-            onStudentAdded={() => {
-              fetchStudents();
-              fetchYearLevels();
-              fetchGenders();
-            }}
+            onStudentAdded={refreshAfterWrite}
           />
-          <span>Total Students: {allStudents.length}</span>
+          <span>Total Students: {rosterTotal}</span>
           <span className="text-gray-400">
-            | Showing: {displayedStudents.length}
+            | Showing: {shownTotal}
           </span>
         </div>
 
@@ -512,7 +509,7 @@ export default function StudentsPage() {
                   (option) => (
                     <DropdownMenuItem
                       key={option}
-                      onClick={() => setSortBy(option)}
+                      onClick={() => changeSort(option)}
                     >
                       {option}
                     </DropdownMenuItem>
@@ -530,7 +527,7 @@ export default function StudentsPage() {
                 {["Ascending", "Descending"].map((option) => (
                   <DropdownMenuItem
                     key={option}
-                    onClick={() => setOrder(option)}
+                    onClick={() => changeOrder(option)}
                   >
                     {option}
                   </DropdownMenuItem>
@@ -554,10 +551,7 @@ export default function StudentsPage() {
                     <select
                       value={filters.college_id}
                       onChange={(e) =>
-                        setFilters((prev) => ({
-                          ...prev,
-                          college_id: e.target.value,
-                        }))
+                        updateFilters({ college_id: e.target.value })
                       }
                       className="cursor-pointer w-full px-2 py-1 border rounded text-sm"
                     >
@@ -578,10 +572,7 @@ export default function StudentsPage() {
                     <select
                       value={filters.program_id}
                       onChange={(e) =>
-                        setFilters((prev) => ({
-                          ...prev,
-                          program_id: e.target.value,
-                        }))
+                        updateFilters({ program_id: e.target.value })
                       }
                       className="cursor-pointer w-full px-2 py-1 border rounded text-sm"
                       disabled={!programs.length}
@@ -613,10 +604,7 @@ export default function StudentsPage() {
                     <select
                       value={filters.gender}
                       onChange={(e) =>
-                        setFilters((prev) => ({
-                          ...prev,
-                          gender: e.target.value,
-                        }))
+                        updateFilters({ gender: e.target.value })
                       }
                       className="cursor-pointer w-full px-2 py-1 border rounded text-sm"
                     >
@@ -637,10 +625,7 @@ export default function StudentsPage() {
                     <select
                       value={filters.year_level}
                       onChange={(e) =>
-                        setFilters((prev) => ({
-                          ...prev,
-                          year_level: e.target.value,
-                        }))
+                        updateFilters({ year_level: e.target.value })
                       }
                       className="cursor-pointer w-full px-2 py-1 border rounded text-sm"
                     >
@@ -753,101 +738,18 @@ export default function StudentsPage() {
               />
             </PaginationItem>
 
-            {(() => {
-              const pageNumbers = [];
-              const maxVisible = 4;
-              let startPage = Math.max(
-                1,
-                currentPage - Math.floor(maxVisible / 2)
-              );
-              let endPage = startPage + maxVisible - 1;
-
-              if (endPage > totalPages) {
-                endPage = totalPages;
-                startPage = Math.max(1, endPage - maxVisible + 1);
-              }
-
-              if (startPage > 1) {
-                pageNumbers.push(
-                  <PaginationItem key={1}>
-                    <PaginationLink
-                      href="#"
-                      isActive={currentPage === 1}
-                      onClick={(e) => {
-                        e.preventDefault();
-                        setCurrentPage(1);
-                      }}
-                    >
-                      1
-                    </PaginationLink>
-                  </PaginationItem>
-                );
-
-                if (startPage > 2) {
-                  pageNumbers.push(
-                    <PaginationItem key="start-ellipsis">
-                      <PaginationEllipsis />
-                    </PaginationItem>
-                  );
-                }
-              }
-
-              for (let i = startPage; i <= endPage; i++) {
-                pageNumbers.push(
-                  <PaginationItem key={i}>
-                    <PaginationLink
-                      href="#"
-                      isActive={currentPage === i}
-                      onClick={(e) => {
-                        e.preventDefault();
-                        setCurrentPage(i);
-                      }}
-                      className={`${
-                        currentPage === i
-                          ? "text-black font-semibold"
-                          : "text-gray-300"
-                      }`}
-                    >
-                      {i}
-                    </PaginationLink>
-                  </PaginationItem>
-                );
-              }
-
-              if (endPage < totalPages) {
-                if (endPage < totalPages - 1) {
-                  pageNumbers.push(
-                    <PaginationItem key="end-ellipsis">
-                      <PaginationEllipsis />
-                    </PaginationItem>
-                  );
-                }
-
-                pageNumbers.push(
-                  <PaginationItem key={totalPages}>
-                    <PaginationLink
-                      href="#"
-                      isActive={currentPage === totalPages}
-                      onClick={(e) => {
-                        e.preventDefault();
-                        setCurrentPage(totalPages);
-                      }}
-                    >
-                      {totalPages}
-                    </PaginationLink>
-                  </PaginationItem>
-                );
-              }
-
-              return pageNumbers;
-            })()}
+            <PaginationItem>
+              <span className="px-3 text-sm text-gray-300">
+                Page {currentPage} of {totalPages}
+              </span>
+            </PaginationItem>
 
             <PaginationItem>
               <PaginationNext
                 href="#"
                 onClick={(e) => {
                   e.preventDefault();
-                  if (currentPage < totalPages) setCurrentPage(currentPage + 1);
+                  if (hasNextPage) setCurrentPage(currentPage + 1);
                 }}
               />
             </PaginationItem>
@@ -864,9 +766,7 @@ export default function StudentsPage() {
           editingStudent={editingStudent}
           viewOnly={viewMode}
           onStudentUpdated={() => {
-            fetchStudents();
-            fetchYearLevels();
-            fetchGenders();
+            refreshAfterWrite();
             setEditingStudent(null);
             setOpen(false);
           }}
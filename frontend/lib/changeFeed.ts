@@ -0,0 +1,120 @@
+"use client";
+
+import { useEffect, useRef } from "react";
+
+export interface ChangeEvent {
+  id: number;
+  entity: "student" | "program" | "college";
+  entity_id: number | null;
+  op: "insert" | "update" | "delete" | "reset";
+}
+
+interface ChangeFeedHandlers {
+  // Called once per received chunk with every change in it, oldest first.
+  onChanges: (events: ChangeEvent[]) => void;
+  // The events since our last id are gone server-side; reload everything.
+  onReset: () => void;
+}
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+/**
+ * Subscribes to /api/dashboard/changes (server-sent events).
+ *
+ * Uses fetch rather than EventSource so the bearer token can be sent, and
+ * resumes with Last-Event-ID after every reconnect so a dropped connection
+ * replays the missed changes instead of forcing a full reload. Returns a
+ * ref that is true while the stream is open; callers fall back to
+ * refetching after their own writes when it is not.
+ */
+export function useChangeFeed(token: string | null, handlers: ChangeFeedHandlers) {
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+  const connected = useRef(false);
+
+  useEffect(() => {
+    if (!token) return;
+    const controller = new AbortController();
+    let lastEventId: string | null = null;
+    let retry = 3000;
+
+    function dispatch(block: string, changes: ChangeEvent[]) {
+      let event = "message";
+      let data = "";
+      for (const line of block.split("\n")) {
+        if (!line || line.startsWith(":")) continue;
+        const sep = line.indexOf(":");
+        const field = sep === -1 ? line : line.slice(0, sep);
+        const value = sep === -1 ? "" : line.slice(sep + 1).replace(/^ /, "");
+        if (field === "id") lastEventId = value;
+        else if (field === "event") event = value;
+        else if (field === "data") data += data ? "\n" + value : value;
+        else if (field === "retry" && /^\d+$/.test(value)) retry = Number(value);
+      }
+      if (event === "change" && data) {
+        changes.push(JSON.parse(data));
+      } else if (event === "reset") {
+        if (changes.length) handlersRef.current.onChanges(changes.splice(0));
+        handlersRef.current.onReset();
+      }
+    }
+
+    async function read(body: ReadableStream<Uint8Array>) {
+      const reader = body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = "";
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) return;
+        buffered += decoder.decode(value, { stream: true }).replace(/\r\n?/g, "\n");
+        const blocks = buffered.split("\n\n");
+        buffered = blocks.pop() ?? "";
+        const changes: ChangeEvent[] = [];
+        for (const block of blocks) dispatch(block, changes);
+        if (changes.length) handlersRef.current.onChanges(changes);
+      }
+    }
+
+    async function run() {
+      while (!controller.signal.aborted) {
+        let delay = retry;
+        try {
+          const headers: Record<string, string> = {
+            Authorization: `Bearer ${token}`,
+            Accept: "text/event-stream",
+          };
+          if (lastEventId) headers["Last-Event-ID"] = lastEventId;
+          const res = await fetch(
+            `${process.env.NEXT_PUBLIC_API_URL}/api/dashboard/changes`,
+            { headers, signal: controller.signal, cache: "no-store" }
+          );
+          // Expired or revoked tokens are handled by the page's own requests;
+          // 404 means the backend has no change stream (ASGI mode).
+          if ([401, 404, 422].includes(res.status)) return;
+          if (res.ok && res.body) {
+            connected.current = true;
+            await read(res.body);
+            // The server closes streams after a while; pick up straight away.
+            delay = 0;
+          } else if (res.headers.get("Retry-After")) {
+            delay = Number(res.headers.get("Retry-After")) * 1000;
+          }
+        } catch (err) {
+          if (controller.signal.aborted) return;
+          console.warn("Change feed disconnected:", err);
+        } finally {
+          connected.current = false;
+        }
+        await sleep(delay);
+      }
+    }
+
+    run();
+    return () => {
+      controller.abort();
+      connected.current = false;
+    };
+  }, [token]);
+
+  return connected;
+}